@@ -1,27 +1,53 @@
-import pandas as pd
-from Module_Data_Inspection.DataInspection import DataInspection
-from Module_data_analysis.DataAnalysis import DataAnalysis
-from Module_SentimentAnalysis.SentimentAnalysis import SentimentAnalysis
+import argparse
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# 创建 results 目录（如果不存在）
-os.makedirs('./results/', exist_ok=True)
-
-def load_dataset():
-    """加载数据集，并提示用户输入路径。"""
-    path = input("ENTER THE PATH TO YOUR DATASET: ").strip('\"')
+from Module_Lazy_Import.LazyImport import is_loaded, lazy_import
+from Module_Tracing.Tracing import get_tracer
+
+# 较重的依赖（pandas、matplotlib、scipy、seaborn、vaderSentiment、textblob 等）在第一次用到时才导入，
+# 导入 Main 本身没有副作用，输入提示可以立即出现
+pd = lazy_import('pandas')
+plt = lazy_import('matplotlib.pyplot')
+dataset_cache = lazy_import('Module_Data_Cache.DatasetCache')
+incremental_store = lazy_import('Module_Data_Cache.IncrementalStore')
+result_cache = lazy_import('Module_Data_Cache.ResultCache')
+plot_renderer = lazy_import('Module_Plot_Rendering.PlotRenderer')
+data_inspection = lazy_import('Module_Data_Inspection.DataInspection')
+data_schema = lazy_import('Module_Data_Inspection.Schema')
+data_analysis = lazy_import('Module_data_analysis.DataAnalysis')
+sentiment_analysis = lazy_import('Module_SentimentAnalysis.SentimentAnalysis')
+analysis_server = lazy_import('Module_Server.AnalysisServer')
+
+def load_dataset(path=None):
+    """加载数据集，返回 (数据集, 版本)；未给出路径时提示用户输入。
+
+    重复加载同一文件时使用列式缓存，文件只在末尾追加了行时只解析新追加的部分。
+    """
+    if path is None:
+        path = input("ENTER THE PATH TO YOUR DATASET: ").strip('\"')
     try:
-        df = pd.read_csv(path)
+        df, version = dataset_cache.load_csv_versioned(path)
         print("Dataset loaded successfully.")
-        return df
+        if 0 < version.appended < version.rows:
+            print(f"Parsed {version.appended:,} rows appended since the last run ({version.rows:,} rows in total).")
+        return df, version
     except Exception as e:
         print(f"Error loading dataset: {e}")
-    return None
+    return None, None
+
+def compact_dataset(df):
+    """按推断出的模式压缩列类型并打印压缩前后的内存占用，返回 (数据集, 模式)。出错时返回原数据集。"""
+    try:
+        with get_tracer().span('compact dtypes'):
+            compact, schema, (_, before, after) = data_schema.apply_schema(df)
+    except Exception as e:
+        print(f"Error compacting dataset: {e}")
+        return df, None
+    print(f"Memory usage: {before:.1f} MB -> {after:.1f} MB after compacting column types.")
+    return compact, schema
 
 def show_image(image_path):
-    """显示图片，如果路径存在则显示，否则提示用户文件不存在。"""
+    """显示图片（先等待后台渲染完成），如果路径存在则显示，否则提示用户文件不存在。"""
+    plot_renderer.get_renderer().wait(image_path)
     if os.path.exists(image_path):
         img = plt.imread(image_path)
         plt.imshow(img)
@@ -30,7 +56,20 @@ def show_image(image_path):
     else:
         print(f"Image '{image_path}' does not exist.")
 
-def print_statistics(stats_list):
+def format_statistics(stats):
+    """把结构化的统计结果格式化为表格行。"""
+    rows = []
+    for var, stat in stats.iterrows():
+        if stat['Type'] == 'Nominal':
+            rows.append([var, stat['Type'], stat['Mode'], "NA", "NA"])
+        else:
+            rows.append([
+                var, stat['Type'], f"{stat['Mean']:.2f} / {stat['Median']:.2f} / {stat['Mode']}",
+                f"{stat['Kurtosis']:.2f}", f"{stat['Skewness']:.2f}"
+            ])
+    return rows
+
+def print_statistics(stats):
     """打印数据统计信息。"""
     headers = ["Variable", "Type", "Mean / Median / Mode", "Kurtosis", "Skewness"]
     col_widths = [20, 10, 25, 10, 10]
@@ -39,38 +78,151 @@ def print_statistics(stats_list):
     print(header_row)
     print("=" * sum(col_widths))
 
-    for stat in stats_list:
-        print("".join(f"{str(item):<{col_widths[i]}}" for i, item in enumerate(stat)))
+    for row in format_statistics(stats):
+        print("".join(f"{str(item):<{col_widths[i]}}" for i, item in enumerate(row)))
+
+def print_error_bounds(stats):
+    """打印近似统计（--approximate）的误差界：各列中最大的误差。"""
+    if 'Unique error' not in stats.columns:
+        return
+    unique = stats['Unique error'] / stats['Unique'].where(stats['Unique'] > 0)
+    print(f"Approximate profile: unique counts within ±{unique.fillna(0).max():.1%} (95%), medians and quartiles within "
+          f"±{stats['Quantile rank error'].fillna(0).max():.1%} of rank (99%), mode counts low by at most "
+          f"{int(stats['Mode count error'].max()):,} rows; counts, means, spreads and moments are exact.")
+
+def print_variables(stats, types):
+    """打印属于指定类型的变量。"""
+    for var, var_type in stats['Type'].items():
+        if var_type in types:
+            print(f"{var}\t{var_type}")
+
+def print_cache_stats():
+    """打印结果缓存的命中/未命中次数。"""
+    cache_stats = result_cache.get_result_cache().stats()
+    print(f"Result cache: {cache_stats['memory_hits']} memory hits, {cache_stats['disk_hits']} disk hits, "
+          f"{cache_stats['misses']} misses")
+
+def print_stratified(analysis, strata, method, params, combine=None):
+    """在 --strata 指定的分层变量的每一层内重复刚才的检验，打印各层结果（以及合并估计）。"""
+    if strata is None:
+        return
+    print(f"\nStratified by '{strata}':")
+    try:
+        table, _ = analysis.stratified(method, strata, params, combine)
+        print(table.to_string(index=False))
+    except ValueError as e:
+        print(f"Error during stratified analysis: {e}")
+
+MENU_ITEMS = {
+    '1': "Plot variable distribution",
+    '2': "Conduct ANOVA",
+    '3': "Conduct t-Test",
+    '4': "Conduct Chi-Square",
+    '5': "Conduct Regression",
+    '6': "Conduct Sentiment Analysis",
+    '7': "Quit",
+}
 
 def main_menu():
     """显示主菜单，并返回用户的选择。"""
     print("\nHow do you want to analyze your data?")
-    print("1. Plot variable distribution")
-    print("2. Conduct ANOVA")
-    print("3. Conduct t-Test")
-    print("4. Conduct Chi-Square")
-    print("5. Conduct Regression")
-    print("6. Conduct Sentiment Analysis")
-    print("7. Quit")
+    for key, label in MENU_ITEMS.items():
+        print(f"{key}. {label}")
     return input("Enter your choice (1 – 7): ")
 
-def main():
+def print_profile(tracer):
+    """等待后台绘图完成后结束当前操作的计时，并打印各阶段的耗时和内存峰值。"""
+    if tracer.action is None:
+        return
+    if is_loaded('Module_Plot_Rendering.PlotRenderer'):
+        try:
+            plot_renderer.get_renderer().wait()
+        except Exception as e:
+            print(f"Error while rendering: {e}")
+    action_id = tracer.action_id
+    action = tracer.end_action()
+    print(f"\nProfile of '{action}':")
+    print(tracer.report(action_id))
+
+def parse_args(argv=None):
+    """解析命令行参数。"""
+    parser = argparse.ArgumentParser(description="Interactive statistical and sentiment analysis of a CSV dataset.")
+    parser.add_argument('--data', help="path to the CSV dataset (skips the path prompt)")
+    parser.add_argument('--no-compact', action='store_true',
+                        help="keep the column types read from the CSV instead of compacting them")
+    parser.add_argument('--serve', action='store_true',
+                        help="load the dataset once and serve analyses over a local HTTP/JSON API instead of the menu")
+    parser.add_argument('--host', default='127.0.0.1', help="address for --serve (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="port for --serve (default: 8765)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="keep mergeable statistics next to the dataset and fold in only the rows appended "
+                             "since the last run (statistics, Chi-Square and regression)")
+    parser.add_argument('--approximate', action='store_true',
+                        help="profile the columns with mergeable sketches (HyperLogLog, Misra-Gries, KLL, reservoir "
+                             "samples) instead of exact sorts and counts; for very large or very wide tables")
+    parser.add_argument('--strata', metavar='VAR',
+                        help="also repeat the ANOVA, t-test, Chi-Square and regression within each level of VAR "
+                             "(e.g. Country) and combine across strata (Cochran-Mantel-Haenszel for Chi-Square)")
+    parser.add_argument('--permutations', type=int, metavar='N', default=None,
+                        help="also compute permutation p-values (up to N resamples, exact for small two-group "
+                             "samples) for the t-test, Kruskal-Wallis and Chi-Square tests")
+    parser.add_argument('--profile', action='store_true',
+                        help="print wall time, CPU time and peak allocation of each stage after every action "
+                             "(the action total includes time spent at prompts; allocation tracking slows Python code)")
+    parser.add_argument('--trace-out', metavar='PATH',
+                        help="write all recorded spans as Chrome trace-event JSON on exit (implies --profile)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    tracer = get_tracer()
+    profile = args.profile or args.trace_out is not None
+    if profile:
+        tracer.enable()
+    store = None
     try:
-        df = load_dataset()
+        # 创建 results 目录（如果不存在）
+        os.makedirs('./results/', exist_ok=True)
+
+        if profile:
+            tracer.begin_action("Load dataset")
+        df, version = load_dataset(args.data)
         if df is None:
             return
+        schema = None
+        if not args.no_compact:
+            df, schema = compact_dataset(df)
+        if args.incremental:
+            store = incremental_store.IncrementalStore.open(version)
+        if args.strata is not None and args.strata not in df.columns:
+            print(f"Unknown stratification variable '{args.strata}'; ignoring --strata.")
+            args.strata = None
+
+        if args.serve:
+            # 服务模式：数据集常驻内存，通过 HTTP/JSON 接口调用各分析方法
+            analysis_server.run_server(df, schema, args.host, args.port, incremental=store)
+            return
 
-        # 初始化模块
-        inspection = DataInspection(df)
-        analysis = DataAnalysis(df)
-        sentiment = SentimentAnalysis(df)
+        # 初始化模块；分析和情感分析模块在对应菜单第一次被选择时才导入
+        inspection = data_inspection.DataInspection(df, schema=schema, incremental=store)
+        analysis = None
+        sentiment = None
 
         # 打印统计信息
-        stats_list = inspection.generate_statistics()
-        print_statistics(stats_list)
+        stats = inspection.generate_statistics(approximate=args.approximate)
+        print_statistics(stats)
+        print_error_bounds(stats)
 
         while True:
+            print_profile(tracer)  # 上一个操作的分段耗时（仅 --profile）
             choice = main_menu()
+            if profile:
+                tracer.begin_action(f"{choice}. {MENU_ITEMS.get(choice, 'Invalid choice')}")
+
+            if choice in ('2', '3', '4', '5') and analysis is None:
+                analysis = data_analysis.DataAnalysis(df, incremental=store)
+            elif choice == '6' and sentiment is None:
+                sentiment = sentiment_analysis.SentimentAnalysis(df)
 
             if choice == '1':  # 绘制变量分布
                 try:
@@ -88,9 +240,7 @@ def main():
             elif choice == '2':  # ANOVA 或 Kruskal-Wallis
                 try:
                     print("\nAvailable variables for ANOVA:")
-                    for stat in stats_list:
-                        if stat[1] in ['Ratio', 'Interval', 'Ordinal', 'Nominal']:
-                            print(f"{stat[0]}\t{stat[1]}")
+                    print_variables(stats, ['Ratio', 'Interval', 'Ordinal', 'Nominal'])
 
                     # 输入变量
                     cont_var = input("Enter a continuous (interval/ratio) variable:")
@@ -109,15 +259,19 @@ def main():
                         raise ValueError(f"'{cont_var}' must contain numeric values.")
 
                     # **正态性检验**
-                    if not analysis.check_normality(df[cont_var], cont_var):
+                    if not analysis.check_normality(df[cont_var], cont_var, plot=True):
                         print(f"'{cont_var}' is not normally distributed.")
                         print("Performing Kruskal-Wallis Test instead...")
-                        stat, p_value = analysis.perform_kruskal_wallis(cont_var, cat_var)
+                        stat, p_value = analysis.perform_kruskal_wallis(cont_var, cat_var, resamples=args.permutations)
+                        print_stratified(analysis, args.strata, 'perform_kruskal_wallis',
+                                         {'cont_var': cont_var, 'cat_var': cat_var}, combine='fisher')
                     else:
                         print(f"'{cont_var}' normally distributed.")
                         print("Performing ANOVA.")
                         f_stat, p_value = analysis.anova(cont_var, cat_var)
                         print(f"ANOVA : F-statistic={f_stat}, p-value={p_value}")
+                        print_stratified(analysis, args.strata, 'anova', {'cont_var': cont_var, 'cat_var': cat_var},
+                                         combine='fisher')
 
                 except ValueError as e:
                     print(f"Error: {e}")
@@ -127,9 +281,7 @@ def main():
             elif choice == '3':  # t-Test
                 try:
                     print("\nAvailable variables for t-Test:")
-                    for stat in stats_list:
-                        if stat[1] in ['Ratio', 'Interval']:
-                            print(f"{stat[0]}\t{stat[1]}")
+                    print_variables(stats, ['Ratio', 'Interval'])
 
                     # 用户选择变量
                     num_var = input("Enter the numeric variable: ")
@@ -140,19 +292,13 @@ def main():
                         raise ValueError("Invalid variable name(s). Please try again.")
 
                     # 执行 t-Test 或 Mann-Whitney U 测试
-                    stat, p_value = analysis.t_test_or_mannwhitney(num_var, cat_var)
+                    stat, p_value = analysis.t_test_or_mannwhitney(num_var, cat_var, resamples=args.permutations)
                     print(f"\nt-Test/Mann-Whitney U Test Results: stat={stat:.4f}, p-value={p_value:.4f}")
+                    print_stratified(analysis, args.strata, 't_test_or_mannwhitney',
+                                     {'num_var': num_var, 'cat_var': cat_var}, combine='fisher')
 
-                    # 生成并显示箱形图
-                    plt.figure(figsize=(8, 5))
-                    sns.boxplot(x=cat_var, y=num_var, data=df)
-                    plt.title(f'T-Test: {num_var} by {cat_var}')
-                    plt.tight_layout()
-
-                    # 保存并显示图像
+                    # 箱形图已由 t_test_or_mannwhitney 提交渲染，直接显示
                     filepath = f"./results/ttest_boxplot_{num_var}_by_{cat_var}.png"
-                    plt.savefig(filepath)
-                    plt.close()
                     show_image(filepath)  # 显示图像
 
                 except ValueError as e:
@@ -164,9 +310,7 @@ def main():
             elif choice == '4':  # Chi-Square
                 try:
                     print("\nAvailable categorical variables:")
-                    for stat in stats_list:
-                        if stat[1] in ['Nominal', 'Ordinal']:
-                            print(f"{stat[0]}\t{stat[1]}")
+                    print_variables(stats, ['Nominal', 'Ordinal'])
 
                     cat_var1 = input("Enter the first categorical variable: ")
                     cat_var2 = input("Enter the second categorical variable: ")
@@ -174,20 +318,13 @@ def main():
                     if cat_var1 not in df.columns or cat_var2 not in df.columns:
                         raise ValueError("Invalid variable name(s).")
 
-                    stat, p_value = analysis.chi_square_test(cat_var1, cat_var2)
+                    stat, p_value = analysis.chi_square_test(cat_var1, cat_var2, resamples=args.permutations)
                     print(f"\nChi-Square Test Results: Statistic={stat}, p-value={p_value}")
+                    print_stratified(analysis, args.strata, 'chi_square_test',
+                                     {'cat_var1': cat_var1, 'cat_var2': cat_var2}, combine='cmh')
 
-                    # 生成并显示条形图
-                    contingency_table = pd.crosstab(df[cat_var1], df[cat_var2])
-                    plt.figure(figsize=(8, 6))
-                    contingency_table.plot(kind="bar", stacked=True, colormap="viridis", ax=plt.gca())
-                    plt.title(f"Chi-Square Test: {cat_var1} vs {cat_var2}")
-                    plt.tight_layout()
-
-                    # 保存并显示图像
+                    # 条形图已由 chi_square_test 生成，直接显示
                     filepath = f"./results/chi_square_{cat_var1}_vs_{cat_var2}.png"
-                    plt.savefig(filepath)
-                    plt.close()
                     show_image(filepath)  # 显示图像
 
                 except ValueError as e:
@@ -199,18 +336,23 @@ def main():
             elif choice == '5':  # 回归分析
                 try:
                     print("\nAvailable variables for Regression:")
-                    for stat in stats_list:
-                        if stat[1] in ['Ratio', 'Interval']:
-                            print(f"{stat[0]}\t{stat[1]}")
+                    print_variables(stats, ['Ratio', 'Interval'])
 
                     dep_var = input("Enter the dependent variable: ")
-                    ind_var = input("Enter the independent variable: ")
+                    ind_vars = input("Enter the independent variable(s), comma-separated "
+                                     "(or a formula such as 'Age + np.log(Cholesterol) + C(Diet)'): ")
 
-                    if dep_var not in df.columns or ind_var not in df.columns:
+                    if dep_var not in df.columns:
                         raise ValueError("Invalid variable name(s).")
+                    if not any(op in ind_vars for op in '+*:()'):
+                        ind_vars = [var.strip() for var in ind_vars.split(',') if var.strip()]
+                        if not ind_vars or any(var not in df.columns for var in ind_vars):
+                            raise ValueError("Invalid variable name(s).")
 
-                    analysis.regression(dep_var, ind_var)
-                    show_image(f'./results/regression_{dep_var}_by_{ind_var}.png')
+                    fit, filepath = analysis.regression(dep_var, ind_vars)
+                    print_stratified(analysis, args.strata, 'regression', {'dep_var': dep_var, 'ind_vars': ind_vars})
+                    if filepath:
+                        show_image(filepath)
 
                 except ValueError as e:
                     print(f"Error: {e}")
@@ -218,7 +360,7 @@ def main():
             elif choice == '6':  # 使用情感分析模块进行分析
                 try:
                     # 获取并展示文本列
-                    columns = sentiment.get_text_columns()
+                    columns = sentiment.get_text_columns(approximate=args.approximate)
                     if columns.empty:
                         print("No suitable text columns available for sentiment analysis.")
                         continue
@@ -238,16 +380,16 @@ def main():
 
                     if analyzer_choice == '1':
                         scores, sentiments = sentiment.vader_sentiment_analysis(data)
-                        print(f"VADER Sentiment Analysis Complete.\nSample Results: {sentiments[:10]}")
+                        print(f"VADER Sentiment Analysis Complete.\nSample Results: {sentiments[:10].tolist()}")
 
                     elif analyzer_choice == '2':
                         scores, sentiments, subjectivities = sentiment.textblob_sentiment_analysis(data)
-                        print(f"TextBlob Sentiment Analysis Complete.\nSample Results: {sentiments[:10]}")
+                        print(f"TextBlob Sentiment Analysis Complete.\nSample Results: {sentiments[:10].tolist()}")
 
                     elif analyzer_choice == '3':
                         try:
                             scores, sentiments = sentiment.distilbert_sentiment_analysis(data)
-                            print(f"DistilBERT Sentiment Analysis Complete.\nSample Results: {sentiments[:10]}")
+                            print(f"DistilBERT Sentiment Analysis Complete.\nSample Results: {sentiments[:10].tolist()}")
                         except ImportError as e:
                             print(f"Error: {e}. Please ensure the transformers library is installed.")
                     else:
@@ -261,13 +403,25 @@ def main():
 
             elif choice == '7':  # 退出
                 print("Exiting...")
+                if is_loaded('Module_Plot_Rendering.PlotRenderer'):
+                    plot_renderer.get_renderer().shutdown()  # 等待尚未写完的图片
                 break
 
             else:
                 print("Invalid choice. Please try again.")
 
+            if choice in ('2', '3', '4', '5'):
+                print_cache_stats()
+
     except Exception as e:
         print(f"Unexpected error: {e}")
+    finally:
+        if store is not None:
+            store.save()  # 保存累积量，下次运行只需并入新追加的行
+        if profile:
+            print_profile(tracer)
+            if args.trace_out:
+                print(f"Trace written to '{tracer.export_chrome(args.trace_out)}'.")
 
 if __name__ == '__main__':
    main()
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import uuid
+from collections import namedtuple
+
+import pandas as pd
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+CACHE_VERSION = 2
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+# 判断文件是否只是在末尾追加时，比较原有内容开头和结尾的字节数
+EDGE_BYTES = 1024 * 1024
+# 追加的行单独保存为一个 Feather 片段；片段超过这个个数时合并成一个文件
+MAX_PIECES = 8
+
+# source: 源文件的绝对路径；lineage: 缓存分配的谱系 id（文件被改写而不是追加时改变，没有缓存时为 None）；
+# rows: 总行数；appended: 这次新解析的行数（完全重新解析时等于 rows）
+DatasetVersion = namedtuple('DatasetVersion', ['source', 'lineage', 'rows', 'appended'])
+
+
+def cache_paths(source_path):
+    """返回缓存文件与元数据文件的路径（与源文件放在同一目录下）。"""
+    return f"{source_path}.cache.feather", f"{source_path}.cache.json"
+
+
+def _piece_path(source_path, index):
+    return cache_paths(source_path)[0] if index == 0 else f"{source_path}.cache.{index}.feather"
+
+
+def file_hash(path, start=0, end=None):
+    """按块计算文件内容（或 [start, end) 字节范围）的 BLAKE2b 哈希，避免一次性读入内存。"""
+    digest = hashlib.blake2b(digest_size=20)
+    remaining = None if end is None else end - start
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while remaining is None or remaining > 0:
+            block = f.read(HASH_BLOCK_SIZE if remaining is None else min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _edge_hash(path, end):
+    """文件前 end 个字节中开头和结尾各 EDGE_BYTES 的哈希，用于快速判断原有内容是否未被改动。"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(end).encode('ascii'))
+    with open(path, 'rb') as f:
+        digest.update(f.read(min(EDGE_BYTES, end)))
+        f.seek(max(0, end - EDGE_BYTES))
+        digest.update(f.read(end - f.tell()))
+    return digest.hexdigest()
+
+
+def _ends_with_newline(path, end):
+    with open(path, 'rb') as f:
+        f.seek(end - 1)
+        return f.read(1) == b'\n'
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _temp_path(path):
+    """同目录下唯一的临时文件名（含进程号），同时运行的会话不会写到同一个临时文件。"""
+    return f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+def _replace_atomically(path, write):
+    """先用 write(tmp_path) 写入临时文件，再原子替换 path；写入失败时删除临时文件。"""
+    tmp_path = _temp_path(path)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_meta(meta_path, meta):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    _replace_atomically(meta_path, write)
+
+
+def _check(source_path, meta_path, meta):
+    """判断缓存与当前源文件的关系：'valid'（未变）、'appended'（只在末尾追加了内容）或 None（需要重新解析）。
+
+    大小不变时先比较修改时间，时间变化时再按各段字节范围比较内容哈希；文件变大时先比较
+    原有内容的开头和结尾（快速排除），再按各段字节范围哈希全部原有内容，并要求原有内容以换行结束。
+    哈希比解析便宜得多，解析仍然只针对新追加的部分。
+    """
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return None
+    if not all(os.path.exists(_piece_path(source_path, i)) for i in range(len(meta['pieces']))):
+        return None
+    signature = _source_signature(source_path)
+    if signature['size'] > meta['size'] > 0:
+        if (_edge_hash(source_path, meta['size']) == meta['edge_hash']
+                and _ends_with_newline(source_path, meta['size'])
+                and all(file_hash(source_path, r['start'], r['end']) == r['hash'] for r in meta['ranges'])):
+            return 'appended'
+        return None
+    if signature['size'] != meta['size']:
+        return None
+    if signature['mtime_ns'] == meta['mtime_ns']:
+        return 'valid'
+    # 文件被 touch 或复制过，但内容可能没变
+    if any(file_hash(source_path, r['start'], r['end']) != r['hash'] for r in meta['ranges']):
+        return None
+    meta['mtime_ns'] = signature['mtime_ns']
+    try:
+        _write_meta(meta_path, meta)
+    except OSError:
+        pass
+    return 'valid'
+
+
+def _read_cache(cache_path):
+    """以内存映射方式读取 Feather 缓存，数值列尽量不复制。"""
+    table = feather.read_table(cache_path, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def _read_pieces(source_path, meta):
+    """读取所有缓存片段并按顺序拼接；行数与元数据不符时抛出 ValueError。"""
+    frames = [_read_cache(_piece_path(source_path, i)) for i in range(len(meta['pieces']))]
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    if len(df) != meta['rows']:
+        raise ValueError(f"expected {meta['rows']} rows, found {len(df)}")
+    return df
+
+
+def _write_piece(df, path):
+    """把数据写成未压缩的 Feather 文件（未压缩才能直接内存映射）。"""
+    _replace_atomically(path, lambda tmp_path: feather.write_feather(df.reset_index(drop=True), tmp_path,
+                                                                     compression='uncompressed'))
+
+
+def _write_cache(df, source_path, cache_path, meta_path):
+    """把解析好的数据集写成一个缓存片段，分配新的谱系 id，返回该 id。"""
+    _write_piece(df, cache_path)
+    index = 1
+    while os.path.exists(_piece_path(source_path, index)):  # 旧的追加片段已经作废
+        os.remove(_piece_path(source_path, index))
+        index += 1
+    signature = _source_signature(source_path)
+    meta = {'version': CACHE_VERSION, 'lineage': uuid.uuid4().hex, 'rows': len(df), 'pieces': [len(df)],
+            'ranges': [{'start': 0, 'end': signature['size'], 'hash': file_hash(source_path)}],
+            'edge_hash': _edge_hash(source_path, signature['size'])}
+    meta.update(signature)
+    _write_meta(meta_path, meta)
+    return meta['lineage']
+
+
+def _append_rows(df, source_path, meta, meta_path):
+    """只解析上次缓存之后追加的字节，写成新的缓存片段；返回 (全部数据, 新行数)，列类型变化时返回 None。"""
+    signature = _source_signature(source_path)
+    with open(source_path, 'rb') as f:
+        f.seek(meta['size'])
+        try:
+            # 按已缓存数据的列类型解析，类型不符（如数值列出现文本、整数列出现缺失值）时放弃增量解析
+            new = pd.read_csv(f, header=None, names=list(df.columns), dtype=df.dtypes.to_dict())
+        except pd.errors.EmptyDataError:
+            new = df.iloc[:0]
+        except (ValueError, TypeError):
+            return None
+
+    pieces = meta['pieces'] + [len(new)]
+    if len(pieces) > MAX_PIECES:
+        combined = pd.concat([df, new], ignore_index=True)
+        _write_piece(combined, _piece_path(source_path, 0))
+        for index in range(1, len(meta['pieces'])):
+            os.remove(_piece_path(source_path, index))
+        pieces = [len(combined)]
+    else:
+        _write_piece(new, _piece_path(source_path, len(meta['pieces'])))
+
+    meta['ranges'].append({'start': meta['size'], 'end': signature['size'],
+                           'hash': file_hash(source_path, meta['size'], signature['size'])})
+    meta.update(signature, rows=meta['rows'] + len(new), pieces=pieces,
+                edge_hash=_edge_hash(source_path, signature['size']))
+    _write_meta(meta_path, meta)
+    return pd.concat([df, new], ignore_index=True), len(new)
+
+
+def load_csv_versioned(path, use_cache=True):
+    """加载 CSV 数据集，返回 (数据集, DatasetVersion)。
+
+    存在有效的列式缓存时直接映射读取；文件只在末尾追加了行时只解析新追加的部分，
+    并作为新的缓存片段保存；其他情况下解析整个 CSV 并重写缓存。
+    """
+    source = os.path.abspath(path)
+    if not use_cache or feather is None:
+        df = pd.read_csv(path)
+        return df, DatasetVersion(source, None, len(df), len(df))
+
+    cache_path, meta_path = cache_paths(path)
+    meta = _read_meta(meta_path)
+    state = _check(path, meta_path, meta)
+    if state is not None:
+        try:
+            df = _read_pieces(path, meta)
+            if state == 'valid':
+                return df, DatasetVersion(source, meta['lineage'], len(df), 0)
+            result = _append_rows(df, path, meta, meta_path)
+            if result is not None:
+                return result[0], DatasetVersion(source, meta['lineage'], len(result[0]), result[1])
+            print("The appended rows change column types; re-reading the whole dataset.")
+        except Exception as e:
+            print(f"Ignoring unreadable dataset cache '{cache_path}': {e}")
+
+    df = pd.read_csv(path)
+    lineage = None
+    try:
+        lineage = _write_cache(df, path, cache_path, meta_path)
+    except Exception as e:
+        # 目录不可写或列类型无法转换时，仍然返回解析结果
+        print(f"Could not write dataset cache '{cache_path}': {e}")
+    return df, DatasetVersion(source, lineage, len(df), len(df))
+
+
+def load_csv_cached(path, use_cache=True):
+    """加载 CSV 数据集；若存在有效的列式缓存则直接映射读取，否则解析 CSV 并写入缓存。"""
+    return load_csv_versioned(path, use_cache)[0]
@@ -0,0 +1,32 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def column_fingerprint(series):
+    """计算一列数据内容的哈希（包含列名和数据类型，不包含索引）。"""
+    series = pd.Series(series)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{series.name}|{series.dtype}|{len(series)}".encode('utf-8'))
+    hashed = pd.util.hash_pandas_object(series, index=False).to_numpy()
+    digest.update(np.ascontiguousarray(hashed).tobytes())
+    return digest.hexdigest()
+
+
+def frame_fingerprint(df, columns=None):
+    """计算数据集（或其中若干列）的内容指纹。"""
+    columns = list(df.columns) if columns is None else list(columns)
+    digest = hashlib.blake2b(digest_size=16)
+    for col in columns:
+        digest.update(column_fingerprint(df[col]).encode('ascii'))
+    return digest.hexdigest()
+
+
+def params_key(*parts):
+    """把任意参数组合（需可转成字符串）转换成稳定的哈希键。"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
@@ -0,0 +1,104 @@
+import os
+import pickle
+import threading
+
+from Module_Data_Cache.Fingerprint import frame_fingerprint, params_key
+from Module_Tracing.Tracing import trace_span
+
+STORE_VERSION = 2
+
+
+class RebuildNeeded(Exception):
+    """新追加的行无法并入已有的累积量（例如出现了新的分类水平），需要对全部数据重新累积。"""
+
+
+def store_path(source_path):
+    """累积量文件的路径（与数据集缓存放在同一目录下）。"""
+    return f"{source_path}.cache.stats"
+
+
+class IncrementalStore:
+    """按数据集保存可合并的累积统计量，数据集只在末尾追加了新行时只把新行并入。
+
+    每个累积量记录已经并入的行数 rows，refresh() 把数据集中第 rows 行之后的部分并入。
+    数据集缓存为每个源文件分配一个谱系 id，文件被改写（而不是追加）时 id 改变，
+    这里保存的累积量随之全部作废；没有谱系 id 时累积量只保留在内存中。
+    每个累积量单独序列化，第一次用到时才反序列化（不必在启动时导入所有分析模块）。
+    """
+
+    def __init__(self, path=None, lineage=None, entries=None):
+        self.path = path
+        self.lineage = lineage
+        self._entries = entries or {}
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @classmethod
+    def open(cls, version):
+        """打开数据集（load_csv_versioned() 返回的 DatasetVersion）对应的累积量文件。"""
+        if version.lineage is None:
+            return cls()
+        path = store_path(version.source)
+        try:
+            with open(path, 'rb') as f:
+                saved = pickle.load(f)
+            if saved.get('version') == STORE_VERSION and saved.get('lineage') == version.lineage:
+                return cls(path, version.lineage, saved['entries'])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable statistics store '{path}': {e}")
+        return cls(path, version.lineage)
+
+    def refresh(self, key, frame, factory):
+        """返回已并入 frame 全部行的累积量：只并入上次之后新增的行，无法并入时用 factory() 重新累积。"""
+        with self._lock:
+            accumulator = self._entries.get(key)
+            if isinstance(accumulator, bytes):
+                try:
+                    accumulator = pickle.loads(accumulator)
+                except Exception:
+                    accumulator = None
+            if accumulator is None or accumulator.rows > len(frame):
+                accumulator = None
+            elif accumulator.rows < len(frame):
+                with trace_span(f"fold {key[0]}"):
+                    try:
+                        accumulator.update(frame.iloc[accumulator.rows:])
+                    except RebuildNeeded:
+                        accumulator = None
+                self._dirty = True
+            if accumulator is None:
+                with trace_span(f"accumulate {key[0]}"):
+                    accumulator = factory()
+                    accumulator.update(frame)
+                self._dirty = True
+            self._entries[key] = accumulator
+            return accumulator
+
+    def fingerprint(self, df, columns):
+        """数据集若干列的内容指纹：有谱系 id 时由 id 和行数得到（不必哈希整列），否则哈希列内容。"""
+        if self.lineage is None:
+            return frame_fingerprint(df, columns)
+        return params_key(self.lineage, len(df), tuple(columns))
+
+    def save(self):
+        """把累积量写回文件（原子替换）；不能增量更新的累积量不保存。"""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            # 临时文件名含进程号和线程号，同时运行的会话不会写到同一个临时文件
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                entries = {key: accumulator if isinstance(accumulator, bytes)
+                           else pickle.dumps(accumulator, protocol=pickle.HIGHEST_PROTOCOL)
+                           for key, accumulator in self._entries.items() if getattr(accumulator, 'incremental', True)}
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump({'version': STORE_VERSION, 'lineage': self.lineage, 'entries': entries}, f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                print(f"Could not save statistics store '{self.path}': {e}")
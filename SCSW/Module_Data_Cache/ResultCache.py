@@ -0,0 +1,130 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from Module_Data_Cache.Fingerprint import params_key
+
+RESULTS_DIR = './results/'
+DB_NAME = 'results_cache.sqlite'
+
+
+class ResultCache:
+    """统计检验结果的两级缓存：内存中的 LRU + results 目录下的 SQLite。
+
+    键由方法名、参数和所用各列的内容指纹组成，数据一旦变化键就随之改变，旧结果
+    不会再被命中；磁盘上的条目按最近使用时间淘汰，超过 max_disk_entries 时删除最旧的。
+    """
+
+    def __init__(self, db_path=None, max_memory_entries=256, max_disk_entries=5000):
+        self.db_path = db_path or os.path.join(RESULTS_DIR, DB_NAME)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+
+    @property
+    def hits(self):
+        return self.memory_hits + self.disk_hits
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, method TEXT NOT NULL, value BLOB NOT NULL, used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key):
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            with conn:
+                conn.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+            return pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    def _store(self, key, method, value):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                             (key, method, blob, time.time()))
+                # 只保留最近使用的条目
+                conn.execute("DELETE FROM results WHERE key NOT IN "
+                             "(SELECT key FROM results ORDER BY used DESC LIMIT ?)", (self.max_disk_entries,))
+        except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError) as e:
+            print(f"Could not store cached result for {method}: {e}")
+
+    def get_or_compute(self, method, params, fingerprints, compute):
+        """返回缓存中的结果；未命中时调用 compute() 计算并写入两级缓存。"""
+        key = params_key(method, params, fingerprints)
+        with self._lock:
+            if key in self._memory:
+                self.memory_hits += 1
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            value = self._load(key)
+            if value is not None:
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._remember(key, value)
+            self._store(key, method, value)
+        return value
+
+    def stats(self):
+        """返回命中/未命中计数。"""
+        return {'memory_hits': self.memory_hits, 'disk_hits': self.disk_hits, 'misses': self.misses}
+
+    def clear(self):
+        """清空内存和磁盘中的缓存。"""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM results")
+
+    def close(self):
+        """关闭 SQLite 连接（内存中的条目保留，下次访问磁盘时重新连接）。"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_result_cache():
+    """返回各模块共享的默认结果缓存。"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
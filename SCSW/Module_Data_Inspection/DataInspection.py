@@ -1,70 +1,109 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+from Module_Data_Inspection.StatisticsEngine import compute_statistics
+from Module_Data_Inspection.IncrementalStatistics import StatisticsAccumulator
+from Module_Data_Inspection.SketchStatistics import SketchAccumulator
+from Module_Data_Inspection.Schema import infer_schema
+from Module_data_analysis.Summaries import (MAX_BAR_CATEGORIES, MAX_FLIERS, draw_boxplot, draw_histogram,
+                                            draw_value_counts, group_box_summary, histogram_summary,
+                                            is_histogram_column, value_count_summary)
+from Module_Data_Cache.Fingerprint import frame_fingerprint
+from Module_Plot_Rendering.PlotRenderer import get_renderer
+from Module_Tracing.Tracing import trace_span, traced
+
 class DataInspection:
-    def __init__(self, df):
+    def __init__(self, df, renderer=None, schema=None, incremental=None):
+        """schema 为 infer_schema() 的结果；未给出时在第一次需要变量类型时推断一次。
+
+        incremental 为 IncrementalStore 时，统计信息由可合并的累积量刷新（只处理新追加的行）。
+        """
         self.df = df
+        self.renderer = renderer or get_renderer()
+        self._schema = schema
+        self.incremental = incremental
+
+    @property
+    def schema(self):
+        """各列的测量尺度和存储类型（只推断一次）。"""
+        if self._schema is None:
+            with trace_span('infer schema'):
+                self._schema = infer_schema(self.df)
+        return self._schema
+
+    def _fingerprint(self, columns):
+        """图像缓存用的列内容指纹（增量模式下由数据集的谱系 id 和行数得到）。"""
+        with trace_span('fingerprint'):
+            if self.incremental is not None:
+                return self.incremental.fingerprint(self.df, columns)
+            return frame_fingerprint(self.df, columns)
 
+    @traced()
     def show_columns(self):
         """显示数据集中的所有列。"""
         print("\nFollowing are the variables in your dataset:")
         for idx, col in enumerate(self.df.columns, 1):
             print(f"{idx}. {col}")
 
-    def generate_statistics(self):
-        """生成并返回每列的统计信息。"""
-        stats_list = []
-
-        for col in self.df.columns:
-            col_type = "Nominal" if self.df[col].dtype == 'object' else (
-                "Ordinal" if self.df[col].nunique() <= 10 else "Ratio"
-            )
-            if pd.api.types.is_numeric_dtype(self.df[col]):
-                mean = self.df[col].mean()
-                median = self.df[col].median()
-                mode = self.df[col].mode()[0]
-                kurtosis = self.df[col].kurt()
-                skewness = self.df[col].skew()
-                stats_list.append([
-                    col, col_type, f"{mean:.2f} / {median:.2f} / {mode}", 
-                    f"{kurtosis:.2f}", f"{skewness:.2f}"
-                ])
-            else:
-                mode = self.df[col].mode()[0]
-                stats_list.append([col, col_type, mode, "NA", "NA"])
+    @traced()
+    def generate_statistics(self, approximate=False):
+        """生成每列的统计信息，返回以变量名为索引的 DataFrame（类型、均值、中位数、众数、峰度、偏度等）。
+
+        变量类型取自数据模式，不再每次按不同值个数重新判断。approximate 为 True 时由固定大小的
+        可合并摘要估计不同值个数、众数和分位数（表中附加各项的误差界），不对每列做精确的排序和计数。
+        """
+        if approximate:
+            return self._sketch_statistics()
+        if self.incremental is not None:
+            accumulator = self.incremental.refresh(StatisticsAccumulator.key(self.df), self.df,
+                                                   lambda: StatisticsAccumulator(self.df))
+            return accumulator.statistics(self.df, types=self.schema['Type'])
+        return compute_statistics(self.df, types=self.schema['Type'])
 
-        return stats_list
+    def _sketch_statistics(self):
+        """近似统计：模式尚未推断时按估计的不同值个数判断变量类型（不为推断模式再扫描一遍数据）。"""
+        if self.incremental is not None:
+            accumulator = self.incremental.refresh(SketchAccumulator.key(self.df), self.df,
+                                                   lambda: SketchAccumulator(self.df))
+        else:
+            accumulator = SketchAccumulator(self.df)
+            with trace_span('sketch'):
+                accumulator.update(self.df)
+        return accumulator.statistics(self.df, types=None if self._schema is None else self._schema['Type'])
 
+    @traced()
     def plot_boxplot(self, cont_var, cat_var):
-        """生成箱形图并返回保存路径。"""
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.boxplot(x=cat_var, y=cont_var, data=self.df, ax=ax)
-        ax.set_title(f'Boxplot of {cont_var} by {cat_var}')
+        """在后台生成箱形图并返回保存路径（先按组汇总分位数和须线，再由汇总值绘制）。"""
+        def draw(fig, ax):
+            table, fliers = group_box_summary(self.df[cont_var], self.df[cat_var])
+            draw_boxplot(ax, table, fliers, cont_var, cat_var, f'Boxplot of {cont_var} by {cat_var}')
 
         # 保存图像并返回路径
         filepath = f'./results/anova_boxplot_{cont_var}_by_{cat_var}.png'
-        fig.savefig(filepath)
-        plt.close(fig)  # 关闭图形以释放内存
-        print(f"Saved ANOVA boxplot as '{filepath}'.")
+        self.renderer.submit(filepath, 'anova_boxplot', (cont_var, cat_var, MAX_FLIERS),
+                             self._fingerprint([cont_var, cat_var]), draw, figsize=(10, 6))
+        print(f"Rendering ANOVA boxplot to '{filepath}'.")
         return filepath  # 返回图片路径
 
 
-    def plot_distribution(self, column):
-        """绘制指定列的分布图并返回图片的完整路径。"""
-        fig, ax = plt.subplots(figsize=(8, 5))
-        self.df[column].hist(bins=10, edgecolor='black', ax=ax)
-        ax.set_title(f'Distribution of {column}')
-        ax.set_xlabel(column)
-        ax.set_ylabel('Frequency')
-        ax.grid(False)
+    @traced()
+    def plot_distribution(self, column, bins='auto'):
+        """在后台绘制指定列的分布图并返回图片的完整路径（bins 为 np.histogram 的分箱规则或箱数）。
+
+        数值列画直方图；文本、类别和布尔列画各取值的频数条形图（bins 不起作用）。
+        """
+        def draw(fig, ax):
+            data = self.df[column]
+            if is_histogram_column(data):
+                draw_histogram(ax, *histogram_summary(data, bins), column)
+            else:
+                draw_value_counts(ax, *value_count_summary(data), column)
 
         # 保存图像到 ./results/ 目录
         filename = f'distribution_{column}.png'
         filepath = os.path.join('./results/', filename)
-        fig.savefig(filepath)  # 保存图像
-        plt.close(fig)  # 关闭图像
-        print(f"Saved distribution plot as '{filepath}'.")
+        self.renderer.submit(filepath, 'distribution', (column, bins, MAX_BAR_CATEGORIES), self._fingerprint([column]),
+                             draw)
+        print(f"Rendering distribution plot to '{filepath}'.")
 
         return filepath  # 返回图片的完整路径
 
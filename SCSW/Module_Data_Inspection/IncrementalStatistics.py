@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+
+from Module_Data_Inspection.StatisticsEngine import (STAT_COLUMNS, assemble_statistics, label_mode,
+                                                     moment_statistics, restore_integer_modes)
+
+
+class Moments:
+    """若干数值列的可合并矩：样本量、均值、二至四阶中心矩之和，以及最小值和最大值。
+
+    两部分数据的矩按 Chan / Pébay 的成对合并公式合并（而不是累加原始的幂和），
+    合并结果与对全部数据一次计算的结果一致，且不会因大数相减损失精度。
+    """
+
+    def __init__(self, n, mean, m2, m3, m4, low, high):
+        self.n, self.mean, self.m2, self.m3, self.m4, self.low, self.high = n, mean, m2, m3, m4, low, high
+
+    @classmethod
+    def empty(cls, n_cols):
+        zeros = np.zeros(n_cols)
+        return cls(zeros.copy(), zeros.copy(), zeros.copy(), zeros.copy(), zeros.copy(),
+                   np.full(n_cols, np.inf), np.full(n_cols, -np.inf))
+
+    @classmethod
+    def from_block(cls, block):
+        """由二维数值块（每行一列变量，NaN 表示缺失）计算各列的矩。"""
+        valid = ~np.isnan(block)
+        if valid.all():  # 没有缺失值时不必逐元素屏蔽
+            n = np.full(block.shape[0], float(block.shape[1]))
+            mean = block.mean(axis=1) if block.shape[1] else np.zeros(block.shape[0])
+            dev = block - mean[:, None]
+            low = block.min(axis=1, initial=np.inf)
+            high = block.max(axis=1, initial=-np.inf)
+        else:
+            n = valid.sum(axis=1).astype(float)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(n > 0, np.where(valid, block, 0.0).sum(axis=1) / n, 0.0)
+            dev = np.where(valid, block - mean[:, None], 0.0)
+            low = np.where(valid, block, np.inf).min(axis=1, initial=np.inf)
+            high = np.where(valid, block, -np.inf).max(axis=1, initial=-np.inf)
+        dev2 = dev * dev
+        return cls(n, mean, dev2.sum(axis=1), np.einsum('ij,ij->i', dev2, dev),
+                   np.einsum('ij,ij->i', dev2, dev2), low, high)
+
+    def merge(self, other):
+        """返回两部分数据合并后的矩。"""
+        na, nb = self.n, other.n
+        n = na + nb
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            wa, wb = np.where(n > 0, na / n, 0.0), np.where(n > 0, nb / n, 0.0)
+            mean = self.mean + delta * wb
+            m2 = self.m2 + other.m2 + delta ** 2 * na * wb
+            m3 = (self.m3 + other.m3 + delta ** 3 * na * wb * (wa - wb)
+                  + 3 * delta * (wa * other.m2 - wb * self.m2))
+            m4 = (self.m4 + other.m4 + delta ** 4 * na * wb * (wa * wa - wa * wb + wb * wb)
+                  + 6 * delta ** 2 * (wa * wa * other.m2 + wb * wb * self.m2)
+                  + 4 * delta * (wa * other.m3 - wb * self.m3))
+        return Moments(n, mean, m2, m3, m4, np.minimum(self.low, other.low), np.maximum(self.high, other.high))
+
+
+class CoMoments:
+    """若干变量的可合并协矩：观测数、均值向量和中心化的叉积矩阵 Σ (z - 均值)(z - 均值)'。
+
+    与 Moments 相同，两部分按 Chan 的成对公式合并，不累加原始的 Σ z z'，
+    变量的均值远大于其波动时也不会因大数相减损失精度（用于增量回归）。
+    """
+
+    def __init__(self, n, mean, cross):
+        self.n, self.mean, self.cross = n, mean, cross
+
+    @classmethod
+    def empty(cls, n_cols):
+        return cls(0, np.zeros(n_cols), np.zeros((n_cols, n_cols)))
+
+    @classmethod
+    def from_rows(cls, block):
+        """由二维数值块（每行一个观测，不含缺失值）计算协矩。"""
+        block = np.asarray(block, dtype=np.float64)
+        if len(block) == 0:
+            return cls.empty(block.shape[1])
+        mean = block.mean(axis=0)
+        dev = block - mean
+        return cls(len(block), mean, dev.T @ dev)
+
+    def merge(self, other):
+        """返回两部分数据合并后的协矩。"""
+        n = self.n + other.n
+        if self.n == 0 or other.n == 0:
+            return other if self.n == 0 else self
+        delta = other.mean - self.mean
+        return CoMoments(n, self.mean + delta * (other.n / n),
+                         self.cross + other.cross + np.outer(delta, delta) * (self.n * other.n / n))
+
+
+class ValueCounts:
+    """一个数值列中每个不同取值的出现次数（取值有序），用于精确的分位数、众数和不同值个数。"""
+
+    def __init__(self, values=None, counts=None):
+        self.values = np.zeros(0) if values is None else values
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else counts
+
+    @classmethod
+    def from_values(cls, values):
+        values = values[~np.isnan(values)]
+        uniques, counts = np.unique(values, return_counts=True)
+        return cls(uniques, counts.astype(np.int64))
+
+    def merge(self, other):
+        """把另一部分的计数并入：已有的取值直接加计数，新取值按顺序插入（不必重新排序全部取值）。"""
+        pos = np.searchsorted(self.values, other.values)
+        found = pos < len(self.values)
+        found[found] = self.values[pos[found]] == other.values[found]
+        counts = self.counts.copy()
+        counts[pos[found]] += other.counts[found]
+        new = ~found
+        return ValueCounts(np.insert(self.values, pos[new], other.values[new]),
+                           np.insert(counts, pos[new], other.counts[new]))
+
+    def summary(self):
+        """返回 (个数, 不同值个数, 众数, [最小值, Q1, 中位数, Q3, 最大值])；分位数与 np.percentile 的线性插值一致。"""
+        count = int(self.counts.sum())
+        if count == 0:
+            return 0, 0, np.nan, [np.nan] * 5
+        cumulative = np.cumsum(self.counts)
+
+        def at_rank(rank):
+            return self.values[np.searchsorted(cumulative, rank, side='right')]
+
+        quantiles = []
+        for q in (0.0, 0.25, 0.5, 0.75, 1.0):
+            pos = q * (count - 1)
+            lo, hi = at_rank(int(np.floor(pos))), at_rank(int(np.ceil(pos)))
+            quantiles.append(lo + (hi - lo) * (pos - np.floor(pos)))
+        # 并列时 argmax 取第一个，即最小的取值
+        return count, len(self.values), self.values[np.argmax(self.counts)], quantiles
+
+
+class LabelCounts:
+    """一个分类列中每个标签的出现次数（按首次出现的顺序），可以直接相加合并。"""
+
+    def __init__(self, counts=None):
+        self.counts = counts or {}
+
+    @classmethod
+    def from_series(cls, series):
+        codes, uniques = pd.factorize(series)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        return cls({label: int(count) for label, count in zip(uniques, counts)})
+
+    def merge(self, other):
+        counts = dict(self.counts)
+        for label, count in other.counts.items():
+            counts[label] = counts.get(label, 0) + count
+        return LabelCounts(counts)
+
+    def mode(self):
+        return label_mode(list(self.counts), list(self.counts.values()))
+
+
+class StatisticsAccumulator:
+    """generate_statistics() 所需的全部可合并统计量：数值列的矩和取值计数，非数值列的标签计数。
+
+    新追加的行单独汇总后并入，刷新的代价与新行数（及不同取值个数）成正比，结果与
+    compute_statistics() 对全部数据重新计算的结果一致（矩的合并只有浮点舍入上的差别）。
+    """
+
+    def __init__(self, df):
+        self.numeric_cols = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+        self.other_cols = [col for col in df.columns if col not in self.numeric_cols]
+        self.rows = 0
+        self.moments = Moments.empty(len(self.numeric_cols))
+        self.values = {col: ValueCounts() for col in self.numeric_cols}
+        self.labels = {col: LabelCounts() for col in self.other_cols}
+
+    @staticmethod
+    def key(df):
+        """累积量的键：列的顺序和数值 / 非数值划分变化时需要重新累积。"""
+        return ('statistics', tuple(df.columns),
+                tuple(pd.api.types.is_numeric_dtype(df[col]) for col in df.columns))
+
+    def update(self, frame):
+        """并入新追加的行。"""
+        if self.numeric_cols:
+            block = np.ascontiguousarray(frame[self.numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan).T)
+            self.moments = self.moments.merge(Moments.from_block(block))
+            for col, values in zip(self.numeric_cols, block):
+                self.values[col] = self.values[col].merge(ValueCounts.from_values(values))
+        for col in self.other_cols:
+            self.labels[col] = self.labels[col].merge(LabelCounts.from_series(frame[col]))
+        self.rows += len(frame)
+
+    def statistics(self, df, types=None):
+        """返回与 compute_statistics() 相同格式的统计表。"""
+        moments = self.moments
+        with np.errstate(invalid='ignore', divide='ignore'):
+            m2, m3, m4 = (moments.m2 / moments.n, moments.m3 / moments.n, moments.m4 / moments.n)
+        std, skew, kurt = moment_statistics(moments.n, m2, m3, m4)
+
+        rows = []
+        for i, col in enumerate(self.numeric_cols):
+            count, n_unique, mode, (low, q1, median, q3, high) = self.values[col].summary()
+            rows.append({'Count': count, 'Unique': n_unique, 'Mean': moments.mean[i] if count else np.nan,
+                         'Median': median, 'Mode': mode, 'Std': std[i], 'Min': low, 'Q1': q1, 'Q3': q3,
+                         'Max': high, 'Kurtosis': kurt[i], 'Skewness': skew[i]})
+        numeric = restore_integer_modes(pd.DataFrame(rows, index=self.numeric_cols, columns=STAT_COLUMNS[1:]),
+                                        df, self.numeric_cols)
+        other = pd.DataFrame([{'Count': sum(self.labels[col].counts.values()), 'Unique': len(self.labels[col].counts),
+                               'Mode': self.labels[col].mode()} for col in self.other_cols],
+                             index=self.other_cols, columns=STAT_COLUMNS[1:])
+        return assemble_statistics(df, self.numeric_cols, [numeric, other], types)
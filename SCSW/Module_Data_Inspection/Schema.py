@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+from Module_Data_Inspection.StatisticsEngine import classify_variable
+
+# 不同值个数不超过行数的这个比例时，字符串列转换为 category
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+# "a/b" 形式的成对数值列，拆分为两个整数列（新列名）
+SPLIT_COLUMNS = {'Blood Pressure': ('Systolic BP', 'Diastolic BP')}
+SCHEMA_COLUMNS = ['Type', 'Unique', 'Original dtype', 'Storage']
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def split_pair_column(series, names, sep='/'):
+    """把 "158/88" 形式的列拆分为两个最小宽度的整数列；有无法解析的取值时返回 None。
+
+    只解析不同的取值（因子化后逐个解析），再按编码取回每一行，不必对每行做字符串拆分。
+    """
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return None
+    parts = pd.Series(uniques, dtype=object).str.split(sep, n=1, expand=True)
+    if parts.shape[1] != 2:
+        return None
+    halves = [pd.to_numeric(parts[i], errors='coerce').to_numpy(dtype=np.float64) for i in (0, 1)]
+    if any(np.isnan(half).any() or (half % 1 != 0).any() for half in halves):
+        return None
+
+    missing = codes < 0
+    result = {}
+    for name, half in zip(names, halves):
+        column = pd.Series(half.astype(np.int64)[codes], index=series.index)
+        if missing.any():
+            column = column.astype('Int64').mask(missing)
+        result[name] = pd.to_numeric(column, downcast='integer')
+    return pd.DataFrame(result, index=series.index)
+
+
+def _compact_column(series, n_unique):
+    """返回转换为最小安全宽度后的列。"""
+    if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        # 只有所有取值都能被 float32 精确表示时才降为 float32，不损失精度
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        narrowed = values.astype(np.float32)
+        if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+            return series.astype(np.float32)
+        return series
+    if _is_text(series) and n_unique <= CATEGORY_MAX_UNIQUE_RATIO * max(len(series), 1):
+        return series.astype('category')
+    return series
+
+
+def _compact_columns(df, split_columns):
+    """压缩各列，返回 (压缩后的数据集, 每列不同值个数, 每列来自的原始列)；每列的不同值只统计一次。"""
+    columns, n_unique, sources = {}, {}, {}
+    for col in df.columns:
+        series = df[col]
+        if col in split_columns and _is_text(series):
+            parts = split_pair_column(series, split_columns[col])
+            if parts is not None:
+                for name in parts.columns:
+                    columns[name] = parts[name]
+                    n_unique[name] = parts[name].nunique()
+                    sources[name] = col
+                continue
+            print(f"Column '{col}' is not in 'a/b' form; keeping it unchanged.")
+        n_unique[col] = series.nunique()
+        columns[col] = _compact_column(series, n_unique[col])
+        sources[col] = col
+    return pd.DataFrame(columns, index=df.index), n_unique, sources
+
+
+def compact_frame(df, split_columns=SPLIT_COLUMNS):
+    """按推断出的模式压缩数据集，返回新的 DataFrame（原数据不变）。
+
+    低基数字符串列转为 category，整数和浮点数降为能无损保存数据的最小宽度，
+    split_columns 中的 "a/b" 列拆分为两个整数列并放在原来的位置上。
+    """
+    return _compact_columns(df, split_columns)[0]
+
+
+def infer_schema(df, original=None, n_unique=None, sources=None):
+    """为每列推断测量尺度（Nominal / Ordinal / Ratio）和存储类型，返回以变量名为索引的 DataFrame。
+
+    original 为压缩前的数据集时，同时记录每列原来的数据类型（sources 给出拆分出的列来自哪一列）；
+    n_unique 为已知的各列不同值个数。
+    """
+    sources = sources or {}
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        n = series.nunique() if n_unique is None or col not in n_unique else n_unique[col]
+        is_numeric = pd.api.types.is_numeric_dtype(series)
+        source = sources.get(col, col)
+        original_dtype = original[source].dtype if original is not None and source in original.columns else series.dtype
+        rows.append({'Type': classify_variable(is_numeric, n), 'Unique': n,
+                     'Original dtype': str(original_dtype), 'Storage': str(series.dtype)})
+    return pd.DataFrame(rows, index=pd.Index(df.columns, name='Variable'), columns=SCHEMA_COLUMNS)
+
+
+def memory_report(before, after):
+    """比较压缩前后每列占用的内存（MB，包含字符串本身），返回 (每列明细, 压缩前合计, 压缩后合计)。"""
+    before_mb = before.memory_usage(index=False, deep=True) / 1e6
+    after_mb = after.memory_usage(index=False, deep=True) / 1e6
+    report = pd.DataFrame({'Before (MB)': before_mb, 'After (MB)': after_mb})
+    report.index.name = 'Variable'
+    return report, before_mb.sum(), after_mb.sum()
+
+
+def apply_schema(df, split_columns=SPLIT_COLUMNS):
+    """压缩数据集并推断模式，返回 (压缩后的数据集, 模式, 内存报告)。"""
+    compact, n_unique, sources = _compact_columns(df, split_columns)
+    schema = infer_schema(compact, original=df, n_unique=n_unique, sources=sources)
+    return compact, schema, memory_report(df, compact)
@@ -0,0 +1,202 @@
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Module_Data_Inspection.IncrementalStatistics import Moments, ValueCounts
+from Module_Data_Inspection.Sketches import HeavyHitters, HyperLogLog, QuantileSketch, Reservoir, hash_values
+from Module_Data_Inspection.StatisticsEngine import (STAT_COLUMNS, assemble_statistics, moment_statistics,
+                                                     restore_integer_modes)
+
+# 每个分块的行数：各块在线程池中分别建立摘要，再按顺序合并
+CHUNK_ROWS = 1 << 18
+# 整数列一块中的取值跨度不超过这个值时直接按取值计数，不做哈希因子化
+MAX_COUNT_SPAN = 1 << 20
+# 近似统计表在 STAT_COLUMNS 之后附加的误差界
+ERROR_COLUMNS = ['Unique error', 'Quantile rank error', 'Mode count error']
+TEXT_COLUMNS = ['Column Name', 'Average Entry Length', 'Unique Entries', 'Length error', 'Unique error']
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _value_counts(series):
+    """一块数据中某个非数值列的不同取值及其出现次数（缺失值不计）；category 列直接按编码计数。"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        present = counts > 0
+        return np.asarray(series.cat.categories)[present], counts[present]
+    codes, uniques = pd.factorize(series)
+    return np.asarray(uniques, dtype=object), np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+
+def _numeric_counts(values, integer):
+    """一块数据中某个数值列（已去掉 NaN）的不同取值及其出现次数（取值为 float64）。"""
+    if integer and values.size and values.max() - values.min() < MAX_COUNT_SPAN:
+        low = values.min()
+        counts = np.bincount((values - low).astype(np.intp))
+        present = np.flatnonzero(counts)
+        return present + low, counts[present]
+    codes, uniques = pd.factorize(values)
+    return uniques, np.bincount(codes, minlength=len(uniques))
+
+
+class SketchAccumulator:
+    """generate_statistics() 的近似版本：每列只保存固定大小、可以合并的摘要。
+
+    数值列的个数、均值、标准差、最小 / 最大值、偏度和峰度由可合并的矩精确得到；
+    不同值个数用 HyperLogLog、众数用 Misra-Gries 频繁项、中位数和四分位数用 KLL 摘要估计，
+    文本列的平均长度用蓄水池样本估计。数据按 CHUNK_ROWS 行分块，各块在线程池中分别
+    建立摘要再合并，内存占用与行数无关；也可以作为 IncrementalStore 的累积量只并入新行。
+    """
+
+    def __init__(self, df, columns=None, text_lengths=False, seed=0):
+        columns = list(df.columns) if columns is None else list(columns)
+        self.numeric_cols = [col for col in columns if pd.api.types.is_numeric_dtype(df[col])]
+        self.other_cols = [col for col in columns if col not in self.numeric_cols]
+        self.integer_cols = {col for col in self.numeric_cols
+                             if pd.api.types.is_integer_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col])}
+        self.text_cols = [col for col in self.other_cols if text_lengths and _is_text(df[col])]
+        self._reset(seed)
+
+    def _reset(self, seed):
+        """清空摘要并设置随机数种子（列划分不变）。"""
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.moments = Moments.empty(len(self.numeric_cols))
+        self.distinct = {col: HyperLogLog() for col in self.numeric_cols + self.other_cols}
+        self.frequent = {col: HeavyHitters() for col in self.numeric_cols + self.other_cols}
+        self.quantiles = {col: QuantileSketch() for col in self.numeric_cols}
+        self.lengths = {col: Reservoir() for col in self.text_cols}
+
+    @staticmethod
+    def key(df):
+        """累积量的键：列的顺序和数值 / 非数值划分变化时需要重新累积。"""
+        return ('sketch statistics', tuple(df.columns),
+                tuple(pd.api.types.is_numeric_dtype(df[col]) for col in df.columns))
+
+    def _empty(self, seed):
+        """列划分相同、尚未并入任何行的摘要（用于分块建立后再合并）。"""
+        empty = copy.copy(self)
+        empty._reset(seed)
+        return empty
+
+    def _add_chunk(self, frame):
+        """为一块数据建立摘要。"""
+        if self.numeric_cols:
+            block = np.ascontiguousarray(frame[self.numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan).T)
+            moments = Moments.from_block(block)
+            self.moments = self.moments.merge(moments)
+            for col, values, count in zip(self.numeric_cols, block, moments.n):
+                if count < len(values):
+                    values = values[~np.isnan(values)]
+                uniques, counts = _numeric_counts(values, col in self.integer_cols)
+                self._add_counts(col, uniques, counts)
+                # 不同取值较少时按计数并入分位数摘要，代价与不同取值个数成正比
+                if len(uniques) * 8 <= len(values):
+                    self.quantiles[col].update_counts(uniques, counts, self.rng)
+                else:
+                    self.quantiles[col].update(values, self.rng)
+        for col in self.other_cols:
+            self._add_counts(col, *_value_counts(frame[col]))
+        for col in self.text_cols:
+            reservoir = self.lengths[col]
+            positions, keys = reservoir.select(len(frame), self.rng)
+            reservoir.add(keys, frame[col].iloc[positions].str.len().to_numpy(dtype=np.float64, na_value=np.nan),
+                          len(frame))
+        self.rows += len(frame)
+        return self
+
+    def _add_counts(self, col, uniques, counts):
+        # 一块中的每个不同取值只哈希一次
+        self.distinct[col].add_hashes(hash_values(uniques))
+        self.frequent[col] = self.frequent[col].merge(HeavyHitters.from_counts(uniques, counts))
+
+    def merge(self, other):
+        """并入另一部分数据（列划分相同）的摘要。"""
+        self.moments = self.moments.merge(other.moments)
+        for col in self.distinct:
+            self.distinct[col] = self.distinct[col].merge(other.distinct[col])
+            self.frequent[col] = self.frequent[col].merge(other.frequent[col])
+        for col in self.numeric_cols:
+            self.quantiles[col] = self.quantiles[col].merge(other.quantiles[col], self.rng)
+        for col in self.text_cols:
+            self.lengths[col] = self.lengths[col].merge(other.lengths[col])
+        self.rows += other.rows
+        return self
+
+    def update(self, frame, chunk_rows=CHUNK_ROWS, max_workers=None):
+        """并入新的行：按 chunk_rows 分块，在线程池中分别建立摘要（NumPy 和 pandas 的哈希、排序
+        会释放 GIL），再按块的顺序合并。每块使用由本摘要的随机数生成器派生的独立种子。"""
+        chunks = [frame.iloc[start:start + chunk_rows] for start in range(0, len(frame), chunk_rows)]
+        if not chunks:
+            return
+        seeds = self.rng.integers(0, 2 ** 63, size=len(chunks))
+        max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(chunks)))
+        if max_workers == 1:
+            parts = [self._empty(seed)._add_chunk(chunk) for seed, chunk in zip(seeds, chunks)]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sketch') as executor:
+                parts = list(executor.map(lambda seed, chunk: self._empty(seed)._add_chunk(chunk), seeds, chunks))
+        for part in parts:
+            self.merge(part)
+
+    def _unique(self, col):
+        """(不同值个数, 95% 误差界)；频繁项摘要从未裁剪过时计数是精确的。"""
+        if self.frequent[col].exact:
+            return len(self.frequent[col].values), 0
+        distinct = self.distinct[col]
+        estimate = distinct.estimate()
+        return int(round(estimate)), int(np.ceil(2 * distinct.relative_error() * estimate))
+
+    def statistics(self, df, types=None):
+        """返回与 compute_statistics() 相同格式的统计表，并在末尾附加 ERROR_COLUMNS：
+        Unique error 为不同值个数的 95% 误差界，Quantile rank error 为中位数和四分位数的归一化秩误差
+        （99% 置信度），Mode count error 为众数出现次数最多被低估的行数；三者为 0 时对应的结果是精确的。"""
+        moments = self.moments
+        with np.errstate(invalid='ignore', divide='ignore'):
+            m2, m3, m4 = (moments.m2 / moments.n, moments.m3 / moments.n, moments.m4 / moments.n)
+        std, skew, kurt = moment_statistics(moments.n, m2, m3, m4)
+
+        rows, errors = [], {}
+        for i, col in enumerate(self.numeric_cols):
+            count = int(moments.n[i])
+            unique, unique_error = self._unique(col)
+            frequent = self.frequent[col]
+            if frequent.exact:  # 保存了全部取值的计数，分位数也是精确的
+                order = np.argsort(frequent.values)
+                _, _, _, (_, q1, median, q3, _) = ValueCounts(frequent.values[order], frequent.counts[order]).summary()
+                rank_error = 0.0
+            else:
+                q1, median, q3 = self.quantiles[col].quantiles([0.25, 0.5, 0.75])
+                rank_error = self.quantiles[col].rank_error()
+            rows.append({'Count': count, 'Unique': unique, 'Mean': moments.mean[i] if count else np.nan,
+                         'Median': median, 'Mode': frequent.mode(), 'Std': std[i],
+                         'Min': moments.low[i] if count else np.nan, 'Q1': q1, 'Q3': q3,
+                         'Max': moments.high[i] if count else np.nan, 'Kurtosis': kurt[i], 'Skewness': skew[i]})
+            errors[col] = [unique_error, rank_error, frequent.error]
+        numeric = restore_integer_modes(pd.DataFrame(rows, index=self.numeric_cols, columns=STAT_COLUMNS[1:]),
+                                        df, self.numeric_cols)
+
+        rows = []
+        for col in self.other_cols:
+            unique, unique_error = self._unique(col)
+            rows.append({'Count': self.frequent[col].total, 'Unique': unique, 'Mode': self.frequent[col].mode()})
+            errors[col] = [unique_error, np.nan, self.frequent[col].error]
+        other = pd.DataFrame(rows, index=self.other_cols, columns=STAT_COLUMNS[1:])
+
+        result = assemble_statistics(df, self.numeric_cols, [numeric, other], types)
+        return result.join(pd.DataFrame.from_dict(errors, orient='index', columns=ERROR_COLUMNS))
+
+    def text_columns(self):
+        """文本列的 (列名, 平均长度, 不同值个数, 平均长度的 95% 误差界, 不同值个数的 95% 误差界)。"""
+        rows = []
+        for col in self.text_cols:
+            mean, mean_error = self.lengths[col].mean()
+            unique, unique_error = self._unique(col)
+            rows.append([col, mean, unique, mean_error, unique_error])
+        return pd.DataFrame(rows, columns=TEXT_COLUMNS)
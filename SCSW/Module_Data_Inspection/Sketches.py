@@ -0,0 +1,244 @@
+import numpy as np
+import pandas as pd
+
+from Module_Data_Inspection.StatisticsEngine import label_mode
+
+# HyperLogLog 的寄存器个数为 2 ** HLL_PRECISION（每列 16 KB，相对标准误差约 0.81%）
+HLL_PRECISION = 14
+# Misra-Gries 频繁项摘要保留的计数器个数；不同取值不超过这个个数时计数是精确的
+HEAVY_HITTERS = 1024
+# KLL 分位数摘要最高层的容量
+KLL_K = 200
+# 文本长度蓄水池样本的大小
+RESERVOIR_SIZE = 10_000
+
+
+def hash_values(uniques):
+    """把（互不相同的）取值映射为 64 位哈希；同一取值总是得到同一哈希。取值已经去重，不必再因子化。"""
+    return pd.util.hash_array(np.asarray(uniques), categorize=False)
+
+
+def _bit_length(x):
+    """uint64 数组中每个数的二进制位数（0 的位数为 0）；高低 32 位分别用 frexp 求，结果是精确的。"""
+    high = (x >> np.uint64(32)).astype(np.float64)
+    low = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class HyperLogLog:
+    """不同值个数的 HyperLogLog 估计：寄存器逐个取最大值即可合并，估计的相对标准误差为 1.04 / √m。"""
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add_hashes(self, hashes):
+        """并入一组取值的 64 位哈希：高 precision 位选择寄存器，其余位的前导零个数 + 1 与寄存器取最大。"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes << np.uint64(p)
+        rank = np.where(rest == 0, 64 - p + 1, 64 - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def estimate(self):
+        """不同值个数的估计；较小的基数用线性计数修正（64 位哈希不需要大基数修正）。"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            return m * np.log(m / zeros)
+        return raw
+
+    def relative_error(self):
+        """估计的相对标准误差。"""
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+class HeavyHitters:
+    """Misra-Gries 频繁项摘要：最多保留 capacity 个取值的计数，可以合并。
+
+    每个保留取值的真实次数在 [计数, 计数 + error] 之间，未保留取值的真实次数不超过 error，
+    且 error ≤ total / (capacity + 1)；从未裁剪过（error 为 0）时所有计数都是精确的。
+    """
+
+    def __init__(self, capacity=HEAVY_HITTERS, values=None, counts=None, error=0, total=0):
+        self.capacity = capacity
+        self.values = np.zeros(0) if values is None else values
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else counts
+        self.error = error
+        self.total = total
+
+    @classmethod
+    def from_counts(cls, values, counts, capacity=HEAVY_HITTERS):
+        """由一块数据中的不同取值及其出现次数建立摘要。"""
+        return cls(capacity, values, np.asarray(counts, dtype=np.int64), 0, int(np.sum(counts)))._prune()
+
+    def _prune(self):
+        """计数器超过 capacity 个时，所有计数减去第 capacity + 1 大的计数，丢弃不再为正的取值。"""
+        if len(self.counts) > self.capacity:
+            threshold = np.partition(self.counts, -(self.capacity + 1))[-(self.capacity + 1)]
+            keep = self.counts > threshold
+            self.values, self.counts = self.values[keep], self.counts[keep] - threshold
+            self.error += int(threshold)
+        return self
+
+    def merge(self, other):
+        """计数按取值相加后再裁剪，误差上界相加（Agarwal 等人的可合并摘要）。"""
+        if len(self.values) == 0 or len(other.values) == 0:
+            values = other.values if len(self.values) == 0 else self.values
+            counts = other.counts if len(self.values) == 0 else self.counts
+        else:
+            codes, uniques = pd.factorize(np.concatenate([self.values, other.values]))
+            values = np.asarray(uniques)
+            counts = np.bincount(codes, weights=np.concatenate([self.counts, other.counts]),
+                                 minlength=len(uniques)).astype(np.int64)
+        return HeavyHitters(self.capacity, values, counts, self.error + other.error,
+                            self.total + other.total)._prune()
+
+    @property
+    def exact(self):
+        return self.error == 0
+
+    def mode(self):
+        """计数最多的取值（并列规则与 label_mode() 相同）。"""
+        return label_mode(self.values, self.counts)
+
+
+class QuantileSketch:
+    """KLL 分位数摘要：第 h 层的每个元素代表 2^h 个原始取值，可以合并。
+
+    一层超过容量时排序后随机取奇数位或偶数位的元素升入上一层；最高层容量为 k，
+    往下每层乘以 2/3。分位数的秩误差与数据量无关，只取决于 k。
+    """
+
+    def __init__(self, k=KLL_K, levels=None):
+        self.k = k
+        self.levels = levels or [np.zeros(0)]
+
+    def _capacity(self, level):
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - level))))
+
+    def _replace_level(self, level, items):
+        """替换第 level 层的元素，并确保上一层存在。"""
+        self.levels[level] = items
+        if level + 1 == len(self.levels):
+            self.levels.append(np.zeros(0))
+
+    def update(self, values, rng):
+        """并入一组取值（不含 NaN）。
+
+        每层的元素按 k 个一块分块排序、块内随机取一半升入上一层，代价为 O(n log k)，
+        不需要对整块数据排序；最后再按各层容量压缩。
+        """
+        block = self.k - self.k % 2
+        items, level = np.concatenate([self.levels[0], np.asarray(values, dtype=np.float64)]), 0
+        while len(items) > block:
+            n_blocks = len(items) // block
+            blocks = np.sort(items[:n_blocks * block].reshape(n_blocks, block), axis=1)
+            odd = rng.integers(0, 2, n_blocks).astype(bool)[:, None]
+            promoted = np.where(odd, blocks[:, 1::2], blocks[:, 0::2]).ravel()
+            self._replace_level(level, items[n_blocks * block:])
+            level += 1
+            items = np.concatenate([self.levels[level], promoted])
+        self.levels[level] = items
+        self._compress(rng)
+
+    def update_counts(self, values, counts, rng):
+        """并入一组不同取值及其出现次数：次数按二进制拆开，第 h 位为 1 的取值直接放入第 h 层
+        （权重恰好为 2^h，不引入误差），代价与不同取值个数成正比，适合低基数的列。"""
+        counts = np.asarray(counts, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        for h in range(int(counts.max()).bit_length() if counts.size else 0):
+            while h >= len(self.levels):
+                self.levels.append(np.zeros(0))
+            self.levels[h] = np.concatenate([self.levels[h], values[(counts >> h) & 1 == 1]])
+        self._compress(rng)
+
+    def _compress(self, rng):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                items = np.sort(items)
+                kept = items[:0]
+                if len(items) % 2:  # 个数为奇数时随机留下最小或最大的一个
+                    kept, items = (items[:1], items[1:]) if rng.integers(0, 2) else (items[-1:], items[:-1])
+                promoted = items[rng.integers(0, 2)::2]
+                self._replace_level(level, kept)
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def merge(self, other, rng):
+        n = max(len(self.levels), len(other.levels))
+        levels = [np.concatenate([a[i] if i < len(a) else np.zeros(0) for a in (self.levels, other.levels)])
+                  for i in range(n)]
+        merged = QuantileSketch(self.k, levels)
+        merged._compress(rng)
+        return merged
+
+    def quantiles(self, qs):
+        """按加权秩返回各分位数（取累计权重首次达到 q × 总数的元素）。"""
+        items = np.concatenate(self.levels)
+        if items.size == 0:
+            return [np.nan] * len(qs)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side='left')
+        return list(items[np.minimum(positions, len(items) - 1)])
+
+    def rank_error(self):
+        """单个分位数的归一化秩误差（99% 置信度，Apache DataSketches 对 KLL 的经验公式）。"""
+        return 2.296 / self.k ** 0.9723
+
+
+class Reservoir:
+    """大小为 size 的均匀随机样本（bottom-k：每行一个随机键，保留键最小的 size 行），可以合并。"""
+
+    def __init__(self, size=RESERVOIR_SIZE, keys=None, values=None, seen=0):
+        self.size = size
+        self.keys = np.zeros(0) if keys is None else keys
+        self.values = np.zeros(0) if values is None else values
+        self.seen = seen
+
+    def select(self, n, rng):
+        """为一块 n 行的数据抽取随机键，返回 (入选行的位置, 它们的键)；调用方只需计算入选行的取值。"""
+        keys = rng.random(n)
+        if n <= self.size:
+            return np.arange(n), keys
+        positions = np.argpartition(keys, self.size - 1)[:self.size]
+        return positions, keys[positions]
+
+    def add(self, keys, values, n):
+        """并入一块数据（共 n 行）中入选行的键和取值。"""
+        self.keys = np.concatenate([self.keys, keys])
+        self.values = np.concatenate([self.values, np.asarray(values, dtype=np.float64)])
+        self.seen += n
+        if len(self.keys) > self.size:
+            keep = np.argpartition(self.keys, self.size - 1)[:self.size]
+            self.keys, self.values = self.keys[keep], self.values[keep]
+
+    def merge(self, other):
+        merged = Reservoir(self.size, self.keys, self.values, self.seen)
+        merged.add(other.keys, other.values, other.seen)
+        return merged
+
+    def mean(self):
+        """样本均值（跳过 NaN）及其 95% 置信区间的半宽（含有限总体修正；样本即全部数据时为 0，
+        抽样的非缺失值少于两个、无法估计误差时为 NaN）。"""
+        values = self.values[~np.isnan(self.values)]
+        if values.size == 0:
+            return np.nan, np.nan
+        if len(self.values) >= self.seen:
+            return float(values.mean()), 0.0
+        if values.size < 2:
+            return float(values.mean()), np.nan
+        correction = np.sqrt(max(0.0, 1 - len(self.values) / self.seen))
+        return float(values.mean()), float(1.96 * values.std(ddof=1) / np.sqrt(values.size) * correction)
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+STAT_COLUMNS = ['Type', 'Count', 'Unique', 'Mean', 'Median', 'Mode', 'Std',
+                'Min', 'Q1', 'Q3', 'Max', 'Kurtosis', 'Skewness']
+
+# 每次排序的数值块最多包含的元素个数（列数 × 行数），用于限制内存占用
+BLOCK_ELEMENTS = 16_000_000
+
+
+def classify_variable(is_numeric, n_unique):
+    """根据是否为数值型及不同值个数判断变量类型。"""
+    if not is_numeric:
+        return "Nominal"
+    return "Ordinal" if n_unique <= 10 else "Ratio"
+
+
+def moment_statistics(n, m2, m3, m4):
+    """由样本量和中心矩（m_k = Σ(x - mean)^k / n）计算标准差、偏度和峰度（与 pandas 一致的无偏修正）。"""
+    n = np.asarray(n, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(m2 * n / (n - 1))
+        skew = np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5
+        kurt = ((n + 1) * (m4 / m2 ** 2 - 3) + 6) * (n - 1) / ((n - 2) * (n - 3))
+        # 常数列的偏度、峰度记为 0，与 pandas 一致
+        skew = np.where(n < 3, np.nan, np.where(m2 == 0, 0.0, skew))
+        kurt = np.where(n < 4, np.nan, np.where(m2 == 0, 0.0, kurt))
+    return std, skew, kurt
+
+
+def label_mode(labels, counts):
+    """返回计数最多的标签；并列时取最小的（无法比较时取最先出现的），与 pandas mode()[0] 一致。"""
+    if len(labels) == 0:
+        return np.nan
+    counts = np.asarray(counts)
+    # 最大计数只求一次，用布尔掩码选出并列的标签（逐个比较 counts.max() 是 O(U²)）
+    candidates = [labels[i] for i in np.flatnonzero(counts == counts.max())]
+    try:
+        return min(candidates)
+    except TypeError:
+        return candidates[0]
+
+
+def _numeric_block_statistics(block):
+    """对一个二维数值块（每行一列变量）一次性计算所有统计量。"""
+    n_cols, n_rows = block.shape
+    # 排序一次，分位数、不同值个数和众数都从排序结果中得到（NaN 排在每行末尾）
+    ordered = np.sort(block, axis=1)
+    count = n_rows - np.isnan(ordered).sum(axis=1)
+    has_nan = (count < n_rows).any()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # 矩（与 pandas 一致：偏度、峰度均为无偏修正后的样本估计）
+        total = np.nansum(ordered, axis=1) if has_nan else ordered.sum(axis=1)
+        mean = total / count
+        dev = ordered - mean[:, None]
+        if has_nan:
+            dev[np.isnan(dev)] = 0.0
+        dev2 = dev * dev
+        m2 = dev2.sum(axis=1) / count
+        m3 = np.einsum('ij,ij->i', dev2, dev) / count
+        m4 = np.einsum('ij,ij->i', dev2, dev2) / count
+        del dev, dev2
+    std, skew, kurt = moment_statistics(count, m2, m3, m4)
+
+    def quantile(q):
+        pos = q * np.maximum(count - 1, 0)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.ceil(pos).astype(np.intp)
+        lo_val = ordered[np.arange(n_cols), lo]
+        hi_val = ordered[np.arange(n_cols), hi]
+        result = lo_val + (hi_val - lo_val) * (pos - lo)
+        return np.where(count > 0, result, np.nan)
+
+    # 在展平的排序结果上找出每个值连续段的起点
+    flat = ordered.ravel()
+    starts = np.empty(flat.size, dtype=bool)
+    starts[0] = True
+    np.not_equal(flat[1:], flat[:-1], out=starts[1:])
+    starts[::n_rows] = True
+    if has_nan:
+        starts &= ~np.isnan(flat)
+    start_pos = np.flatnonzero(starts)
+    start_row = start_pos // n_rows
+    n_unique = np.bincount(start_row, minlength=n_cols)
+
+    # 众数：每个值的连续段长度，取最长段；并列时取最小值，与 pandas mode()[0] 一致
+    end_pos = np.append(start_pos[1:], flat.size)
+    end_pos = np.minimum(end_pos, start_row * n_rows + count[start_row])
+    run_length = end_pos - start_pos
+    mode = np.full(n_cols, np.nan)
+    non_empty = n_unique > 0
+    if start_pos.size:
+        offsets = np.concatenate(([0], np.cumsum(n_unique)[:-1]))[non_empty]
+        longest = np.maximum.reduceat(run_length, offsets)
+        # 每行第一个达到最长段长度的位置
+        is_longest = run_length == np.repeat(longest, n_unique[non_empty])
+        first = np.flatnonzero(is_longest)
+        first_row = start_row[first]
+        keep = np.ones(first.size, dtype=bool)
+        keep[1:] = first_row[1:] != first_row[:-1]
+        mode[first_row[keep]] = flat[start_pos[first[keep]]]
+
+    return {
+        'Count': count, 'Unique': n_unique, 'Mean': mean, 'Median': quantile(0.5),
+        'Mode': mode, 'Std': std, 'Min': quantile(0.0), 'Q1': quantile(0.25),
+        'Q3': quantile(0.75), 'Max': quantile(1.0), 'Kurtosis': kurt, 'Skewness': skew,
+    }
+
+
+def numeric_statistics(df, columns):
+    """按列块计算数值列的统计量，返回以变量名为索引的 DataFrame。"""
+    if not columns:
+        return pd.DataFrame(columns=STAT_COLUMNS[1:])
+    step = max(1, BLOCK_ELEMENTS // max(len(df), 1))
+    parts = []
+    for start in range(0, len(columns), step):
+        chunk = columns[start:start + step]
+        block = np.ascontiguousarray(df[chunk].to_numpy(dtype=np.float64, na_value=np.nan).T)
+        parts.append(pd.DataFrame(_numeric_block_statistics(block), index=chunk))
+    return restore_integer_modes(pd.concat(parts), df, columns)
+
+
+def restore_integer_modes(result, df, columns):
+    """把整数列的众数还原为整数，便于显示。"""
+    modes = result['Mode'].astype(object)
+    for col in columns:
+        if pd.api.types.is_integer_dtype(df[col]) and pd.notna(modes[col]):
+            modes[col] = int(modes[col])
+    result['Mode'] = modes
+    return result
+
+
+def categorical_statistics(df, columns):
+    """对非数值列做一次因子化，由计数得到不同值个数和众数。"""
+    rows = []
+    for col in columns:
+        codes, uniques = pd.factorize(df[col])
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        rows.append({'Count': int(counts.sum()), 'Unique': len(uniques), 'Mode': label_mode(uniques, counts)})
+    return pd.DataFrame(rows, index=columns, columns=STAT_COLUMNS[1:])
+
+
+def compute_statistics(df, types=None):
+    """计算所有列的统计信息：数值列一次向量化计算，非数值列单独计算。
+
+    types 为各列的测量尺度（例如 infer_schema() 结果中的 'Type' 列）；未给出时按不同值个数判断。
+    """
+    numeric_cols = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+    other_cols = [col for col in df.columns if col not in numeric_cols]
+    return assemble_statistics(df, numeric_cols, [numeric_statistics(df, numeric_cols),
+                                                  categorical_statistics(df, other_cols)], types)
+
+
+def assemble_statistics(df, numeric_cols, parts, types=None):
+    """把数值列和非数值列的统计结果按列顺序合并成一张表，并填入变量类型。"""
+    result = pd.concat(parts).reindex(df.columns)
+    if types is None:
+        result['Type'] = [classify_variable(col in numeric_cols, n_unique)
+                          for col, n_unique in result['Unique'].items()]
+    else:
+        result['Type'] = pd.Series(types).reindex(df.columns).to_numpy()
+    result.index.name = 'Variable'
+    return result[STAT_COLUMNS]
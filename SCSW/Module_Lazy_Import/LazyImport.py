@@ -0,0 +1,54 @@
+import importlib
+import sys
+import threading
+import types
+
+from Module_Tracing.Tracing import trace_span
+
+_lock = threading.RLock()
+_proxies = {}
+
+
+class LazyModule(types.ModuleType):
+    """模块代理：第一次访问属性时才真正导入模块，之后直接转发到已导入的模块。"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            # 后台绘图线程也可能触发导入，加锁保证只导入一次
+            with _lock:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    with trace_span(f"import {self.__name__}"):
+                        module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """返回模块 name 的延迟导入代理；模块已导入时直接返回模块本身。"""
+    if name in sys.modules:
+        return sys.modules[name]
+    with _lock:
+        if name not in _proxies:
+            _proxies[name] = LazyModule(name)
+        return _proxies[name]
+
+
+def is_loaded(name):
+    """判断模块是否已经真正导入。"""
+    return name in sys.modules
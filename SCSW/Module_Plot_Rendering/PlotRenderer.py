@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from matplotlib.figure import Figure
+
+from Module_Data_Cache.Fingerprint import params_key
+from Module_Tracing.Tracing import get_tracer, trace_span
+
+RESULTS_DIR = './results/'
+MANIFEST_NAME = 'figure_cache.json'
+
+
+class PlotRenderer:
+    """在后台线程中渲染并保存图像。
+
+    每张图使用独立的 matplotlib Figure（Agg 渲染，不经过 pyplot），因此不会影响
+    主线程中用于显示图片的交互式后端。图像按 (数据指纹, 图类型, 参数) 计算键值，
+    若相同的图已经存在于 results 目录中，则直接复用，不再渲染。
+    """
+
+    def __init__(self, results_dir=RESULTS_DIR, max_workers=1):
+        self.results_dir = results_dir
+        self.manifest_path = os.path.join(results_dir, MANIFEST_NAME)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='plot-render')
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(self.results_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def submit(self, filepath, kind, params, fingerprint, draw, figsize=(8, 5)):
+        """提交一张图的渲染任务，立即返回 Future（结果为图片路径）。
+
+        draw(fig, ax) 负责在给定的坐标轴上绘图；标题等也应在 draw 中设置。
+        """
+        filepath = os.path.normpath(filepath)
+        key = params_key(fingerprint, kind, params, figsize)
+        with self._lock:
+            pending = self._pending.get(filepath)
+            if pending is not None and pending.key == key and not (pending.done() and pending.exception()):
+                return pending
+            if self._manifest.get(filepath) == key and os.path.exists(filepath):
+                future = Future()
+                future.set_result(filepath)
+                return future
+            # 渲染在后台线程中进行，按提交时的菜单操作归类其计时
+            future = self._executor.submit(self._render, filepath, key, draw, figsize, get_tracer().action_id)
+            future.key = key
+            self._pending[filepath] = future
+        return future
+
+    def _render(self, filepath, key, draw, figsize, action_id=None):
+        with trace_span(f"render {os.path.basename(filepath)}", action_id):
+            with trace_span('draw'):
+                fig = Figure(figsize=figsize)
+                ax = fig.add_subplot()
+                draw(fig, ax)
+                fig.tight_layout()
+
+            # 先写入临时文件再替换，避免读到写了一半的图片
+            with trace_span('savefig'):
+                os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+                root, ext = os.path.splitext(filepath)
+                tmp_path = f"{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}"
+                fig.savefig(tmp_path, format=ext.lstrip('.') or 'png')
+                os.replace(tmp_path, filepath)
+
+        with self._lock:
+            self._manifest[filepath] = key
+            self._save_manifest()
+            if self._pending.get(filepath) is not None and self._pending[filepath].key == key:
+                del self._pending[filepath]
+        return filepath
+
+    def wait(self, filepath=None):
+        """等待指定图片（或全部未完成的图片）渲染完成。渲染出错时抛出异常。"""
+        with self._lock:
+            if filepath is None:
+                futures = list(self._pending.values())
+            else:
+                future = self._pending.get(os.path.normpath(filepath))
+                futures = [future] if future is not None else []
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        """等待所有渲染任务结束并关闭线程池。"""
+        self._executor.shutdown(wait=True)
+
+
+_default_renderer = None
+_default_lock = threading.Lock()
+
+
+def get_renderer():
+    """返回各模块共享的默认渲染器。"""
+    global _default_renderer
+    with _default_lock:
+        if _default_renderer is None:
+            _default_renderer = PlotRenderer()
+        return _default_renderer
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from Module_Tracing.Tracing import trace_span
+
+DEFAULT_MODEL = 'distilbert-base-uncased-finetuned-sst-2-english'
+DEFAULT_BATCH_SIZE = 64
+MAX_LENGTH = 512
+# Scores kept in the per-engine cache (least recently used ones are dropped first)
+MAX_CACHED_SCORES = 100_000
+
+
+def text_key(text):
+    """Returns the cache key of a text (a hash, so long texts are not kept twice)."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class DistilBertEngine:
+    """Persistent DistilBERT sentiment classifier for CPU inference.
+
+    The model is loaded on first use and kept for the life of the process. Texts are
+    de-duplicated, looked up in a bounded LRU score cache keyed by text hash, and the
+    remaining ones are tokenized once, sorted by token length and run in padded batches
+    so each batch carries as little padding as possible. cache_size=None keeps every score.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, model_name=DEFAULT_MODEL, quantize=False, num_threads=None,
+                 cache_size=MAX_CACHED_SCORES):
+        self.model_name = model_name
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self.cache_size = cache_size
+        self._model = None
+        self._tokenizer = None
+        self._id2label = None
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, model_name=DEFAULT_MODEL, quantize=False, num_threads=None):
+        """Returns the shared engine for the given model and quantization mode."""
+        key = (model_name, quantize)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(model_name, quantize, num_threads)
+            return cls._instances[key]
+
+    def _load(self):
+        """Loads tokenizer and model (once); optionally applies dynamic int8 quantization."""
+        if self._model is not None:
+            return
+        try:
+            import torch
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        except ImportError:
+            raise ImportError("Transformers library not installed.")
+
+        # Use the physical cores for intra-op parallelism; inter-op threads only add contention here
+        torch.set_num_threads(self.num_threads or max(1, (os.cpu_count() or 2) // 2))
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        model.eval()
+        if self.quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._tokenizer = tokenizer
+        self._model = model
+        self._id2label = np.array([model.config.id2label[i] for i in range(model.config.num_labels)])
+
+    def _infer(self, texts, batch_size):
+        """Runs the model over texts in length-sorted batches; returns (scores, labels)."""
+        import torch
+
+        encoded = self._tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+        input_ids = encoded['input_ids']
+        order = np.argsort([len(ids) for ids in input_ids], kind='stable')
+
+        scores = np.empty(len(texts), dtype=np.float64)
+        label_ids = np.empty(len(texts), dtype=np.intp)
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                index = order[start:start + batch_size]
+                batch = self._tokenizer.pad(
+                    {'input_ids': [input_ids[i] for i in index],
+                     'attention_mask': [encoded['attention_mask'][i] for i in index]},
+                    padding=True, return_tensors='pt')
+                probs = torch.softmax(self._model(**batch).logits, dim=-1)
+                best = probs.max(dim=-1)
+                scores[index] = best.values.numpy()
+                label_ids[index] = best.indices.numpy()
+        return scores, self._id2label[label_ids]
+
+    def predict(self, data, batch_size=DEFAULT_BATCH_SIZE):
+        """Scores a text Series; returns (scores, labels) as Series aligned with `data`."""
+        texts = pd.Series(data).fillna('').astype(str)
+        codes, uniques = pd.factorize(texts)
+        keys = [text_key(text) for text in uniques]
+
+        with self._lock:
+            with trace_span('load model'):
+                self._load()
+            unique_scores = np.empty(len(keys), dtype=np.float64)
+            unique_labels = np.empty(len(keys), dtype=object)
+            missing = []
+            for i, key in enumerate(keys):
+                cached = self._scores.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._scores.move_to_end(key)
+                    unique_scores[i], unique_labels[i] = cached
+            if missing:
+                with trace_span('inference'):
+                    scores, labels = self._infer([uniques[i] for i in missing], batch_size)
+                unique_scores[missing] = scores
+                unique_labels[missing] = labels
+                for i, score, label in zip(missing, scores, labels):
+                    self._scores[keys[i]] = (score, label)
+            while self.cache_size is not None and len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+
+        return (pd.Series(unique_scores[codes], index=texts.index, name='score'),
+                pd.Series(unique_labels[codes], index=texts.index, name='label'))
+
+    def clear_cache(self):
+        """Drops all cached scores."""
+        with self._lock:
+            self._scores.clear()
@@ -1,64 +1,162 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
-try:
-    from transformers import pipeline
-except ImportError:
-    pipeline = None
+from Module_Data_Inspection.SketchStatistics import SketchAccumulator
+from Module_Lazy_Import.LazyImport import lazy_import
+from Module_Tracing.Tracing import trace_span, traced
+from Module_SentimentAnalysis.DistilBertEngine import DEFAULT_BATCH_SIZE, DistilBertEngine
+from Module_SentimentAnalysis.SentimentStream import DEFAULT_CHUNK_SIZE, stream_sentiment
+
+# Analyzer libraries are imported on first use
+vader = lazy_import('vaderSentiment.vaderSentiment')
+textblob = lazy_import('textblob')
+
+# Number of distinct texts scored per VADER task
+VADER_CHUNK_SIZE = 5000
+SENTIMENT_LABELS = np.array(['negative', 'neutral', 'positive'])
+
+# One analyzer per worker process, created by the pool initializer
+_vader_analyzer = None
+
+
+def _init_vader_worker():
+    """Creates the SentimentIntensityAnalyzer used by this worker process."""
+    global _vader_analyzer
+    _vader_analyzer = vader.SentimentIntensityAnalyzer()
+
+
+def _vader_compound_scores(texts):
+    """Returns the VADER compound score of each text as a NumPy array."""
+    analyzer = _vader_analyzer or vader.SentimentIntensityAnalyzer()
+    return np.fromiter((analyzer.polarity_scores(text)['compound'] for text in texts),
+                       dtype=np.float64, count=len(texts))
+
+
+def is_text_column(series):
+    """True for object, string and category-of-string columns."""
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def sentiment_labels(scores):
+    """Maps polarity scores to 'positive' / 'neutral' / 'negative'."""
+    return SENTIMENT_LABELS[np.sign(scores).astype(int) + 1]
 
 class SentimentAnalysis: 
     def __init__(self, df=None):
         """初始化时可以选择传入数据集"""
         self.df = df
 
+    @traced()
     def load_data(self, path):
         """从指定路径加载数据集"""
         self.df = pd.read_csv(path)
 
-        return pd.DataFrame(text_columns, columns=['Column Name', 'Average Entry Length', 'Unique Entries'])
+        return self.get_text_columns()
+
 
 
+    @traced()
+    def get_text_columns(self, approximate=False):
+        """Identifies text columns and returns a DataFrame with their details.
 
-    def get_text_columns(self):
-        """Identifies text columns and returns a DataFrame with their details."""
+        With approximate=True the lengths come from a reservoir sample and the unique
+        counts from HyperLogLog, built chunk by chunk; the frame gains 'Length error'
+        and 'Unique error' columns holding the 95% error bounds.
+        """
+        if approximate:
+            columns = [col for col in self.df.columns if is_text_column(self.df[col])]
+            accumulator = SketchAccumulator(self.df, columns=columns, text_lengths=True)
+            accumulator.update(self.df)
+            return accumulator.text_columns()
         text_columns = []
         for col in self.df.columns:
-            if self.df[col].dtype == 'object':  # Checking for text columns
+            if is_text_column(self.df[col]):  # Checking for text columns
                 avg_len = self.df[col].str.len().mean()
                 unique_entries = self.df[col].nunique()
                 text_columns.append([col, avg_len, unique_entries])
         return pd.DataFrame(text_columns, columns=['Column Name', 'Average Entry Length', 'Unique Entries'])
 
-    def vader_sentiment_analysis(self, data):
-        """Performs sentiment analysis using VADER."""
-        analyzer = SentimentIntensityAnalyzer()
-        scores, sentiments = [], []
-        for text in data.fillna(''):
-            score = analyzer.polarity_scores(text)['compound']
-            scores.append(score)
-            sentiments.append('positive' if score > 0 else 'negative' if score < 0 else 'neutral')
+    @traced()
+    def vader_sentiment_analysis(self, data, max_workers=None, chunk_size=VADER_CHUNK_SIZE):
+        """Performs sentiment analysis using VADER.
+
+        Only the distinct texts are scored; the scores are scattered back to every row.
+        Large inputs are split into chunks and scored across a process pool.
+        Returns (scores, sentiments) as Series aligned with `data`.
+        """
+        with trace_span('factorize'):
+            texts = pd.Series(data).fillna('').astype(str)
+            codes, uniques = pd.factorize(texts)
+            unique_texts = list(uniques)
+        chunks = [unique_texts[i:i + chunk_size] for i in range(0, len(unique_texts), chunk_size)]
+
+        max_workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+        with trace_span('score'):
+            if max_workers <= 1:
+                unique_scores = _vader_compound_scores(unique_texts)
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_vader_worker) as executor:
+                    unique_scores = np.concatenate(list(executor.map(_vader_compound_scores, chunks)))
+
+        scores = pd.Series(unique_scores[codes], index=texts.index, name='compound')
+        sentiments = pd.Series(sentiment_labels(unique_scores)[codes], index=texts.index, name='sentiment')
         return scores, sentiments
 
+    @traced()
     def textblob_sentiment_analysis(self, data):
-        """Performs sentiment analysis using TextBlob."""
-        scores, sentiments, subjectivities = [], [], []
-        for text in data.fillna(''):
-            blob = TextBlob(text)
-            score = blob.sentiment.polarity
-            subjectivity = blob.sentiment.subjectivity
-            scores.append(score)
-            subjectivities.append(subjectivity)
-            sentiments.append('positive' if score > 0 else 'negative' if score < 0 else 'neutral')
+        """Performs sentiment analysis using TextBlob.
+
+        Only the distinct texts are scored. Returns (scores, sentiments, subjectivities)
+        as Series aligned with `data`.
+        """
+        with trace_span('factorize'):
+            texts = pd.Series(data).fillna('').astype(str)
+            codes, uniques = pd.factorize(texts)
+        unique_scores = np.empty(len(uniques), dtype=np.float64)
+        unique_subjectivities = np.empty(len(uniques), dtype=np.float64)
+        with trace_span('score'):
+            for i, text in enumerate(uniques):
+                sentiment = textblob.TextBlob(text).sentiment
+                unique_scores[i] = sentiment.polarity
+                unique_subjectivities[i] = sentiment.subjectivity
+
+        scores = pd.Series(unique_scores[codes], index=texts.index, name='polarity')
+        sentiments = pd.Series(sentiment_labels(unique_scores)[codes], index=texts.index, name='sentiment')
+        subjectivities = pd.Series(unique_subjectivities[codes], index=texts.index, name='subjectivity')
         return scores, sentiments, subjectivities
 
-    def distilbert_sentiment_analysis(self, data):
-        """Performs sentiment analysis using a DistilBERT pipeline."""
-        if pipeline is None:
-            raise ImportError("Transformers library not installed.")
-        sentiment_pipeline = pipeline('sentiment-analysis')
-        scores, sentiments = [], []
-        for text in data.fillna(''):
-            result = sentiment_pipeline(text)[0]
-            scores.append(result['score'])
-            sentiments.append(result['label'])
-        return scores, sentiments
+    @traced()
+    def distilbert_sentiment_analysis(self, data, batch_size=DEFAULT_BATCH_SIZE, quantize=False):
+        """Performs sentiment analysis using DistilBERT.
+
+        The model is loaded once per process and reused; inference is batched and
+        scores are cached by text hash. quantize=True uses dynamic int8 weights on CPU.
+        Returns (scores, labels) as Series aligned with `data`.
+        """
+        return DistilBertEngine.get(quantize=quantize).predict(data, batch_size=batch_size)
+
+    @traced()
+    def stream_sentiment_analysis(self, path, column, analyzer='vader', output_dir=None,
+                                  chunksize=DEFAULT_CHUNK_SIZE, resume=True):
+        """Scores a text column of a CSV file chunk by chunk with bounded memory.
+
+        analyzer is 'vader', 'textblob' or 'distilbert'. Scores, labels and subjectivity
+        (TextBlob only) are appended to Parquet parts under output_dir; an interrupted run
+        resumes from the last completed chunk. Returns the number of rows scored.
+        """
+        if analyzer == 'vader':
+            # A process pool per chunk costs more than it saves; score each chunk in-process
+            def score_chunk(texts):
+                return self.vader_sentiment_analysis(texts, max_workers=1) + (None,)
+        elif analyzer == 'textblob':
+            score_chunk = self.textblob_sentiment_analysis
+        elif analyzer == 'distilbert':
+            def score_chunk(texts):
+                return self.distilbert_sentiment_analysis(texts) + (None,)
+        else:
+            raise ValueError(f"Unknown analyzer '{analyzer}'. Choose 'vader', 'textblob' or 'distilbert'.")
+
+        output_dir = output_dir or os.path.join('./results/', f"sentiment_{column}_{analyzer}")
+        return stream_sentiment(score_chunk, path, column, output_dir, analyzer, chunksize, resume)
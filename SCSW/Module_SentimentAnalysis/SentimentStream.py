@@ -0,0 +1,159 @@
+import glob
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from Module_Tracing.Tracing import trace_span
+
+DEFAULT_CHUNK_SIZE = 100_000
+# Bytes read at a time while looking for record boundaries
+READ_BLOCK_BYTES = 8 * 1024 * 1024
+PROGRESS_FILE = '_progress.json'
+PART_PATTERN = 'part-{:06d}.parquet'
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _load_progress(output_dir, job):
+    """Returns (rows written, byte offset just past the last completed chunk) for this job,
+    or (0, None) if it must start over."""
+    try:
+        with open(os.path.join(output_dir, PROGRESS_FILE), 'r', encoding='utf-8') as f:
+            progress = json.load(f)
+    except (OSError, ValueError):
+        return 0, None
+    if progress.get('job') != job or 'offset' not in progress:
+        return 0, None
+    return progress.get('rows_done', 0), progress['offset']
+
+
+def _record_ends(block, quoted):
+    """Returns (offsets of the newlines in block that end a CSV record, quote state at the end).
+
+    A newline ends a record only outside quotes (an even number of '"' before it), so
+    quoted fields may span lines; quoted is True when the block starts inside quotes.
+    """
+    data = np.frombuffer(block, dtype=np.uint8)
+    newlines = np.flatnonzero(data == ord('\n'))
+    if b'"' not in block:
+        return (newlines[:0] if quoted else newlines), quoted
+    parity = np.bitwise_xor.accumulate((data == ord('"')).view(np.uint8))
+    if quoted:
+        parity ^= 1
+    return newlines[parity[newlines] == 0], bool(parity[-1])
+
+
+def _iter_chunks(f, chunksize, skip=0):
+    """Yields (raw bytes of up to chunksize CSV records, file offset just past them).
+
+    f is a binary file positioned at a record boundary; the first `skip` records are
+    dropped (the header). Bytes read past a chunk are kept for the next one, so every
+    byte is scanned once.
+    """
+    buffer, ends, quoted, eof = b'', np.zeros(0, dtype=np.intp), False, False
+    offset = f.tell()  # file offset of buffer[0]
+    while True:
+        while len(ends) < chunksize + skip and not eof:
+            block = f.read(READ_BLOCK_BYTES)
+            if not block:
+                eof = True
+                break
+            block_ends, quoted = _record_ends(block, quoted)
+            ends = np.concatenate([ends, block_ends + len(buffer)])
+            buffer += block
+        if skip:
+            cut = int(ends[skip - 1]) + 1 if len(ends) >= skip else len(buffer)
+            buffer, ends, offset = buffer[cut:], ends[skip:] - cut, offset + cut
+            skip = 0
+            continue
+        if len(ends) >= chunksize:
+            cut = int(ends[chunksize - 1]) + 1
+            yield buffer[:cut], offset + cut
+            buffer, ends, offset = buffer[cut:], ends[chunksize:] - cut, offset + cut
+        else:
+            if buffer.strip():
+                yield buffer, offset + len(buffer)
+            return
+
+
+def _clear_parts(output_dir):
+    for path in glob.glob(os.path.join(output_dir, 'part-*.parquet')):
+        os.remove(path)
+
+
+def stream_sentiment(score_chunk, path, column, output_dir, analyzer, chunksize=DEFAULT_CHUNK_SIZE,
+                     resume=True):
+    """Scores one text column of a CSV chunk by chunk and writes the results as Parquet parts.
+
+    score_chunk(texts) must return (scores, labels, subjectivities) for a chunk of texts;
+    subjectivities may be None. Each chunk becomes one part file under output_dir (the
+    directory is readable as a single table with pd.read_parquet(output_dir)). A progress
+    file records the rows completed and the byte offset where they end, so an interrupted
+    run seeks straight past the last part instead of re-reading the rows before it.
+    Returns the total number of rows written.
+    """
+    if pq is None:
+        raise ImportError("pyarrow is required for streaming sentiment output.")
+    os.makedirs(output_dir, exist_ok=True)
+    job = {'source': os.path.abspath(path), 'column': column, 'analyzer': analyzer,
+           'chunksize': chunksize, **_source_signature(path)}
+
+    rows_done, offset = _load_progress(output_dir, job) if resume else (0, None)
+    if offset is None:
+        rows_done = 0
+        _clear_parts(output_dir)
+    part = rows_done // chunksize
+
+    names = pd.read_csv(path, nrows=0).columns.tolist()
+    if column not in names:
+        raise ValueError(f"Column '{column}' not found in '{path}'.")
+    with open(path, 'rb') as f:
+        if offset is not None:
+            f.seek(offset)
+        for data, end in _iter_chunks(f, chunksize, skip=1 if offset is None else 0):
+            try:
+                chunk = pd.read_csv(io.BytesIO(data), header=None, names=names, usecols=[column])
+            except pd.errors.EmptyDataError:  # only blank lines
+                continue
+            with trace_span('score chunk'):
+                scores, labels, subjectivities = score_chunk(chunk[column])
+            n = len(chunk)
+            table = pa.table({
+                'row': np.arange(rows_done, rows_done + n, dtype=np.int64),
+                'score': np.asarray(scores, dtype=np.float64),
+                'label': np.asarray(labels, dtype=object).astype(str),
+                'subjectivity': (np.full(n, np.nan) if subjectivities is None
+                                 else np.asarray(subjectivities, dtype=np.float64)),
+            })
+
+            # Write to a temporary file first so an interrupted write never leaves a partial part
+            part_path = os.path.join(output_dir, PART_PATTERN.format(part))
+            with trace_span('write part'):
+                pq.write_table(table, f"{part_path}.tmp")
+                os.replace(f"{part_path}.tmp", part_path)
+
+            rows_done += n
+            part += 1
+            _write_json(os.path.join(output_dir, PROGRESS_FILE),
+                        {'job': job, 'rows_done': rows_done, 'offset': end})
+            print(f"Scored rows {rows_done - n:,}–{rows_done:,} -> '{part_path}'.")
+
+    return rows_done
@@ -0,0 +1,269 @@
+import asyncio
+import inspect
+import json
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from Module_Data_Inspection.DataInspection import DataInspection
+from Module_Plot_Rendering.PlotRenderer import RESULTS_DIR, get_renderer
+from Module_Tracing.Tracing import trace_span
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1024 * 1024
+# 可以通过 POST /<模块>/<方法> 调用的方法；不开放读取任意路径的 load_data / stream_sentiment_analysis
+ENDPOINTS = {
+    'inspection': ('generate_statistics', 'plot_boxplot', 'plot_distribution'),
+    'analysis': ('group_summary', 'check_normality', 'plot_qq', 'normality_table', 'group_normality',
+                 'permutation_test', 'perform_kruskal_wallis', 'anova', 't_test_or_mannwhitney', 'screen_pairs',
+                 'chi_square_test', 'chi_square_matrix', 'regression', 'stratified'),
+    'sentiment': ('get_text_columns', 'vader_sentiment_analysis', 'textblob_sentiment_analysis',
+                  'distilbert_sentiment_analysis'),
+}
+
+
+class RequestError(Exception):
+    """请求本身有误（返回给客户端的 4xx 错误）。"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def to_jsonable(value):
+    """把分析结果转换成可以 JSON 序列化的对象（DataFrame 按 split 格式，NaN 转为 null）。"""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) or math.isinf(value) else float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient='split', default_handler=str))
+    if isinstance(value, (pd.Series, pd.Index)):
+        return to_jsonable(value.tolist())
+    if isinstance(value, np.ndarray):
+        return to_jsonable(value.tolist())
+    if hasattr(value, '_asdict'):  # namedtuple（如 ResamplingResult）
+        return to_jsonable(value._asdict())
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if hasattr(value, 'params') and hasattr(value, 'exog_names'):  # 回归结果 OLSFit
+        return to_jsonable({
+            'dependent': value.endog_name, 'nobs': value.nobs,
+            'params': dict(zip(value.exog_names, value.params)), 'bse': dict(zip(value.exog_names, value.bse)),
+            'pvalues': dict(zip(value.exog_names, value.pvalues)), 'rsquared': value.rsquared,
+            'rsquared_adj': value.rsquared_adj, 'fvalue': value.fvalue, 'f_pvalue': value.f_pvalue,
+        })
+    return str(value)
+
+
+class AnalysisServer:
+    """常驻数据集的本地 HTTP/JSON 分析服务。
+
+    数据集只加载一次，DataInspection / DataAnalysis / SentimentAnalysis 对象常驻内存；
+    请求在 asyncio 事件循环中解析，计算交给线程池执行（NumPy / SciPy 计算期间会释放 GIL，
+    且对象与结果缓存可以直接共享）。正在计算中的相同请求（同一方法、同样参数）合并为一次计算。
+    """
+
+    def __init__(self, df, schema=None, max_workers=None, incremental=None):
+        self.df = df
+        self.incremental = incremental
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 1),
+                                           thread_name_prefix='analysis')
+        self.modules = {'inspection': DataInspection(df, schema=schema, incremental=incremental)}
+        self._in_flight = {}
+        self._modules_lock = threading.Lock()
+        self.coalesced = 0
+        self.computed = 0
+
+    def _module(self, name):
+        """返回常驻的分析对象；分析和情感分析模块在第一次请求时才导入和创建。"""
+        with self._modules_lock:
+            if name not in self.modules:
+                if name == 'analysis':
+                    from Module_data_analysis.DataAnalysis import DataAnalysis
+                    self.modules[name] = DataAnalysis(self.df, incremental=self.incremental)
+                elif name == 'sentiment':
+                    from Module_SentimentAnalysis.SentimentAnalysis import SentimentAnalysis
+                    self.modules[name] = SentimentAnalysis(self.df)
+            return self.modules[name]
+
+    def _resolve(self, kwargs):
+        """参数 data 给出列名时替换为该列的数据（check_normality、情感分析等方法需要数据本身）。"""
+        data = kwargs.get('data')
+        if isinstance(data, str):
+            if data not in self.df.columns:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"Unknown column '{data}'.")
+            kwargs = dict(kwargs, data=self.df[data])
+        return kwargs
+
+    def _call(self, module, method, kwargs):
+        func = getattr(self._module(module), method)
+        try:
+            inspect.signature(func).bind(**kwargs)
+        except TypeError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid arguments for {method}: {e}")
+        with trace_span(f"request {module}.{method}"):
+            try:
+                result = func(**self._resolve(kwargs))
+            except (ValueError, KeyError) as e:
+                # 分析方法以 ValueError / KeyError 表示参数取值不合适（如未知列名、组数不符）
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"{type(e).__name__}: {e}")
+        return to_jsonable(result)
+
+    async def call(self, module, method, kwargs):
+        """调用分析方法；相同的请求正在计算时直接等待那次计算的结果。"""
+        if method not in ENDPOINTS.get(module, ()):
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Unknown endpoint '/{module}/{method}'.")
+        if not isinstance(kwargs, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "The request body must be a JSON object of arguments.")
+
+        key = (module, method, json.dumps(kwargs, sort_keys=True))
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, self._call, module, method, kwargs)
+        self._in_flight[key] = future
+        self.computed += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def _route(self, verb, path, body):
+        """按路径分发请求，返回 (状态码, 响应体, Content-Type)。"""
+        parts = [unquote(part) for part in urlsplit(path).path.strip('/').split('/') if part]
+        if verb == 'GET' and parts == ['health']:
+            return HTTPStatus.OK, {'status': 'ok', 'rows': len(self.df), 'columns': list(self.df.columns),
+                                   'computed': self.computed, 'coalesced': self.coalesced}, None
+        if verb == 'GET' and parts == ['endpoints']:
+            return HTTPStatus.OK, {module: list(methods) for module, methods in ENDPOINTS.items()}, None
+        if verb == 'GET' and parts == ['schema']:
+            schema = await asyncio.get_running_loop().run_in_executor(
+                self.executor, lambda: self.modules['inspection'].schema)
+            return HTTPStatus.OK, to_jsonable(schema), None
+        if verb == 'GET' and len(parts) == 2 and parts[0] == 'results':
+            return await self._result_file(parts[1])
+        if verb == 'POST' and len(parts) == 2:
+            try:
+                kwargs = json.loads(body or b'{}')
+            except ValueError as e:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON body: {e}")
+            return HTTPStatus.OK, {'result': await self.call(parts[0], parts[1], kwargs)}, None
+        raise RequestError(HTTPStatus.NOT_FOUND, f"No route for {verb} {path}.")
+
+    async def _result_file(self, name):
+        """返回 results 目录下已渲染的图片（先等待后台渲染完成）。"""
+        filepath = os.path.join(RESULTS_DIR, os.path.basename(name))
+        await asyncio.get_running_loop().run_in_executor(self.executor, get_renderer().wait, filepath)
+        if not os.path.isfile(filepath):
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Result file '{name}' does not exist.")
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        return HTTPStatus.OK, content, 'image/png' if name.endswith('.png') else 'application/octet-stream'
+
+    async def handle_connection(self, reader, writer):
+        """处理一个连接上的 HTTP/1.1 请求（支持 keep-alive）。"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    verb, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': "Malformed request line."}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    # 无法确定请求体的边界，回复后关闭连接
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': "Invalid Content-Length."}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        {'error': "Request body too large."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, payload, content_type = await self._route(verb.upper(), path, body)
+                except RequestError as e:
+                    status, payload, content_type = e.status, {'error': str(e)}, None
+                except Exception as e:
+                    status, payload, content_type = (HTTPStatus.INTERNAL_SERVER_ERROR,
+                                                     {'error': f"{type(e).__name__}: {e}"}, None)
+                await self._respond(writer, status, payload, keep_alive, content_type)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive, content_type=None):
+        if content_type is None:
+            body = json.dumps(payload, allow_nan=False).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            body = payload
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        """在 host:port 上监听，直到任务被取消；ready 为回调，在开始监听后以实际端口调用。"""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        actual_port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready(actual_port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def run_server(df, schema=None, host=DEFAULT_HOST, port=DEFAULT_PORT, max_workers=None, incremental=None):
+    """启动服务并阻塞运行，Ctrl+C 时等待未完成的计算和图片渲染后退出。"""
+    server = AnalysisServer(df, schema, max_workers, incremental)
+
+    def ready(actual_port):
+        print(f"Serving analyses of {len(df):,} rows on http://{host}:{actual_port}/ (Ctrl+C to stop).")
+
+    try:
+        asyncio.run(server.serve(host, port, ready))
+    except KeyboardInterrupt:
+        print("Stopping server...")
+    finally:
+        server.close()
+        get_renderer().shutdown()
@@ -0,0 +1,253 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+
+
+class _Frame:
+    __slots__ = ('name', 'action_id', 'path', 'wall_start', 'cpu_start', 'mem_start', 'mem_peak', 'counted',
+                 'concurrent', 'overlaps')
+
+
+class Tracer:
+    """轻量级的分段计时器：记录每个 span 的墙钟时间、CPU 时间和内存分配峰值。
+
+    默认关闭，关闭时 span() 几乎没有开销。开启后每个 span 结束时记录一条事件；
+    span 按线程嵌套，CPU 时间取当前线程的 thread_time。内存峰值来自 tracemalloc
+    （memory=True 时开启），是 span 期间相对开始时的最大新增分配，包含子 span。
+
+    tracemalloc 的峰值是整个进程共享的：只有在 span 期间没有其他线程的 span 在运行时才会重置峰值，
+    结果才准确。与其他线程的 span 重叠过的 span 只记录结束时相对开始时的净增分配，
+    事件中 peak_exact 为 False，report() 中以 * 标出。
+
+    每次 begin_action() 分配一个新的操作编号，事件按编号归类：同一菜单项执行多次时，
+    report() 只汇总指定的那一次。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.action = None
+        self.action_id = None
+        self.events = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._action_span = None
+        self._action_names = {}
+        self._next_action_id = 0
+        # 有 span 正在运行的线程数，以及出现多个线程同时运行 span 的次数（用于判断峰值是否准确）
+        self._active_threads = 0
+        self._overlaps = 0
+
+    def enable(self, memory=True):
+        """开启记录；memory=True 时同时用 tracemalloc 统计分配峰值（会使 Python 代码变慢）。"""
+        self.enabled = True
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.memory = False
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def span(self, name, action_id=None):
+        """记录一个阶段；未开启时直接执行。
+
+        嵌套的 span 继承外层 span 所属的操作；最外层的 span 默认归入当前操作，
+        后台线程可以传入提交任务时的 action_id。
+        """
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._stack()
+        frame = _Frame()
+        frame.name = name
+        frame.action_id = stack[-1].action_id if stack else (action_id or self.action_id)
+        frame.path = (stack[-1].path if stack else ()) + (name,)
+        frame.mem_start = frame.mem_peak = 0
+        frame.counted = frame.concurrent = False
+        frame.overlaps = None
+        if self.memory:
+            with self._lock:
+                if not stack:
+                    frame.counted = True
+                    self._active_threads += 1
+                    if self._active_threads > 1:
+                        self._overlaps += 1
+                frame.concurrent = self._active_threads > 1
+                frame.overlaps = self._overlaps
+            current, peak = tracemalloc.get_traced_memory()
+            if not frame.concurrent:
+                # 只有当前线程在记录时才能重置全进程共享的峰值
+                if stack:
+                    stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+                tracemalloc.reset_peak()
+            frame.mem_start = frame.mem_peak = current
+        stack.append(frame)
+        frame.cpu_start = time.thread_time()
+        frame.wall_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_end = time.perf_counter()
+            cpu = time.thread_time() - frame.cpu_start
+            stack.pop()
+            exact = True
+            if frame.overlaps is not None:
+                with self._lock:
+                    exact = not frame.concurrent and frame.overlaps == self._overlaps
+                    if frame.counted:
+                        self._active_threads -= 1
+            if self.memory and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                if exact:
+                    frame.mem_peak = max(frame.mem_peak, peak)
+                    if stack:
+                        stack[-1].mem_peak = max(stack[-1].mem_peak, frame.mem_peak)
+                else:
+                    frame.mem_peak = max(frame.mem_start, current)
+            event = {
+                'name': name, 'action': self._action_names.get(frame.action_id), 'action_id': frame.action_id,
+                'path': frame.path,
+                'start': frame.wall_start - self._origin, 'wall': wall_end - frame.wall_start, 'cpu': cpu,
+                'peak_alloc': frame.mem_peak - frame.mem_start, 'peak_exact': exact,
+                'thread': threading.current_thread().name, 'tid': threading.get_ident(),
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def begin_action(self, name):
+        """开始一个菜单操作：之后产生的所有 span（包括后台线程中的）都归到这次操作下，直到 end_action()。
+
+        返回这次操作的编号（report() 按编号筛选）。
+        """
+        self.end_action()
+        with self._lock:
+            self._next_action_id += 1
+            self.action_id = self._next_action_id
+            self._action_names[self.action_id] = name
+        self.action = name
+        self._action_span = self.span(name)
+        self._action_span.__enter__()
+        return self.action_id
+
+    def end_action(self):
+        """结束当前菜单操作，返回它的名称（没有进行中的操作时返回 None）。"""
+        action_span = self._action_span
+        if action_span is not None:
+            self._action_span = None
+            action_span.__exit__(None, None, None)
+        action, self.action, self.action_id = self.action, None, None
+        return action
+
+    @contextlib.contextmanager
+    def run_action(self, name):
+        """with 语句形式的 begin_action() / end_action()。"""
+        self.begin_action(name)
+        try:
+            yield
+        finally:
+            self.end_action()
+
+    def report(self, action_id=None):
+        """按 span 名称汇总（调用次数、墙钟时间、CPU 时间、最大分配峰值），返回文本表格。
+
+        给出 action_id 时只汇总该次操作的事件，否则汇总全部事件。
+        """
+        with self._lock:
+            events = [e for e in self.events if action_id is None or e['action_id'] == action_id]
+        # 按调用路径汇总；按开始时间插入，父 span 总在子 span 之前
+        rows = OrderedDict()
+        for event in sorted(events, key=lambda e: e['start']):
+            for depth in range(1, len(event['path']) + 1):
+                rows.setdefault(event['path'][:depth], {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak': 0,
+                                                        'exact': True})
+            row = rows[event['path']]
+            row['calls'] += 1
+            row['wall'] += event['wall']
+            row['cpu'] += event['cpu']
+            row['peak'] = max(row['peak'], event['peak_alloc'])
+            row['exact'] = row['exact'] and event['peak_exact']
+
+        def tree_order(path):
+            # 同一父节点下的子节点保持首次出现的顺序
+            return tuple(order[path[:depth]] for depth in range(1, len(path) + 1))
+        order = {path: i for i, path in enumerate(rows)}
+
+        width = max([len(path[-1]) + 2 * len(path) for path in rows] + [10])
+        lines = [f"{'Span':<{width}}{'Calls':>6}{'Wall (ms)':>12}{'CPU (ms)':>12}{'Peak alloc':>13}",
+                 '-' * (width + 43)]
+        for path in sorted(rows, key=tree_order):
+            row = rows[path]
+            peak = f"{row['peak'] / 1e6:.1f} MB{'' if row['exact'] else '*'}" if self.memory else 'n/a'
+            lines.append(f"{'  ' * (len(path) - 1) + path[-1]:<{width}}{row['calls']:>6}{row['wall'] * 1e3:>12.1f}"
+                         f"{row['cpu'] * 1e3:>12.1f}{peak:>13}")
+        if self.memory and not all(row['exact'] for row in rows.values()):
+            lines.append("* overlapped spans on other threads: net allocation at exit, not the peak")
+        return '\n'.join(lines)
+
+    def export_chrome(self, path):
+        """把所有事件导出为 Chrome trace-event JSON（可在 chrome://tracing 或 Perfetto 中打开）。"""
+        with self._lock:
+            events = list(self.events)
+        pid = os.getpid()
+        trace_events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                        for tid, name in {e['tid']: e['thread'] for e in events}.items()]
+        for e in events:
+            trace_events.append({
+                'name': e['name'], 'cat': e['action'] or 'default', 'ph': 'X', 'pid': pid, 'tid': e['tid'],
+                'ts': round(e['start'] * 1e6, 3), 'dur': round(e['wall'] * 1e6, 3),
+                'args': {'cpu_ms': round(e['cpu'] * 1e3, 3), 'peak_alloc_bytes': e['peak_alloc'],
+                         'peak_exact': e.get('peak_exact', True)},
+            })
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+
+_tracer = Tracer()
+
+
+def get_tracer():
+    """返回全局共享的 Tracer。"""
+    return _tracer
+
+
+def trace_span(name, action_id=None):
+    """在全局 Tracer 上记录一个阶段。"""
+    return _tracer.span(name, action_id)
+
+
+def traced(name=None):
+    """方法装饰器：把整个方法调用记录为一个 span（默认名称为 类名.方法名）。"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with _tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
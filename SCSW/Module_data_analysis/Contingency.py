@@ -0,0 +1,105 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+
+def encode_columns(df, columns):
+    """把每个分类变量编码成整数（类别按排序顺序，与 pd.crosstab 一致），每列只编码一次。"""
+    encoded = {}
+    for col in columns:
+        codes, labels = pd.factorize(df[col], sort=True)
+        encoded[col] = (codes, labels)
+    return encoded
+
+
+def contingency_counts(codes1, n1, codes2, n2):
+    """用组合编码上的 np.bincount 构造 n1 × n2 的列联表（忽略任一变量缺失的行）。"""
+    keep = (codes1 >= 0) & (codes2 >= 0)
+    combined = codes1[keep].astype(np.int64) * n2 + codes2[keep]
+    return np.bincount(combined, minlength=n1 * n2).reshape(n1, n2)
+
+
+def contingency_table(df, var1, var2, encoded=None):
+    """构造带类别标签的列联表 DataFrame，结果与 pd.crosstab 相同。"""
+    encoded = encoded or encode_columns(df, [var1, var2])
+    codes1, labels1 = encoded[var1]
+    codes2, labels2 = encoded[var2]
+    counts = contingency_counts(codes1, len(labels1), codes2, len(labels2))
+    table = pd.DataFrame(counts, index=pd.Index(labels1, name=var1),
+                         columns=pd.Index(labels2, name=var2))
+    # 去掉在成对样本中没有出现的类别
+    return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+
+class ContingencyAccumulator:
+    """两个分类变量列联表的可合并计数：新追加的行单独计数后与已有的表相加。"""
+
+    def __init__(self, var1, var2):
+        self.var1, self.var2 = var1, var2
+        self.rows = 0
+        self.counts = pd.DataFrame(dtype=np.int64)
+
+    def update(self, frame):
+        """并入新追加的行。"""
+        table = contingency_table(frame, self.var1, self.var2)
+        # 类别标签按普通值对齐（两部分的 category 类型可能不同），合并后重新排序
+        table.index, table.columns = table.index.astype(object), table.columns.astype(object)
+        self.counts = self.counts.add(table, fill_value=0).fillna(0).astype(np.int64)
+        self.rows += len(frame)
+
+    def table(self):
+        """返回与 contingency_table() 对全部数据计算结果相同的列联表。"""
+        table = self.counts.sort_index(axis=0).sort_index(axis=1)
+        table.index.name, table.columns.name = self.var1, self.var2
+        return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+
+def chi_square_from_table(counts, correction=True):
+    """由列联表计算卡方统计量、p 值、自由度、期望频数和 Cramér's V。
+
+    与 scipy.stats.chi2_contingency 一致，自由度为 1 时默认使用 Yates 连续性校正；
+    Cramér's V 始终由未校正的卡方值计算。
+    """
+    observed = np.asarray(counts, dtype=np.float64)
+    observed = observed[observed.sum(axis=1) > 0][:, observed.sum(axis=0) > 0]
+    n = observed.sum()
+    expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / n
+    dof = (observed.shape[0] - 1) * (observed.shape[1] - 1)
+    if dof == 0:
+        return 0.0, 1.0, 0, expected, 0.0
+
+    diff = observed - expected
+    chi2 = (diff ** 2 / expected).sum()
+    statistic = chi2
+    if correction and dof == 1:
+        adjusted = np.maximum(np.abs(diff) - 0.5, 0.0)
+        statistic = (adjusted ** 2 / expected).sum()
+    p_value = stats.chi2.sf(statistic, dof)
+    cramers_v = np.sqrt(chi2 / (n * (min(observed.shape) - 1)))
+    return statistic, p_value, dof, expected, cramers_v
+
+
+def chi_square_matrix(df, columns, correction=True):
+    """对所有分类变量两两做卡方检验。
+
+    返回 (结果表, Cramér's V 矩阵, p 值矩阵)；两个矩阵都是对称的。
+    """
+    encoded = encode_columns(df, columns)
+    cramers = pd.DataFrame(np.eye(len(columns)), index=columns, columns=columns)
+    p_values = pd.DataFrame(np.zeros((len(columns), len(columns))), index=columns, columns=columns)
+
+    rows = []
+    for var1, var2 in combinations(columns, 2):
+        codes1, labels1 = encoded[var1]
+        codes2, labels2 = encoded[var2]
+        counts = contingency_counts(codes1, len(labels1), codes2, len(labels2))
+        statistic, p_value, dof, _, cramers_v = chi_square_from_table(counts, correction)
+        rows.append([var1, var2, int(counts.sum()), statistic, p_value, dof, cramers_v])
+        cramers.loc[var1, var2] = cramers.loc[var2, var1] = cramers_v
+        p_values.loc[var1, var2] = p_values.loc[var2, var1] = p_value
+
+    results = pd.DataFrame(rows, columns=['Variable 1', 'Variable 2', 'N', 'Chi-Square',
+                                          'p-value', 'dof', "Cramer's V"])
+    return results, cramers, p_values
@@ -1,157 +1,410 @@
+import numpy as np
 import scipy.stats as stats
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
 
-import seaborn as sns
 import pandas as pd
 import os
+from Module_data_analysis.Grouping import GroupedColumn, encode
+from Module_data_analysis.Screening import SCREEN_TESTS, screen_pairs
+from Module_data_analysis.Contingency import (ContingencyAccumulator, chi_square_from_table, chi_square_matrix,
+                                              contingency_table)
+from Module_data_analysis.Normality import (QQ_QUANTILES, SHAPIRO_MAX_N, draw_qq, qq_points, test_group_normality,
+                                            test_normality)
+from Module_data_analysis.Regression import (SCATTER_MAX_POINTS, OLSAccumulator, build_formula, draw_scatter,
+                                             fit_ols, formula_variables, prediction_bands, regression_bands)
+from Module_data_analysis.Resampling import DEFAULT_RESAMPLES, bootstrap_mean_diff, permutation_test
+from Module_data_analysis.Stratified import (COMBINE_METHODS, STRATIFIED_METHODS, DiscardRenderer, StrataPartition,
+                                             cmh_test, combine_p_values, referenced_columns, run_stratified,
+                                             stratified_table)
+from Module_data_analysis.Summaries import MAX_FLIERS, WHISKER_RANGE, box_summary, draw_boxplot
+from Module_Data_Cache.Fingerprint import column_fingerprint, frame_fingerprint
+from Module_Data_Cache.ResultCache import get_result_cache
+from Module_Plot_Rendering.PlotRenderer import get_renderer
+from Module_Lazy_Import.LazyImport import lazy_import
+from Module_Tracing.Tracing import trace_span, traced
+
+sns = lazy_import('seaborn')  # 只在绘制热力图时才导入
 
 class DataAnalysis:
-    def __init__(self, df):
-        """初始化 DataAnalysis 类，传入数据集。"""
+    def __init__(self, df, renderer=None, cache=None, incremental=None, verbose=True):
+        """初始化 DataAnalysis 类，传入数据集。图像由后台渲染器异步保存，检验结果按数据内容缓存。
+
+        incremental 为 IncrementalStore 时，Chi-Square 和回归由可合并的累积量刷新（只处理新追加的行）。
+        verbose=False 时各方法不打印结果，只返回（分层执行时使用，不改动全局的 sys.stdout）。
+        """
         self.df = df
+        self.renderer = renderer or get_renderer()
+        self.cache = cache or get_result_cache()
+        self.incremental = incremental
+        self.verbose = verbose
+
+    def _report(self, *args):
+        """verbose 时打印结果说明。"""
+        if self.verbose:
+            print(*args)
+
+    def _cached(self, method, params, columns, compute):
+        """按所用列的内容指纹查找缓存结果，未命中时调用 compute() 计算。"""
+        with trace_span('fingerprint'):
+            fingerprints = [column_fingerprint(self.df[col]) for col in columns]
+
+        def traced_compute():
+            with trace_span(f'compute {method}'):
+                return compute()
+        return self.cache.get_or_compute(method, params, fingerprints, traced_compute)
+
+    def _submit_plot(self, filepath, kind, columns, params, draw, figsize=(8, 5)):
+        """按所用列的内容指纹提交后台绘图任务。"""
+        with trace_span('fingerprint'):
+            if self.incremental is not None:
+                fingerprint = self.incremental.fingerprint(self.df, columns)
+            else:
+                fingerprint = frame_fingerprint(self.df, columns)
+        return self.renderer.submit(filepath, kind, params, fingerprint, draw, figsize)
+
+    def _submit_boxplot(self, filepath, kind, title, cont_var, cat_var):
+        """提交按分类变量分组的箱形图（由缓存的分组汇总绘制）。"""
+        def draw(fig, ax):
+            draw_boxplot(ax, *self.group_summary(cont_var, cat_var, with_fliers=True), cont_var, cat_var, title)
+        return self._submit_plot(filepath, kind, [cont_var, cat_var], (cont_var, cat_var, title, MAX_FLIERS), draw)
+
+    def group_by(self, cont_var, cat_var):
+        """按分类变量把连续变量拆分成各组（每组为连续切片的视图）。"""
+        with trace_span('group_by'):
+            return GroupedColumn(self.df[cont_var], self.df[cat_var])
+
+    @traced()
+    def group_summary(self, cont_var, cat_var, with_fliers=False):
+        """按分类变量分组，返回各组的样本量、均值、四分位数、须线和离群点个数（按数据内容缓存）。
+
+        with_fliers=True 时返回 (结果表, 各组离群点)，供箱形图使用。
+        """
+        table, fliers = self._cached('group_summary', (WHISKER_RANGE, MAX_FLIERS), [cont_var, cat_var],
+                                     lambda: box_summary(self.group_by(cont_var, cat_var)))
+        return (table, fliers) if with_fliers else table
 
     @staticmethod
-    def check_normality(data, var_name):
-        """检查数据的正态性，并生成 Q-Q 图。"""
-        stat, p_value = stats.shapiro(data.dropna())  # 忽略缺失值
+    @traced()
+    def check_normality(data, var_name, plot=False):
+        """检查数据的正态性（按样本量选择检验方法），plot=True 时另外生成 Q-Q 图。"""
+        data = pd.Series(data).dropna()  # 忽略缺失值（也接受分组后的数组）
+        with trace_span('fingerprint'):
+            fingerprint = column_fingerprint(data)
 
-        # 生成并保存 Q-Q 图
-        plt.figure()
-        stats.probplot(data, dist="norm", plot=plt)
-        plt.title(f"Q-Q Plot of {var_name}")
-        plt.tight_layout()
+        def compute():
+            with trace_span('compute normality'):
+                return test_normality({var_name: data}).iloc[0].to_dict()
+        result = get_result_cache().get_or_compute('normality', (SHAPIRO_MAX_N,), [fingerprint], compute)
 
-        # 保存图像
-        filepath = f"./results/qq_plot_{var_name}.png"
-        plt.savefig(filepath)
-        plt.close()  # 关闭图像以释放内存
-        print(f"Saved Q-Q plot as '{filepath}'.")
+        if plot:
+            DataAnalysis.plot_qq(data, var_name)
 
-        print(f"Shapiro-Wilk Test: Statistic={stat}, p-value={p_value}")
-        return p_value > 0.05  # 返回 True 表示符合正态分布
+        print(f"{result['Test']} Test: Statistic={result['Statistic']}, p-value={result['p-value']}")
+        return bool(result['Normal'])  # 返回 True 表示符合正态分布
 
-    def perform_kruskal_wallis(self, cont_var, cat_var):
-        """执行 Kruskal-Wallis 检验并生成箱形图。"""
-        try:
-            groups = [self.df[cont_var][self.df[cat_var] == group].dropna() for group in self.df[cat_var].unique()]
-            stat, p_value = stats.kruskal(*groups)
+    @staticmethod
+    @traced()
+    def plot_qq(data, var_name):
+        """在后台生成 Q-Q 图（只取固定个数的分位点），返回图像路径。"""
+        data = pd.Series(data).dropna()
 
-            # 生成并保存箱形图
-            plt.figure()
-            sns.boxplot(x=cat_var, y=cont_var, data=self.df)
-            plt.title(f"Kruskal-Wallis Test: {cont_var} by {cat_var}")
-            plt.tight_layout()
+        def draw(fig, ax):
+            draw_qq(ax, *qq_points(data), title=f"Q-Q Plot of {var_name}")
 
+        filepath = f"./results/qq_plot_{var_name}.png"
+        get_renderer().submit(filepath, 'qq_plot', (var_name, QQ_QUANTILES), column_fingerprint(data), draw,
+                              figsize=(6.4, 4.8))
+        print(f"Rendering Q-Q plot to '{filepath}'.")
+        return filepath
+
+    @traced()
+    def normality_table(self, columns):
+        """一次检验多列的正态性，返回每列一行的结果表。"""
+        return self._cached('normality_table', (tuple(columns), SHAPIRO_MAX_N), list(columns),
+                            lambda: test_normality(self.df[list(columns)]))
+
+    @traced()
+    def group_normality(self, cont_var, cat_var):
+        """按分类变量分组，一次检验各组连续变量的正态性。"""
+        return self._cached('group_normality', (SHAPIRO_MAX_N,), [cont_var, cat_var],
+                            lambda: test_group_normality(self.group_by(cont_var, cat_var)))
+
+    @traced()
+    def permutation_test(self, statistic, var1, var2, max_resamples=DEFAULT_RESAMPLES, seed=0):
+        """置换检验（按数据内容缓存），返回 ResamplingResult。
+
+        statistic 为 'mean_diff'、'rank_sum' 或 'anova_f' 时 var1 为连续变量、var2 为分类变量；
+        为 'chi_square' 时两者都是分类变量。
+        """
+        def compute():
+            if statistic == 'chi_square':
+                return permutation_test(statistic, codes=encode(self.df[var1])[0], codes2=encode(self.df[var2])[0],
+                                        max_resamples=max_resamples, seed=seed)
+            return permutation_test(statistic, self.df[var1].to_numpy(dtype=np.float64, na_value=np.nan),
+                                    encode(self.df[var2])[0], max_resamples=max_resamples, seed=seed)
+
+        result = self._cached('permutation', (statistic, max_resamples, seed), [var1, var2], compute)
+        self._report(f"Permutation p-value={result.p_value:.4g} ({result.method}, {result.resamples} resamples)")
+        return result
+
+    @traced()
+    def perform_kruskal_wallis(self, cont_var, cat_var, resamples=None):
+        """执行 Kruskal-Wallis 检验并生成箱形图。resamples 不为 None 时返回置换检验的 p 值。"""
+        try:
+            stat, p_value = self._cached('kruskal', (), [cont_var, cat_var], lambda: tuple(
+                stats.kruskal(*self.group_by(cont_var, cat_var).groups())))
+            if resamples:
+                p_value = self.permutation_test('rank_sum', cont_var, cat_var, resamples).p_value
+
+            # 在后台生成并保存箱形图
             filepath = f"./results/kruskal_boxplot_{cont_var}_by_{cat_var}.png"
-            plt.savefig(filepath)
-            plt.close()
-            print(f"Saved Kruskal-Wallis boxplot as '{filepath}'.")
+            self._submit_boxplot(filepath, 'kruskal_boxplot', f"Kruskal-Wallis Test: {cont_var} by {cat_var}",
+                                 cont_var, cat_var)
+            self._report(f"Rendering Kruskal-Wallis boxplot to '{filepath}'.")
 
-            print(f"Kruskal-Wallis Result: Statistic={stat}, p-value={p_value}")
+            self._report(f"Kruskal-Wallis Result: Statistic={stat}, p-value={p_value}")
             return stat, p_value
         except Exception as e:
-            print(f"Error during Kruskal-Wallis Test: {e}")
+            self._report(f"Error during Kruskal-Wallis Test: {e}")
             return None, None
 
 
-    def t_test_or_mannwhitney(self, num_var, cat_var):
-        """执行 t-Test 或 Mann-Whitney U 检验。"""
-        # 获取分类变量的唯一类别
-        unique_groups = self.df[cat_var].dropna().unique()
-        if len(unique_groups) != 2:
-            raise ValueError(f"t-Test requires exactly 2 groups, but '{cat_var}' has {len(unique_groups)} groups.")
+    @traced()
+    def anova(self, cont_var, cat_var):
+        """执行单因素方差分析（ANOVA）并生成箱形图。"""
+        def compute():
+            groups = self.group_by(cont_var, cat_var).groups()
+            if len(groups) < 2:
+                raise ValueError(f"ANOVA requires at least 2 groups, but '{cat_var}' has {len(groups)}.")
+            return tuple(stats.f_oneway(*groups))
+
+        f_stat, p_value = self._cached('anova', (), [cont_var, cat_var], compute)
+
+        # 在后台生成并保存箱形图
+        filepath = f"./results/anova_boxplot_{cont_var}_by_{cat_var}.png"
+        self._submit_boxplot(filepath, 'anova_boxplot', f"ANOVA: {cont_var} by {cat_var}", cont_var, cat_var)
+        self._report(f"Rendering ANOVA boxplot to '{filepath}'.")
 
-        # 根据分类变量将数据拆分为两组
-        group1 = self.df[self.df[cat_var] == unique_groups[0]][num_var].dropna()
-        group2 = self.df[self.df[cat_var] == unique_groups[1]][num_var].dropna()
+        return f_stat, p_value
+
+    @traced()
+    def t_test_or_mannwhitney(self, num_var, cat_var, equal_var=True, resamples=None):
+        """执行 t-Test 或 Mann-Whitney U 检验。equal_var=False 时使用 Welch t-Test。
+
+        resamples 不为 None 时另做置换检验（均值差或秩和，小样本时为精确检验）并返回其 p 值，
+        t-Test 时同时给出均值差的自助法置信区间。
+        """
+        # 按分类变量将数据拆分为各组
+        grouped = self.group_by(num_var, cat_var)
+        if grouped.n_groups != 2:
+            raise ValueError(f"t-Test requires exactly 2 groups, but '{cat_var}' has {grouped.n_groups} groups.")
+        group1, group2 = grouped.groups(drop_empty=False)
 
         # 检查每组数据是否足够进行 t-Test
-        if group1.empty or group2.empty:
+        if len(group1) == 0 or len(group2) == 0:
             raise ValueError(f"One of the groups for '{cat_var}' is empty. Ensure both groups have data.")
 
-        # 检查正态性
-        normal1 = self.check_normality(group1, num_var)
-        normal2 = self.check_normality(group2, num_var)
+        # 一次检查两组的正态性（不生成 Q-Q 图）
+        normality = self.group_normality(num_var, cat_var)
+        for _, row in normality.iterrows():
+            self._report(f"{num_var} | {cat_var}={row['Sample']}: {row['Test']} Test, p-value={row['p-value']:.4g}")
 
         # 根据正态性选择检验方法
-        if normal1 and normal2:
-            print("Both groups are normally distributed. Performing t-Test...")
-            stat, p_value = stats.ttest_ind(group1, group2)
+        if normality['Normal'].all():
+            self._report("Both groups are normally distributed. Performing t-Test...")
+            stat, p_value = self._cached('ttest_ind', equal_var, [num_var, cat_var], lambda: tuple(
+                stats.ttest_ind(group1, group2, equal_var=equal_var)))
+            if resamples:
+                p_value = self.permutation_test('mean_diff', num_var, cat_var, resamples).p_value
+                diff, low, high = self._cached('bootstrap_mean_diff', resamples, [num_var, cat_var],
+                                               lambda: bootstrap_mean_diff(group1, group2, resamples))
+                self._report(f"Mean difference={diff:.4f}, bootstrap 95% CI=({low:.4f}, {high:.4f})")
         else:
-            print("Data not normally distributed. Performing Mann-Whitney U Test...")
-            stat, p_value = stats.mannwhitneyu(group1, group2)
+            self._report("Data not normally distributed. Performing Mann-Whitney U Test...")
+            stat, p_value = self._cached('mannwhitneyu', (), [num_var, cat_var], lambda: tuple(
+                stats.mannwhitneyu(group1, group2)))
+            if resamples:
+                p_value = self.permutation_test('rank_sum', num_var, cat_var, resamples).p_value
 
         # 打印结果
-        print(f"T-Test/Mann-Whitney U Test Results: stat={stat:.4f}, p-value={p_value:.4f}")
+        self._report(f"T-Test/Mann-Whitney U Test Results: stat={stat:.4f}, p-value={p_value:.4f}")
 
-        # 生成并保存箱形图
-        plt.figure(figsize=(8, 5))
-        sns.boxplot(x=cat_var, y=num_var, data=self.df)
-        plt.title(f'T-Test: {num_var} by {cat_var}')
-        plt.tight_layout()
-
-        # 保存图像
+        # 在后台生成并保存箱形图
         filepath = f"./results/ttest_boxplot_{num_var}_by_{cat_var}.png"
-        plt.savefig(filepath)
-        plt.close()
-        print(f"Saved t-Test boxplot as '{filepath}'.")
+        self._submit_boxplot(filepath, 'ttest_boxplot', f'T-Test: {num_var} by {cat_var}', num_var, cat_var)
+        self._report(f"Rendering t-Test boxplot to '{filepath}'.")
 
         return stat, p_value
 
-    def chi_square_test(self, cat_var1, cat_var2):
-        """执行 Chi-Square 检验并生成条形图。"""
-        try:
-            contingency_table = pd.crosstab(self.df[cat_var1], self.df[cat_var2])
-            stat, p_value, dof, expected = stats.chi2_contingency(contingency_table)
+    @traced()
+    def screen_pairs(self, cont_vars, cat_vars, tests=SCREEN_TESTS, max_workers=None):
+        """批量检验所有 连续变量 × 分类变量 组合（ANOVA / Kruskal-Wallis），返回含 p 值、效应量和 FDR q 值的结果表。"""
+        return self._cached('screen_pairs', (tuple(cont_vars), tuple(cat_vars), tuple(tests)),
+                            list(cont_vars) + list(cat_vars),
+                            lambda: screen_pairs(self.df, cont_vars, cat_vars, tests=tests, max_workers=max_workers))
 
-            # 生成并保存条形图
-            plt.figure(figsize=(8, 6))
-            contingency_table.plot(kind="bar", stacked=True, colormap="viridis", ax=plt.gca())
-            plt.title(f"Chi-Square Test: {cat_var1} vs {cat_var2}")
-            plt.tight_layout()
+    @traced()
+    def chi_square_test(self, cat_var1, cat_var2, resamples=None):
+        """执行 Chi-Square 检验并生成条形图。resamples 不为 None 时返回置换检验的 p 值。"""
+        try:
+            # 列联表只构造一次，检验和条形图共用
+            def compute():
+                table = contingency_table(self.df, cat_var1, cat_var2)
+                return (table,) + tuple(chi_square_from_table(table.to_numpy())[:2])
+
+            if self.incremental is not None:
+                table = self.incremental.refresh(('contingency', cat_var1, cat_var2), self.df,
+                                                 lambda: ContingencyAccumulator(cat_var1, cat_var2)).table()
+                stat, p_value = chi_square_from_table(table.to_numpy())[:2]
+            else:
+                table, stat, p_value = self._cached('chi_square', (), [cat_var1, cat_var2], compute)
+            if resamples:
+                p_value = self.permutation_test('chi_square', cat_var1, cat_var2, resamples).p_value
+
+            # 在后台生成并保存条形图
+            def draw(fig, ax):
+                table.plot(kind="bar", stacked=True, colormap="viridis", ax=ax)
+                ax.set_title(f"Chi-Square Test: {cat_var1} vs {cat_var2}")
 
             filepath = f"./results/chi_square_{cat_var1}_vs_{cat_var2}.png"
-            plt.savefig(filepath)
-            plt.close()
-            print(f"Saved Chi-Square bar plot as '{filepath}'.")
+            self._submit_plot(filepath, 'chi_square_bar', [cat_var1, cat_var2], (cat_var1, cat_var2), draw,
+                              figsize=(8, 6))
+            self._report(f"Rendering Chi-Square bar plot to '{filepath}'.")
 
-            print(f"Chi-Square Result: Statistic={stat}, p-value={p_value}")
+            self._report(f"Chi-Square Result: Statistic={stat}, p-value={p_value}")
             return stat, p_value
         except Exception as e:
-            print(f"Error during Chi-Square Test: {e}")
+            self._report(f"Error during Chi-Square Test: {e}")
             return None, None
 
-    def regression(self, dep_var, ind_var):
-        """执行线性回归分析并生成散点图及回归线图。"""
+    @traced()
+    def chi_square_matrix(self, cat_vars):
+        """对所有分类变量两两做卡方检验，返回结果表和对称的 Cramér's V 矩阵，并生成热力图。"""
+        cat_vars = list(cat_vars)
+        results, cramers, p_values = self._cached('chi_square_matrix', tuple(cat_vars), cat_vars,
+                                                  lambda: chi_square_matrix(self.df, cat_vars))
+
+        # 在后台生成并保存 Cramér's V 热力图
+        def draw(fig, ax):
+            sns.heatmap(cramers, vmin=0, vmax=1, cmap="viridis", annot=len(cramers) <= 15, fmt=".2f",
+                        square=True, ax=ax)
+            ax.set_title("Chi-Square Association Matrix (Cramér's V)")
+
+        size = max(6, 0.6 * len(cramers))
+        filepath = "./results/chi_square_matrix.png"
+        self._submit_plot(filepath, 'chi_square_matrix', list(cramers.columns), tuple(cramers.columns), draw,
+                          figsize=(size, size * 0.8))
+        self._report(f"Rendering Chi-Square association heatmap to '{filepath}'.")
+
+        return results, cramers
+
+    @traced()
+    def stratified(self, method, strata, params=None, combine=None, max_workers=None):
+        """在分层变量 strata 的每一层内分别执行同一个检验，返回 (各层结果表, 合并估计)。
+
+        数据集按分层变量只排序一次，各层以行切片交给线程池，在每层上调用 method(**params)
+        （每层不生成图像）。combine 为 'cmh' 时（仅 chi_square_test）计算 Cochran-Mantel-Haenszel
+        检验，为 'fisher' / 'stouffer' 时合并各层的 p 值；为 None 时合并估计也为 None。
+        """
+        params = dict(params or {})
+        if method not in STRATIFIED_METHODS:
+            raise ValueError(f"Method '{method}' cannot be stratified. Choose one of: {', '.join(STRATIFIED_METHODS)}.")
+        if combine is not None and combine not in COMBINE_METHODS:
+            raise ValueError(f"Unknown combination '{combine}'. Choose one of: {', '.join(COMBINE_METHODS)}.")
+        if combine == 'cmh' and method != 'chi_square_test':
+            raise ValueError("The Cochran-Mantel-Haenszel test combines Chi-Square tests only.")
+        if strata not in self.df.columns:
+            raise ValueError(f"Unknown stratification variable '{strata}'.")
+
+        columns = referenced_columns(self.df, method, params)
+        with trace_span('partition strata'):
+            partition = StrataPartition(self.df, strata, columns)
+        renderer = DiscardRenderer()
+
+        def run(data):
+            return getattr(DataAnalysis(data, renderer=renderer, cache=self.cache, verbose=False), method)(**params)
+
+        with trace_span(f'stratified {method}'):
+            table = stratified_table(strata, run_stratified(partition, run, max_workers))
+
+        combined = None
+        if combine == 'cmh':
+            codes1, labels1 = encode(partition.frame[params['cat_var1']])
+            codes2, labels2 = encode(partition.frame[params['cat_var2']])
+            combined = cmh_test(codes1, len(labels1), codes2, len(labels2), partition.offsets)
+        elif combine is not None and 'p-value' in table.columns:
+            combined = combine_p_values(table['p-value'], combine)
+
+        self._report(f"Ran {method} in {len(partition.items())} strata of '{strata}'.")
+        if combined is not None:
+            self._report(f"{combined['Test']}: Statistic={combined['Statistic']:.4f}, p-value={combined['p-value']:.4g}")
+        return table, combined
+
+    @traced()
+    def regression(self, dep_var, ind_vars, method='auto', max_points=SCATTER_MAX_POINTS, dense='hexbin'):
+        """执行线性回归分析（支持多个自变量和公式），生成散点图、拟合线及置信带和预测带。
+
+        ind_vars 可以是列名、列名列表、逗号分隔的列名或公式右侧（如 "Age + np.log(BMI) + C(Diet)"）。
+        增量模式下由累积的 X'X 拟合（忽略 method，残差诊断为 NaN）。
+        返回 (拟合结果, 图像路径)。
+        """
         try:
-            # 提取因变量和自变量
-            y = self.df[dep_var]
-            X = self.df[ind_var]
-
-            # 添加常数项（截距）
-            X = sm.add_constant(X)
-
-            # 拟合线性回归模型
-            model = sm.OLS(y, X).fit()
+            formula = build_formula(dep_var, ind_vars)
+            variables = formula_variables(formula, self.df.columns)
+            numeric = [var for var in variables[1:] if pd.api.types.is_numeric_dtype(self.df[var])]
+
+            def compute():
+                # QR / Cholesky 拟合；置信带和预测带由系数协方差解析计算（不做 bootstrap）
+                with trace_span('fit_ols'):
+                    fit, design_info = fit_ols(self.df, formula, method)
+                with trace_span('regression_bands'):
+                    bands = regression_bands(self.df, fit, design_info, numeric[0], variables) if numeric else None
+                return fit, bands
+
+            def refresh():
+                # 增量模式：由累积的 X'X、X'y 拟合，回归带所需的均值、众数和取值范围也来自累积量
+                accumulator = self.incremental.refresh(('ols', formula), self.df,
+                                                       lambda: OLSAccumulator(formula, variables))
+                fit = accumulator.fit()
+                bands = None
+                if numeric:
+                    bands = prediction_bands(fit, accumulator.design_info(self.df), numeric[0],
+                                             accumulator.typical_values(), *accumulator.value_range(numeric[0]))
+                return fit, bands
+
+            if self.incremental is not None:
+                fit, bands = refresh()
+            else:
+                fit, bands = self._cached('ols', (formula, method), variables, compute)
 
             # 打印回归结果
-            print(model.summary())
-
-            # 生成散点图和回归线，使用 Seaborn 的 regplot
-            plt.figure(figsize=(10, 6))
-            sns.regplot(x=ind_var, y=dep_var, data=self.df, scatter_kws={'alpha': 0.2}, line_kws={"color": "red"})
-            plt.title(f'Regression Analysis: {dep_var} ~ {ind_var}')
-            plt.xlabel(ind_var)
-            plt.ylabel(dep_var)
-            plt.tight_layout()
-
-            # 保存图像
-            filepath = f"./results/regression_{dep_var}_by_{ind_var}.png"
-            plt.savefig(filepath)
-            plt.close()  # 关闭图像以释放内存
-            print(f"Saved regression plot as '{filepath}'.")
+            self._report(fit.summary())
+            if bands is None:
+                self._report("No numeric predictor to plot against; skipping the regression plot.")
+                return fit, None
+
+            # 在后台生成散点图（点数较多时用六边形分箱）、回归线和置信带
+            focal = bands.columns[0]
+
+            def draw(fig, ax):
+                draw_scatter(ax, self.df[focal], self.df[dep_var], max_points, dense)
+                ax.plot(bands[focal], bands['obs_ci_lower'], color='red', linestyle='--', linewidth=1,
+                        label='95% prediction band')
+                ax.plot(bands[focal], bands['obs_ci_upper'], color='red', linestyle='--', linewidth=1)
+                ax.fill_between(bands[focal], bands['mean_ci_lower'], bands['mean_ci_upper'], color='red',
+                                alpha=0.3, label='95% confidence band')
+                ax.plot(bands[focal], bands['mean'], color='red', label='Fitted')
+                ax.set_title(f'Regression Analysis: {dep_var} ~ {" + ".join(variables[1:])}')
+                ax.set_xlabel(focal)
+                ax.set_ylabel(dep_var)
+                ax.legend(loc='best')
+
+            filepath = f"./results/regression_{dep_var}_by_{'_'.join(variables[1:])}.png"
+            self._submit_plot(filepath, 'regression', variables, (formula, method, max_points, dense), draw,
+                              figsize=(10, 6))
+            self._report(f"Rendering regression plot to '{filepath}'.")
+            return fit, filepath
 
         except Exception as e:
-            print(f"Error during regression analysis: {e}")
+            self._report(f"Error during regression analysis: {e}")
+            return None, None
 
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+
+def encode(series):
+    """对分类变量做一次因子化，返回整数编码（缺失值为 -1）和各类别标签。
+
+    类别按首次出现的顺序排列，与 Series.unique() 的顺序一致。
+    """
+    codes, labels = pd.factorize(series, sort=False)
+    return codes, labels
+
+
+class GroupedColumn:
+    """按分类变量拆分后的连续变量。
+
+    分类变量只因子化一次，再用稳定的 argsort 把连续变量重排，使每组成为
+    排序后数组上的一段连续切片。groups() 返回的是这些切片的视图，不会复制数据。
+    """
+
+    def __init__(self, values, keys, codes=None, labels=None):
+        if codes is None:
+            codes, labels = encode(keys)
+        values = np.asarray(values, dtype=np.float64)
+
+        # 丢弃连续变量缺失或分类变量缺失的行
+        keep = (codes >= 0) & ~np.isnan(values)
+        codes = codes[keep]
+        values = values[keep]
+
+        order = np.argsort(codes, kind='stable')
+        self.labels = labels
+        self.values = values[order]
+        self.codes = codes[order]
+        self.counts = np.bincount(codes, minlength=len(labels))
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+
+    @property
+    def n_groups(self):
+        return len(self.labels)
+
+    def group(self, i):
+        """返回第 i 组的数据（视图）。"""
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def groups(self, drop_empty=True):
+        """返回所有组的数据（视图列表），默认跳过空组。"""
+        return [self.group(i) for i in range(self.n_groups)
+                if self.counts[i] > 0 or not drop_empty]
+
+    def items(self):
+        """按类别顺序返回 (类别, 数据) 对。"""
+        return [(self.labels[i], self.group(i)) for i in range(self.n_groups)]
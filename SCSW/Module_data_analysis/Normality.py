@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+NORMALITY_ALPHA = 0.05
+# scipy 对 n > 5000 的 Shapiro-Wilk p 值不再精确，超过该样本量时换用其他检验（或在抽样上做 Shapiro）
+SHAPIRO_MAX_N = 5000
+QQ_QUANTILES = 200
+NORMALITY_COLUMNS = ['Sample', 'N', 'Test', 'Statistic', 'p-value', 'Normal']
+
+
+def _dagostino_pearson(n, skew, kurtosis):
+    """由样本量、偏度 (g1) 和峰度 (b2) 向量化计算 D'Agostino-Pearson K² 及 p 值（公式同 scipy.stats.normaltest）。"""
+    n = n.astype(np.float64)
+
+    # 偏度检验
+    y = skew * np.sqrt((n + 1) * (n + 3) / (6 * (n - 2)))
+    beta2 = 3 * (n ** 2 + 27 * n - 70) * (n + 1) * (n + 3) / ((n - 2) * (n + 5) * (n + 7) * (n + 9))
+    w2 = -1 + np.sqrt(2 * (beta2 - 1))
+    delta = 1 / np.sqrt(0.5 * np.log(w2))
+    alpha = np.sqrt(2 / (w2 - 1))
+    y = np.where(y == 0, 1, y)
+    z_skew = delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+    # 峰度检验
+    expected = 3 * (n - 1) / (n + 1)
+    var_b2 = 24 * n * (n - 2) * (n - 3) / ((n + 1) ** 2 * (n + 3) * (n + 5))
+    x = (kurtosis - expected) / np.sqrt(var_b2)
+    sqrt_beta1 = (6 * (n ** 2 - 5 * n + 2) / ((n + 7) * (n + 9))
+                  * np.sqrt(6 * (n + 3) * (n + 5) / (n * (n - 2) * (n - 3))))
+    a = 6 + 8 / sqrt_beta1 * (2 / sqrt_beta1 + np.sqrt(1 + 4 / sqrt_beta1 ** 2))
+    term1 = 1 - 2 / (9 * a)
+    denom = 1 + x * np.sqrt(2 / (a - 4))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        term2 = np.sign(denom) * np.where(denom == 0, np.nan, ((1 - 2 / a) / np.abs(denom)) ** (1 / 3))
+    z_kurt = (term1 - term2) / np.sqrt(2 / (9 * a))
+
+    k2 = z_skew ** 2 + z_kurt ** 2
+    return k2, stats.chi2.sf(k2, 2)
+
+
+def _segment_moments(values, counts):
+    """对按段存放的数据（各段首尾相接）一次性计算每段的偏度 g1 和峰度 b2（空段为 NaN）。"""
+    counts = np.asarray(counts)
+    nonempty = counts > 0
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+    n = counts[nonempty]
+    skew = np.full(len(counts), np.nan)
+    kurtosis = np.full(len(counts), np.nan)
+    if len(n) == 0:
+        return skew, kurtosis
+
+    mean = np.add.reduceat(values, starts) / n
+    dev = values - np.repeat(mean, n)
+    dev2 = dev * dev
+    m2 = np.add.reduceat(dev2, starts) / n
+    m3 = np.add.reduceat(dev2 * dev, starts) / n
+    m4 = np.add.reduceat(dev2 * dev2, starts) / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skew[nonempty] = m3 / m2 ** 1.5
+        kurtosis[nonempty] = m4 / m2 ** 2
+    return skew, kurtosis
+
+
+def _normality_table(values, counts, names, alpha, seed, large_test):
+    """按样本量为每段数据选择检验：小样本用 Shapiro-Wilk，大样本用向量化的 D'Agostino-Pearson
+    （large_test='dagostino'）或固定种子抽样后的 Shapiro-Wilk（large_test='shapiro'）。"""
+    counts = np.asarray(counts, dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    k = len(counts)
+    tests = np.full(k, 'Insufficient data', dtype=object)
+    statistic = np.full(k, np.nan)
+    p_values = np.full(k, np.nan)
+
+    large = counts > SHAPIRO_MAX_N
+    if large_test == 'dagostino' and large.any():
+        skew, kurtosis = _segment_moments(values, counts)
+        k2, p = _dagostino_pearson(counts[large], skew[large], kurtosis[large])
+        statistic[large], p_values[large] = k2, p
+        tests[large] = "D'Agostino-Pearson"
+    elif large_test != 'dagostino' and large_test != 'shapiro':
+        raise ValueError(f"Unknown large-sample test '{large_test}'. Choose 'dagostino' or 'shapiro'.")
+
+    rng = np.random.default_rng(seed)
+    for i in range(k):
+        if counts[i] < 3 or (large[i] and large_test == 'dagostino'):
+            continue
+        sample = values[offsets[i]:offsets[i + 1]]
+        if large[i]:
+            sample = rng.choice(sample, SHAPIRO_MAX_N, replace=False)
+            tests[i] = f"Shapiro-Wilk (subsample n={SHAPIRO_MAX_N})"
+        else:
+            tests[i] = 'Shapiro-Wilk'
+        statistic[i], p_values[i] = stats.shapiro(sample)
+
+    return pd.DataFrame({'Sample': list(names), 'N': counts, 'Test': tests, 'Statistic': statistic,
+                         'p-value': p_values, 'Normal': p_values > alpha}, columns=NORMALITY_COLUMNS)
+
+
+def test_normality(samples, alpha=NORMALITY_ALPHA, seed=0, large_test='dagostino'):
+    """对多个样本一次性做正态性检验（忽略缺失值），返回每个样本一行的结果表。
+
+    samples 可以是 DataFrame（每列一个样本）或 {名称: 数据} 字典。
+    """
+    if isinstance(samples, pd.DataFrame):
+        samples = {col: samples[col] for col in samples.columns}
+    arrays = [np.asarray(pd.Series(data).dropna(), dtype=np.float64) for data in samples.values()]
+    values = np.concatenate(arrays) if arrays else np.empty(0)
+    return _normality_table(values, [len(a) for a in arrays], samples.keys(), alpha, seed, large_test)
+
+
+def test_group_normality(grouped, alpha=NORMALITY_ALPHA, seed=0, large_test='dagostino'):
+    """对 GroupedColumn 的每一组做正态性检验（直接使用分组后的连续数组，不复制数据）。"""
+    return _normality_table(grouped.values, grouped.counts, grouped.labels, alpha, seed, large_test)
+
+
+def qq_points(data, n_quantiles=QQ_QUANTILES):
+    """取固定个数的分位点作 Q-Q 图，返回 (理论分位数, 样本分位数, (斜率, 截距))。
+
+    概率位置与 scipy.stats.probplot 相同（Filliben 近似）；样本量不超过 n_quantiles 时
+    直接使用全部排序后的数据，否则用 np.quantile 取分位数，不必画出每一个点。
+    """
+    data = np.asarray(pd.Series(data).dropna(), dtype=np.float64)
+    m = min(len(data), n_quantiles)
+    positions = (np.arange(1, m + 1) - 0.3175) / (m + 0.365)
+    positions[-1] = 0.5 ** (1 / m)
+    positions[0] = 1 - positions[-1]
+    theoretical = stats.norm.ppf(positions)
+    sample = np.sort(data) if len(data) <= n_quantiles else np.quantile(data, positions)
+    slope, intercept = np.polyfit(theoretical, sample, 1)
+    return theoretical, sample, (slope, intercept)
+
+
+def draw_qq(ax, theoretical, sample, line, title):
+    """在给定坐标轴上绘制 Q-Q 图。"""
+    slope, intercept = line
+    ax.plot(theoretical, sample, 'o', markersize=4)
+    ax.plot(theoretical, slope * theoretical + intercept, 'r-')
+    ax.set_title(title)
+    ax.set_xlabel('Theoretical quantiles')
+    ax.set_ylabel('Ordered Values')
@@ -0,0 +1,388 @@
+import ast
+import re
+
+import numpy as np
+import pandas as pd
+import patsy
+import scipy.linalg as linalg
+import scipy.stats as stats
+
+from Module_Data_Cache.IncrementalStore import RebuildNeeded
+from Module_Data_Inspection.IncrementalStatistics import CoMoments, LabelCounts, Moments
+
+# 超过该点数时散点图改为六边形分箱（或随机抽样）
+SCATTER_MAX_POINTS = 5000
+# 行数达到该值时 method='auto' 改用 X'X 的 Cholesky 分解（只需 p × p 的内存）
+CHOLESKY_MIN_ROWS = 100_000
+BAND_POINTS = 200
+
+
+def build_formula(dep_var, predictors):
+    """由因变量和自变量构造 patsy 公式。
+
+    predictors 可以是列名列表、逗号分隔的列名字符串，或公式右侧（如 "Age + np.log(BMI)"）；
+    dep_var 为 None 且 predictors 含 '~' 时视为完整公式。列名一律用 Q("...") 引用，可以包含空格。
+    """
+    if isinstance(predictors, str) and '~' in predictors:
+        return predictors
+    if isinstance(predictors, str):
+        if any(op in predictors for op in '+*:()'):
+            return f'Q("{dep_var}") ~ {predictors}'
+        predictors = [p.strip() for p in predictors.split(',') if p.strip()]
+    terms = ' + '.join(f'Q("{p}")' for p in predictors)
+    return f'Q("{dep_var}") ~ {terms}'
+
+
+def formula_variables(formula, columns):
+    """返回公式中引用到的数据列（按出现顺序，先因变量后自变量）。"""
+    columns = set(columns)
+    found = []
+    desc = patsy.ModelDesc.from_formula(formula)
+    for term in desc.lhs_termlist + desc.rhs_termlist:
+        for factor in term.factors:
+            for name in _code_variables(factor.code, columns):
+                if name not in found:
+                    found.append(name)
+    return found
+
+
+def _code_variables(code, columns):
+    """返回一个因子表达式（如 'np.log(Q("BMI"))'）中引用到的数据列。"""
+    names = []
+    for node in ast.walk(ast.parse(code, mode='eval')):
+        if isinstance(node, ast.Name):
+            name = node.id
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'Q'
+              and node.args and isinstance(node.args[0], ast.Constant)):
+            name = node.args[0].value
+        else:
+            continue
+        if name in columns and name not in names:
+            names.append(name)
+    return names
+
+
+class OLSFit:
+    """最小二乘拟合结果，字段命名与 statsmodels 的 RegressionResults 一致。
+
+    系数由 X 的 QR 分解（或 X'X 的 Cholesky 分解）求解，两种方法都得到上三角因子 R
+    （X'X = R'R），协方差矩阵 sigma² (R'R)⁻¹ 直接由 R 求出，不需要再对 X'X 求逆。
+    """
+
+    def __init__(self, y, X, exog_names, endog_name, method='auto'):
+        y = np.asarray(y, dtype=np.float64)
+        X = np.asarray(X, dtype=np.float64)
+        n, p = X.shape
+        if n <= p:
+            raise ValueError(f"Regression needs more observations ({n}) than parameters ({p}).")
+
+        if method == 'auto':
+            method = 'cholesky' if n >= CHOLESKY_MIN_ROWS else 'qr'
+        if method == 'cholesky':
+            try:
+                R = linalg.cholesky(X.T @ X, lower=False)
+                params = linalg.cho_solve((R, False), X.T @ y)
+            except linalg.LinAlgError:
+                method = 'qr'  # 病态矩阵退回数值上更稳定的 QR
+        if method == 'qr':
+            Q, R = np.linalg.qr(X)
+            params = linalg.solve_triangular(R, Q.T @ y)
+        elif method != 'cholesky':
+            raise ValueError(f"Unknown method '{method}'. Choose 'auto', 'qr' or 'cholesky'.")
+
+        resid = y - X @ params
+        centered = y - y.mean() if 'Intercept' in exog_names else y
+        self._set_estimates(method, R, params, n, float(resid @ resid), float(centered @ centered),
+                            exog_names, endog_name)
+
+        # 残差诊断（与 statsmodels summary 底部的统计量相同）
+        self.omnibus = tuple(stats.normaltest(resid)) if n >= 8 else (np.nan, np.nan)
+        self.durbin_watson = float(np.sum(np.diff(resid) ** 2) / self.ssr)
+        self.jarque_bera = tuple(stats.jarque_bera(resid))
+        self.resid_skew = float(stats.skew(resid))
+        self.resid_kurtosis = float(stats.kurtosis(resid, fisher=False))
+
+    @classmethod
+    def from_moments(cls, comoments, exog_names, endog_name):
+        """由累积的协矩（CoMoments，变量依次为设计矩阵各列和因变量）拟合（增量模式），不需要原始数据。
+
+        有截距时在中心化的叉积矩阵上求解斜率，截距由均值得到；X'X 的上三角因子由 √n、均值和
+        中心化叉积的 Cholesky 因子直接拼出，不需要先还原原始的 X'X。残差平方和取自增广矩阵
+        [X y] 的 Cholesky 因子的最后一个对角元，不做 y'y - b'X'y 这样的大数相减。
+        系数和各项检验与对全部数据拟合的结果相同；残差诊断需要逐行的残差，记为 NaN。
+        """
+        n, p = comoments.n, len(exog_names)
+        if n <= p:
+            raise ValueError(f"Regression needs more observations ({n}) than parameters ({p}).")
+        intercept = bool(exog_names) and exog_names[0] == 'Intercept'
+        if intercept:
+            # 截距列中心化后为 0，只对其余各列和因变量的中心化叉积分解
+            augmented = comoments.cross[1:, 1:]
+        else:
+            augmented = comoments.cross + n * np.outer(comoments.mean, comoments.mean)
+        try:
+            L = linalg.cholesky(augmented, lower=False)
+        except linalg.LinAlgError:
+            raise ValueError("The design matrix is rank deficient (collinear predictors).")
+        Rx, rxy, ssr = L[:-1, :-1], L[:-1, -1], float(L[-1, -1] ** 2)
+        if np.any(np.abs(np.diag(Rx)) == 0):
+            raise ValueError("The design matrix is rank deficient (collinear predictors).")
+        slopes = linalg.solve_triangular(Rx, rxy)
+        if intercept:
+            x_mean, y_mean = comoments.mean[1:-1], comoments.mean[-1]
+            params = np.concatenate(([y_mean - x_mean @ slopes], slopes))
+            R = np.zeros((p, p))
+            R[0, 0] = np.sqrt(n)
+            R[0, 1:] = np.sqrt(n) * x_mean
+            R[1:, 1:] = Rx
+            centered_tss = float(comoments.cross[-1, -1])
+        else:
+            params, R = slopes, Rx
+            centered_tss = float(augmented[-1, -1])
+
+        fit = cls.__new__(cls)
+        fit._set_estimates('moments', R, params, n, ssr, centered_tss, exog_names, endog_name)
+        fit.omnibus = fit.jarque_bera = (np.nan, np.nan)
+        fit.durbin_watson = fit.resid_skew = fit.resid_kurtosis = np.nan
+        return fit
+
+    def _set_estimates(self, method, R, params, n, ssr, centered_tss, exog_names, endog_name):
+        """由上三角因子 R、系数、残差平方和与总平方和计算标准误、检验和信息准则。"""
+        p = len(params)
+        singular = np.abs(np.diag(R))
+        if singular.min() <= singular.max() * max(n, p) * np.finfo(np.float64).eps:
+            raise ValueError("The design matrix is rank deficient (collinear predictors).")
+
+        self.method = method
+        self.endog_name = endog_name
+        self.exog_names = list(exog_names)
+        self.nobs = n
+        self.k_constant = int('Intercept' in self.exog_names)
+        self.df_model = p - self.k_constant
+        self.df_resid = n - p
+        self.params = params
+        self.ssr = ssr
+        self.centered_tss = centered_tss
+        self.scale = self.ssr / self.df_resid
+
+        R_inv = linalg.solve_triangular(R, np.eye(p))
+        self.normalized_cov_params = R_inv @ R_inv.T
+        self.cov_params = self.scale * self.normalized_cov_params
+        self.bse = np.sqrt(np.diag(self.cov_params))
+        self.tvalues = params / self.bse
+        self.pvalues = 2 * stats.t.sf(np.abs(self.tvalues), self.df_resid)
+
+        self.rsquared = 1 - self.ssr / self.centered_tss
+        self.rsquared_adj = 1 - (n - self.k_constant) / self.df_resid * (1 - self.rsquared)
+        if self.df_model > 0:
+            self.fvalue = (self.centered_tss - self.ssr) / self.df_model / self.scale
+            self.f_pvalue = stats.f.sf(self.fvalue, self.df_model, self.df_resid)
+        else:
+            self.fvalue = self.f_pvalue = np.nan
+        self.llf = -n / 2 * (np.log(2 * np.pi * self.ssr / n) + 1)
+        self.aic = -2 * self.llf + 2 * p
+        self.bic = -2 * self.llf + np.log(n) * p
+        self.condition_number = float(np.linalg.cond(R))
+
+    def conf_int(self, alpha=0.05):
+        """返回系数的置信区间 (p × 2)。"""
+        q = stats.t.ppf(1 - alpha / 2, self.df_resid)
+        return np.column_stack([self.params - q * self.bse, self.params + q * self.bse])
+
+    def get_prediction(self, X_new, alpha=0.05):
+        """计算新设计矩阵上的预测值及其置信带和预测带（解析公式，不做 bootstrap）。
+
+        均值的标准误为 sqrt(x' Cov x)，单个观测的预测标准误再加上残差方差。
+        返回列名与 statsmodels summary_frame() 相同的 DataFrame。
+        """
+        X_new = np.asarray(X_new, dtype=np.float64)
+        mean = X_new @ self.params
+        se_mean = np.sqrt(np.einsum('ij,jk,ik->i', X_new, self.cov_params, X_new))
+        se_obs = np.sqrt(se_mean ** 2 + self.scale)
+        q = stats.t.ppf(1 - alpha / 2, self.df_resid)
+        return pd.DataFrame({
+            'mean': mean, 'mean_se': se_mean,
+            'mean_ci_lower': mean - q * se_mean, 'mean_ci_upper': mean + q * se_mean,
+            'obs_ci_lower': mean - q * se_obs, 'obs_ci_upper': mean + q * se_obs,
+        })
+
+    def summary(self, alpha=0.05):
+        """返回与 statsmodels OLS summary 版式相近的文本结果。"""
+        width = 78
+        method = {'qr': 'Least Squares (QR)', 'cholesky': 'Least Squares (Cholesky)',
+                  'moments': 'Incremental'}[self.method]
+        left = [('Dep. Variable:', self.endog_name), ('Model:', 'OLS'), ('Method:', method),
+                ('No. Observations:', f"{self.nobs}"), ('Df Residuals:', f"{self.df_resid}"),
+                ('Df Model:', f"{self.df_model}")]
+        right = [('R-squared:', f"{self.rsquared:.3f}"), ('Adj. R-squared:', f"{self.rsquared_adj:.3f}"),
+                 ('F-statistic:', f"{self.fvalue:.4g}"), ('Prob (F-statistic):', f"{self.f_pvalue:.3g}"),
+                 ('Log-Likelihood:', f"{self.llf:.5g}"), ('AIC:', f"{self.aic:.4g}"),
+                 ('BIC:', f"{self.bic:.4g}")]
+        lines = ['OLS Regression Results'.center(width), '=' * width]
+        for i in range(max(len(left), len(right))):
+            l_label, l_value = left[i] if i < len(left) else ('', '')
+            r_label, r_value = right[i] if i < len(right) else ('', '')
+            lines.append(f"{l_label:<20}{l_value[:18]:>18}   {r_label:<20}{r_value:>17}")
+        lines.append('=' * width)
+
+        name_width = max(20, max(len(name) for name in self.exog_names) + 2)
+        low, high = f"[{alpha / 2:.3f}", f"{1 - alpha / 2:.3f}]"
+        lines.append(f"{'':<{name_width}}{'coef':>10}{'std err':>11}{'t':>11}{'P>|t|':>11}{low:>12}{high:>12}")
+        lines.append('-' * (name_width + 67))
+        for name, coef, se, t, p, (lo, hi) in zip(self.exog_names, self.params, self.bse, self.tvalues,
+                                                  self.pvalues, self.conf_int(alpha)):
+            lines.append(f"{name:<{name_width}}{coef:>10.4f}{se:>11.3f}{t:>11.3f}{p:>11.3f}{lo:>12.3f}{hi:>12.3f}")
+        lines.append('=' * width)
+
+        diagnostics = [('Omnibus:', f"{self.omnibus[0]:.3f}", 'Durbin-Watson:', f"{self.durbin_watson:.3f}"),
+                       ('Prob(Omnibus):', f"{self.omnibus[1]:.3f}", 'Jarque-Bera (JB):', f"{self.jarque_bera[0]:.3f}"),
+                       ('Skew:', f"{self.resid_skew:.3f}", 'Prob(JB):', f"{self.jarque_bera[1]:.3g}"),
+                       ('Kurtosis:', f"{self.resid_kurtosis:.3f}", 'Cond. No.', f"{self.condition_number:.3g}")]
+        for l_label, l_value, r_label, r_value in diagnostics:
+            lines.append(f"{l_label:<20}{l_value:>18}   {r_label:<20}{r_value:>17}")
+        lines.append('=' * width)
+        return '\n'.join(lines)
+
+
+def fit_ols(df, formula, method='auto'):
+    """按公式构造设计矩阵（缺失值所在行被剔除）并拟合 OLS，返回 (OLSFit, design_info)。"""
+    y, X = patsy.dmatrices(formula, df, NA_action='drop', return_type='matrix')
+    # 结果中显示原列名，而不是 Q("...") 引用
+    endog_name = _unquote(y.design_info.column_names[0])
+    exog_names = [_unquote(name) for name in X.design_info.column_names]
+    return OLSFit(np.asarray(y).ravel(), X, exog_names, endog_name, method), X.design_info
+
+
+def _unquote(name):
+    return re.sub(r'Q\("([^"]*)"\)', r'\1', name)
+
+
+def typical_values(df, variables):
+    """返回各变量的代表值：数值变量取均值，其他变量取众数（用于固定非焦点变量）。"""
+    values = {}
+    for var in variables:
+        col = df[var]
+        values[var] = col.mean() if pd.api.types.is_numeric_dtype(col) else col.mode().iloc[0]
+    return values
+
+
+def regression_bands(df, fit, design_info, focal, variables, alpha=0.05, n_points=BAND_POINTS):
+    """沿焦点变量的取值范围计算拟合线、置信带和预测带，其余变量固定在代表值上。"""
+    return prediction_bands(fit, design_info, focal, typical_values(df, variables), df[focal].min(),
+                            df[focal].max(), alpha, n_points)
+
+
+def prediction_bands(fit, design_info, focal, values, low, high, alpha=0.05, n_points=BAND_POINTS):
+    """在焦点变量的 [low, high] 上计算拟合线和两种带，其余变量固定在 values 给出的代表值上。"""
+    grid = pd.DataFrame(values, index=range(n_points))
+    grid[focal] = np.linspace(low, high, n_points)
+    X_grid = patsy.build_design_matrices([design_info], grid, NA_action='raise')[0]
+    bands = fit.get_prediction(X_grid, alpha)
+    bands.insert(0, focal, grid[focal].to_numpy())
+    return bands
+
+
+class OLSAccumulator:
+    """OLS 的可合并充分统计量：[X y] 的协矩（均值和中心化叉积，按 Chan 公式合并），以及回归带需要的
+    各变量均值、众数和取值范围。
+
+    新追加的行按第一次累积时的分类水平构造设计矩阵后直接累加。新行出现了新的分类水平时
+    抛出 RebuildNeeded；公式含有依赖全部数据的变换（center、standardize 等）或把数值列当作
+    分类变量时 incremental 为 False，这样的累积量不保存，追加数据后总是重新累积。
+    """
+
+    def __init__(self, formula, variables):
+        self.formula = formula
+        self.variables = list(variables)
+        self.rows = 0
+        self.nobs = 0
+        self.comoments = None
+        self.endog_name = self.exog_names = None
+        self.levels = {}
+        self.incremental = True
+        self.moments = {}
+        self.labels = {}
+        self._design_info = None
+
+    def __getstate__(self):
+        # patsy 的 DesignInfo 不能序列化，需要时由分类水平重新构造
+        state = dict(self.__dict__)
+        state['_design_info'] = None
+        return state
+
+    def _design(self, frame):
+        """构造 (y, X)；分类变量先转换为第一次累积时的水平，保证各部分的设计矩阵列一致。"""
+        if self.levels:
+            frame = frame[self.variables].copy()
+            for var, levels in self.levels.items():
+                column = frame[var]
+                if (column.notna() & ~column.isin(levels)).any():
+                    raise RebuildNeeded(f"'{var}' has categories that were not seen before.")
+                frame[var] = pd.Categorical(column, categories=levels)
+        y, X = patsy.dmatrices(self.formula, frame, NA_action='drop', return_type='matrix')
+        if self.exog_names is None:
+            self._record_design(frame, y.design_info, X.design_info)
+        elif [_unquote(name) for name in X.design_info.column_names] != self.exog_names:
+            raise RebuildNeeded("The design matrix columns changed.")
+        self._design_info = X.design_info
+        return np.asarray(y).ravel(), np.asarray(X)
+
+    def _record_design(self, frame, y_info, X_info):
+        self.endog_name = _unquote(y_info.column_names[0])
+        self.exog_names = [_unquote(name) for name in X_info.column_names]
+        for info in list(y_info.factor_infos.values()) + list(X_info.factor_infos.values()):
+            if info.state.get('transforms'):
+                self.incremental = False
+            if info.type != 'categorical':
+                continue
+            names = _code_variables(info.factor.code, self.variables)
+            if len(names) == 1 and (pd.api.types.is_bool_dtype(frame[names[0]])
+                                    or not pd.api.types.is_numeric_dtype(frame[names[0]])):
+                self.levels[names[0]] = list(info.categories)
+            else:
+                self.incremental = False
+
+    def update(self, frame):
+        """并入新追加的行。"""
+        y, X = self._design(frame)
+        part = CoMoments.from_rows(np.column_stack([X, y]))
+        self.comoments = part if self.comoments is None else self.comoments.merge(part)
+        self.nobs += len(y)
+        for var in self.variables:
+            column = frame[var]
+            if pd.api.types.is_numeric_dtype(column):
+                values = column.to_numpy(dtype=np.float64, na_value=np.nan)[None, :]
+                self.moments[var] = self.moments.get(var, Moments.empty(1)).merge(Moments.from_block(values))
+            else:
+                self.labels[var] = self.labels.get(var, LabelCounts()).merge(LabelCounts.from_series(column))
+        self.rows += len(frame)
+
+    def fit(self):
+        return OLSFit.from_moments(self.comoments, self.exog_names, self.endog_name)
+
+    def design_info(self, frame):
+        """返回设计矩阵的 DesignInfo（从文件恢复的累积量用 frame 的空切片重新构造）。"""
+        if self._design_info is None:
+            self._design(frame.iloc[:0])
+        return self._design_info
+
+    def typical_values(self):
+        """与 typical_values() 相同：数值变量取均值，其他变量取众数。"""
+        return {var: self.moments[var].mean[0] if var in self.moments else self.labels[var].mode()
+                for var in self.variables}
+
+    def value_range(self, var):
+        return self.moments[var].low[0], self.moments[var].high[0]
+
+
+def draw_scatter(ax, x, y, max_points=SCATTER_MAX_POINTS, dense='hexbin', seed=0):
+    """绘制散点；点数超过 max_points 时改用六边形分箱（dense='hexbin'）或随机抽样（dense='sample'）。"""
+    keep = x.notna() & y.notna()
+    x, y = x[keep].to_numpy(), y[keep].to_numpy()
+    if len(x) <= max_points:
+        ax.scatter(x, y, s=8, alpha=0.3)
+    elif dense == 'hexbin':
+        ax.hexbin(x, y, gridsize=50, mincnt=1, cmap='Blues')
+    else:
+        index = np.random.default_rng(seed).choice(len(x), max_points, replace=False)
+        ax.scatter(x[index], y[index], s=8, alpha=0.3)
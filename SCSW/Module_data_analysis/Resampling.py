@@ -0,0 +1,254 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, islice
+from math import comb
+
+import numpy as np
+import scipy.stats as stats
+from scipy.special import gammaln
+
+RESAMPLING_STATISTICS = ('mean_diff', 'rank_sum', 'anova_f', 'chi_square')
+DEFAULT_RESAMPLES = 10_000
+# 每批置换的索引矩阵最多包含的元素个数（批大小 × 样本量），用于限制内存占用
+BATCH_ELEMENTS = 4_000_000
+MAX_BATCH_SIZE = 250
+# 每轮固定提交的批数；提前停止只在每轮结束时判断，因此结果与进程数无关
+ROUND_BATCHES = 8
+# 至少做这么多次重抽样后才允许提前停止
+MIN_RESAMPLES = 1000
+# p 值与显著性水平之差超过这么多个标准误时认为结论已经确定
+EARLY_STOP_Z = 3.29
+# 样本量 × 重抽样次数低于该值时在当前进程中计算，不启动进程池
+PARALLEL_MIN_WORK = 50_000_000
+
+ResamplingResult = namedtuple('ResamplingResult', ['statistic', 'p_value', 'resamples', 'method'])
+
+# 工作进程中共享的检验数据，由进程池初始化函数设置
+_worker_problem = None
+
+
+def _init_worker(problem):
+    """进程池初始化：每个工作进程只接收一次检验数据。"""
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _prepare(statistic, values=None, codes=None, codes2=None):
+    """整理检验数据，返回 problem 字典（各组按顺序连续排列，缺失值已去掉）。"""
+    if statistic not in RESAMPLING_STATISTICS:
+        raise ValueError(f"Unknown resampling statistic '{statistic}'. "
+                         f"Choose one of: {', '.join(RESAMPLING_STATISTICS)}.")
+    codes = np.asarray(codes)
+    if statistic == 'chi_square':
+        codes2 = np.asarray(codes2)
+        keep = (codes >= 0) & (codes2 >= 0)
+        # 重新编码为 0..r-1 / 0..c-1，只保留出现过的类别
+        _, rows = np.unique(codes[keep], return_inverse=True)
+        _, cols = np.unique(codes2[keep], return_inverse=True)
+        n_rows, n_cols = rows.max() + 1, cols.max() + 1
+        observed = np.bincount(rows * n_cols + cols, minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+        expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / observed.sum()
+        if n_rows < 2 or n_cols < 2:
+            raise ValueError("Chi-square resampling requires at least 2 categories in each variable.")
+        return {'statistic': statistic, 'rows': rows.astype(np.int64), 'cols': cols.astype(np.int64),
+                'shape': (n_rows, n_cols), 'expected': expected, 'n': len(rows)}
+
+    values = np.asarray(values, dtype=np.float64)
+    keep = (codes >= 0) & ~np.isnan(values)
+    values, codes = values[keep], codes[keep]
+    order = np.argsort(codes, kind='stable')
+    values, codes = values[order], codes[order]
+    counts = np.bincount(codes)
+    counts = counts[counts > 0]
+    if len(counts) < 2:
+        raise ValueError("Resampling tests require at least 2 non-empty groups.")
+    if statistic == 'mean_diff' and len(counts) != 2:
+        raise ValueError(f"The mean difference requires exactly 2 groups, but there are {len(counts)}.")
+    if statistic == 'rank_sum':
+        values = stats.rankdata(values)
+    else:
+        # 先减去总均值：均值差和 F 值不变，但组和平方减总和平方不会在均值很大时相互抵消
+        values = values - values.mean()
+    return {'statistic': statistic, 'values': values, 'counts': counts,
+            'offsets': np.concatenate(([0], np.cumsum(counts)[:-1])), 'total': values.sum(), 'n': len(values),
+            'ss_total': ((values - values.mean()) ** 2).sum()}
+
+
+def _two_group_statistic(problem, first_sums):
+    """由第一组的和计算两组统计量（均值差或以秩和中心化的 U 统计量），可以是数组。"""
+    n0, n1 = problem['counts']
+    if problem['statistic'] == 'mean_diff':
+        return (problem['total'] - first_sums) / n1 - first_sums / n0
+    # 第一组的秩和减去其期望，等于 Mann-Whitney U - n0·n1/2
+    return first_sums - n0 * (problem['n'] + 1) / 2
+
+
+def _uses_first_group(problem):
+    """两组的均值差和秩和只取决于第一组的和（检验为双侧）。"""
+    return problem['statistic'] in ('mean_diff', 'rank_sum') and len(problem['counts']) == 2
+
+
+def _group_statistics(problem, group_sums):
+    """由各组的和（形状为 批大小 × 组数）一次计算整批统计量。"""
+    counts = problem['counts']
+    n = problem['n']
+    if _uses_first_group(problem):
+        return _two_group_statistic(problem, group_sums[:, 0])
+    if problem['statistic'] == 'rank_sum':
+        # Kruskal-Wallis H（结点校正因子在置换下不变，省略不影响比较）
+        return 12.0 / (n * (n + 1)) * (group_sums ** 2 / counts).sum(axis=1) - 3 * (n + 1)
+    ss_between = (group_sums ** 2 / counts).sum(axis=1) - problem['total'] ** 2 / n
+    k = len(counts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (ss_between / (k - 1)) / ((problem['ss_total'] - ss_between) / (n - k))
+
+
+def _chi_square_statistics(problem, tables):
+    expected = problem['expected']
+    return ((tables - expected) ** 2 / expected).sum(axis=(-2, -1))
+
+
+def _observed_statistic(problem):
+    if problem['statistic'] == 'chi_square':
+        n_rows, n_cols = problem['shape']
+        table = np.bincount(problem['rows'] * n_cols + problem['cols'], minlength=n_rows * n_cols)
+        return float(_chi_square_statistics(problem, table.reshape(n_rows, n_cols)))
+    sums = np.add.reduceat(problem['values'], problem['offsets'])
+    return float(_group_statistics(problem, sums[None, :])[0])
+
+
+def _count_extreme(problem, resampled, observed):
+    """统计至少和观察值一样极端的次数（两组统计量取绝对值，留出舍入误差）。"""
+    if _uses_first_group(problem):
+        resampled, observed = np.abs(resampled), abs(observed)
+    return int((resampled >= observed - 1e-9 * max(abs(observed), 1.0)).sum())
+
+
+def _batch_statistics(problem, index):
+    """对一批置换（index 的每一行是一个置换）一次计算所有统计量。"""
+    if problem['statistic'] == 'chi_square':
+        n_rows, n_cols = problem['shape']
+        batch = len(index)
+        cells = n_rows * n_cols
+        combined = problem['rows'] * n_cols + problem['cols'][index] + (np.arange(batch) * cells)[:, None]
+        tables = np.bincount(combined.ravel(), minlength=batch * cells).reshape(batch, n_rows, n_cols)
+        return _chi_square_statistics(problem, tables)
+    if _uses_first_group(problem):
+        # 只需要第一组的成员
+        first = problem['values'][index[:, :problem['counts'][0]]].sum(axis=1)
+        return _two_group_statistic(problem, first)
+    return _group_statistics(problem, np.add.reduceat(problem['values'][index], problem['offsets'], axis=1))
+
+
+def _run_batch(seed, batch_index, batch_size, observed, problem=None):
+    """生成第 batch_index 批置换并统计极端次数；随机数种子只取决于 (seed, batch_index)。"""
+    problem = _worker_problem if problem is None else problem
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(batch_index,)))
+    n = problem['n']
+    index = rng.permuted(np.broadcast_to(np.arange(n), (batch_size, n)), axis=1)
+    return _count_extreme(problem, _batch_statistics(problem, index), observed)
+
+
+def _exact_fits(n, n0, max_resamples):
+    """所有可能分组数 C(n, n0) 是否不超过 max_resamples：先用 log-gamma 比较对数，
+    只有数量级合适时才计算精确的组合数（n 很大时 comb() 本身非常慢）。"""
+    log_comb = gammaln(n + 1) - gammaln(n0 + 1) - gammaln(n - n0 + 1)
+    return log_comb <= np.log(max_resamples) + 1e-9 and comb(n, n0) <= max_resamples
+
+
+def _exact_test(problem, observed):
+    """两组且组合数不多时枚举第一组的所有可能成员，得到精确 p 值。"""
+    n, n0 = problem['n'], problem['counts'][0]
+    values = problem['values']
+    batch = max(1, min(MAX_BATCH_SIZE * 10, BATCH_ELEMENTS // max(n0, 1)))
+    combos = combinations(range(n), n0)
+    hits = total = 0
+    while True:
+        chunk = np.array(list(islice(combos, batch)), dtype=np.intp).reshape(-1, n0)
+        if not len(chunk):
+            break
+        hits += _count_extreme(problem, _two_group_statistic(problem, values[chunk].sum(axis=1)), observed)
+        total += len(chunk)
+    return hits / total, total
+
+
+def permutation_test(statistic, values=None, codes=None, codes2=None, max_resamples=DEFAULT_RESAMPLES,
+                     alpha=0.05, seed=0, max_workers=None, early_stop=True, exact=True):
+    """置换检验，返回 ResamplingResult(统计量, p 值, 重抽样次数, 方法)。
+
+    statistic 为 'mean_diff'、'rank_sum'（两组为秩和，多组为 Kruskal-Wallis H）、'anova_f'
+    或 'chi_square'（codes 与 codes2 为两个分类变量的编码）；codes 中 -1 表示缺失。
+    每批置换以二维索引矩阵一次生成，整批统计量由一次 NumPy 运算得到；各批分发到进程池，
+    第 i 批的随机数只由 (seed, i) 决定，结果与进程数无关。early_stop=True 时，一旦 p 值与
+    alpha 的差距足够大（超过 EARLY_STOP_Z 个标准误）就提前停止。两组且所有可能分组数
+    不超过 max_resamples 时，exact=True 会枚举全部分组，给出精确 p 值。
+
+    两组统计量的双侧 p 值定义为 |统计量| 不小于观察值的分组（或置换）所占比例。组大小不等、
+    零分布不对称时，它与 scipy.stats.permutation_test 的双侧 p 值（较小的单侧 p 值的两倍）不同。
+    """
+    problem = _prepare(statistic, values, codes, codes2)
+    observed = _observed_statistic(problem)
+    n = problem['n']
+
+    if exact and _uses_first_group(problem) and _exact_fits(n, int(problem['counts'][0]), max_resamples):
+        p_value, total = _exact_test(problem, observed)
+        return ResamplingResult(observed, p_value, total, 'exact')
+
+    batch_size = max(1, min(MAX_BATCH_SIZE, BATCH_ELEMENTS // max(n, 1), max_resamples))
+    max_workers = max_workers or os.cpu_count() or 1
+    use_pool = max_workers > 1 and n * max_resamples >= PARALLEL_MIN_WORK
+
+    hits = done = batch_index = 0
+    executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                   initargs=(problem,)) if use_pool else None
+    try:
+        while done < max_resamples:
+            sizes = []
+            for _ in range(ROUND_BATCHES):
+                size = min(batch_size, max_resamples - done - sum(sizes))
+                if size <= 0:
+                    break
+                sizes.append(size)
+            if executor is not None:
+                futures = [executor.submit(_run_batch, seed, batch_index + i, size, observed)
+                           for i, size in enumerate(sizes)]
+                hits += sum(future.result() for future in futures)
+            else:
+                hits += sum(_run_batch(seed, batch_index + i, size, observed, problem)
+                            for i, size in enumerate(sizes))
+            batch_index += len(sizes)
+            done += sum(sizes)
+
+            if early_stop and done >= MIN_RESAMPLES:
+                p_value = (hits + 1) / (done + 1)
+                std_error = np.sqrt(p_value * (1 - p_value) / done)
+                if abs(p_value - alpha) > EARLY_STOP_Z * std_error:
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    method = 'permutation' if done >= max_resamples else 'permutation (stopped early)'
+    return ResamplingResult(observed, (hits + 1) / (done + 1), done, method)
+
+
+def bootstrap_mean_diff(group1, group2, n_resamples=DEFAULT_RESAMPLES, confidence=0.95, seed=0):
+    """用自助法估计两组均值差（第二组减第一组）的百分位置信区间，返回 (均值差, 下限, 上限)。
+
+    每批在两组内各自有放回地抽取索引矩阵，一次算出整批的均值。
+    """
+    group1 = np.asarray(group1, dtype=np.float64)
+    group2 = np.asarray(group2, dtype=np.float64)
+    group1, group2 = group1[~np.isnan(group1)], group2[~np.isnan(group2)]
+    rng = np.random.default_rng(seed)
+    batch_size = max(1, min(MAX_BATCH_SIZE, BATCH_ELEMENTS // max(len(group1) + len(group2), 1)))
+    diffs = []
+    for start in range(0, n_resamples, batch_size):
+        size = min(batch_size, n_resamples - start)
+        means1 = group1[rng.integers(0, len(group1), (size, len(group1)))].mean(axis=1)
+        means2 = group2[rng.integers(0, len(group2), (size, len(group2)))].mean(axis=1)
+        diffs.append(means2 - means1)
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(np.concatenate(diffs), [tail, 1 - tail])
+    return group2.mean() - group1.mean(), low, high
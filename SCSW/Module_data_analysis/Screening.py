@@ -0,0 +1,149 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+SCREEN_TESTS = ('anova', 'kruskal')
+RESULT_COLUMNS = ['Continuous', 'Categorical', 'Test', 'N', 'Groups',
+                  'Statistic', 'p-value', 'Effect Size', 'q-value']
+
+# 工作进程中共享的分类变量编码：{变量名: (编码, 类别数)}
+_worker_codes = {}
+
+
+def _init_worker(codes):
+    """进程池初始化：每个工作进程只接收一次分类变量编码。"""
+    global _worker_codes
+    _worker_codes = codes
+
+
+def _rank_column(values):
+    """对连续变量求秩（平均秩），并计算 Kruskal-Wallis 的结点校正项。"""
+    ranks = stats.rankdata(values)
+    _, tie_counts = np.unique(values, return_counts=True)
+    tie_counts = tie_counts.astype(np.float64)
+    return ranks, (tie_counts ** 3 - tie_counts).sum()
+
+
+def _anova(values, codes, counts, n_groups):
+    """由各组均值计算单因素 ANOVA 的 F 值与 eta²。
+
+    先减去总均值再求组和，组间平方和取 Σ n_g·(组均值 − 总均值)²，组内平方和取组内离差平方和；
+    不用 Σ 组和² / n_g − n·总均值²，后者在均值远大于标准差时会相互抵消、失去全部精度。
+    """
+    n = len(values)
+    present = counts > 0
+    centered = values - values.mean()
+    means = np.bincount(codes, weights=centered, minlength=len(counts))
+    means[present] /= counts[present]
+    grand_mean = centered.mean()
+    ss_between = (counts[present] * (means[present] - grand_mean) ** 2).sum()
+    ss_within = ((centered - means[codes]) ** 2).sum()
+    ss_total = ss_between + ss_within
+    df_between, df_within = n_groups - 1, n - n_groups
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f_stat = (ss_between / df_between) / (ss_within / df_within)
+        eta_squared = ss_between / ss_total
+    return f_stat, stats.f.sf(f_stat, df_between, df_within), eta_squared
+
+
+def _kruskal(ranks, tie_term, codes, counts, n_groups):
+    """由各组秩和计算 Kruskal-Wallis H 值（含结点校正）与 epsilon²。"""
+    n = len(ranks)
+    present = counts > 0
+    rank_sums = np.bincount(codes, weights=ranks, minlength=len(counts))
+    h_stat = 12.0 / (n * (n + 1)) * (rank_sums[present] ** 2 / counts[present]).sum() - 3 * (n + 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        h_stat /= 1 - tie_term / (n ** 3 - n)
+    return h_stat, stats.chi2.sf(h_stat, n_groups - 1), h_stat / (n - 1)
+
+
+def screen_column(cont_var, values, tests=SCREEN_TESTS, cat_codes=None):
+    """把一个连续变量与所有分类变量逐一检验；秩只计算一次，供所有分类变量复用。"""
+    cat_codes = _worker_codes if cat_codes is None else cat_codes
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    ranks = tie_term = None
+    if 'kruskal' in tests:
+        ranks, tie_term = _rank_column(values[present])
+
+    rows = []
+    for cat_var, (codes, n_levels) in cat_codes.items():
+        keep = present & (codes >= 0)
+        pair_values = values[keep]
+        pair_codes = codes[keep]
+        counts = np.bincount(pair_codes, minlength=n_levels)
+        n_groups = int((counts > 0).sum())
+        n = len(pair_values)
+
+        for test in tests:
+            statistic = p_value = effect = np.nan
+            if n_groups >= 2 and n > n_groups:
+                if test == 'anova':
+                    statistic, p_value, effect = _anova(pair_values, pair_codes, counts, n_groups)
+                else:
+                    if keep[present].all():
+                        pair_ranks, pair_ties = ranks, tie_term
+                    else:
+                        # 分类变量有缺失时，只能对剩余的行重新求秩
+                        pair_ranks, pair_ties = _rank_column(pair_values)
+                    statistic, p_value, effect = _kruskal(pair_ranks, pair_ties, pair_codes, counts, n_groups)
+            rows.append([cont_var, cat_var, test, n, n_groups, statistic, p_value, effect])
+    return rows
+
+
+def fdr_bh(p_values):
+    """Benjamini-Hochberg FDR 校正，返回 q 值（NaN 保持不变）。"""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    q_values = np.full_like(p_values, np.nan)
+    valid = np.flatnonzero(~np.isnan(p_values))
+    if valid.size == 0:
+        return q_values
+    order = valid[np.argsort(p_values[valid])]
+    m = valid.size
+    adjusted = p_values[order] * m / np.arange(1, m + 1)
+    adjusted = np.minimum.accumulate(adjusted[::-1])[::-1]
+    q_values[order] = np.minimum(adjusted, 1.0)
+    return q_values
+
+
+def screen_pairs(df, cont_vars, cat_vars, tests=SCREEN_TESTS, max_workers=None):
+    """对所有 连续变量 × 分类变量 组合执行检验，返回整理好的结果表。
+
+    每个分类变量只因子化一次；每个连续变量作为一个任务分发到进程池，
+    其秩在任务中只计算一次。q 值在每种检验内部做 FDR 校正。
+    """
+    unknown = [t for t in tests if t not in SCREEN_TESTS]
+    if unknown:
+        raise ValueError(f"Unknown screening test(s): {', '.join(unknown)}.")
+
+    cat_codes = {}
+    for cat_var in cat_vars:
+        codes, labels = pd.factorize(df[cat_var], sort=False)
+        cat_codes[cat_var] = (codes, len(labels))
+
+    columns = [(cont_var, df[cont_var].to_numpy(dtype=np.float64, na_value=np.nan))
+               for cont_var in cont_vars]
+    max_workers = max_workers or os.cpu_count() or 1
+    max_workers = min(max_workers, len(columns))
+
+    rows = []
+    if max_workers <= 1:
+        for cont_var, values in columns:
+            rows.extend(screen_column(cont_var, values, tests, cat_codes))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(cat_codes,)) as executor:
+            futures = [executor.submit(screen_column, cont_var, values, tests)
+                       for cont_var, values in columns]
+            for future in futures:
+                rows.extend(future.result())
+
+    result = pd.DataFrame(rows, columns=RESULT_COLUMNS[:-1])
+    result['q-value'] = np.nan
+    for test in tests:
+        mask = result['Test'] == test
+        result.loc[mask, 'q-value'] = fdr_bh(result.loc[mask, 'p-value'])
+    return result
@@ -0,0 +1,178 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from Module_data_analysis.Contingency import contingency_counts
+from Module_data_analysis.Grouping import encode
+from Module_data_analysis.Regression import build_formula, formula_variables
+
+# 可以分层执行的 DataAnalysis 方法
+STRATIFIED_METHODS = ('group_summary', 'group_normality', 'normality_table', 'permutation_test',
+                      'perform_kruskal_wallis', 'anova', 't_test_or_mannwhitney', 'chi_square_test', 'regression')
+COMBINE_METHODS = ('cmh', 'fisher', 'stouffer')
+
+
+class DiscardRenderer:
+    """分层执行时使用的渲染器：不为每一层生成图像。"""
+
+    def submit(self, *args, **kwargs):
+        return None
+
+    def wait(self, *args, **kwargs):
+        pass
+
+
+class StrataPartition:
+    """按分层变量排序一次后的数据集：每一层是排序结果上的一段连续行。
+
+    只复制用到的列（一次重排），之后 items() 返回的每层数据都是 iloc 行切片，不再复制；
+    分层变量缺失的行被丢弃，层按首次出现的顺序排列。
+    """
+
+    def __init__(self, df, strata, columns):
+        codes, labels = encode(df[strata])
+        rows = np.flatnonzero(codes >= 0)
+        order = rows[np.argsort(codes[rows], kind='stable')]
+        self.strata = strata
+        self.labels = labels
+        self.frame = df[list(columns)].take(order).reset_index(drop=True)
+        self.codes = codes[order]
+        self.counts = np.bincount(self.codes, minlength=len(labels))
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def stratum(self, i):
+        """返回第 i 层的数据（行切片）。"""
+        return self.frame.iloc[self.offsets[i]:self.offsets[i + 1]]
+
+    def items(self):
+        """按层的顺序返回 (层标签, 数据)，跳过空层。"""
+        return [(self.labels[i], self.stratum(i)) for i in range(len(self)) if self.counts[i] > 0]
+
+
+def referenced_columns(df, method, params):
+    """返回方法参数中引用到的数据列（回归时按公式解析），分层时只需复制这些列。"""
+    columns = []
+    for value in params.values():
+        for item in (value if isinstance(value, (list, tuple)) else [value]):
+            if isinstance(item, str) and item in df.columns and item not in columns:
+                columns.append(item)
+    if method == 'regression':
+        formula = build_formula(params.get('dep_var'), params.get('ind_vars'))
+        columns += [col for col in formula_variables(formula, df.columns) if col not in columns]
+    return columns
+
+
+def result_row(result):
+    """把一层的检验结果整理成一行（字典）：(统计量, p 值)、命名元组、回归结果或布尔值。"""
+    if isinstance(result, tuple) and result and hasattr(result[0], 'exog_names'):
+        result = result[0]  # regression() 返回 (拟合结果, 图像路径)
+    if result is None:
+        return {}
+    if hasattr(result, 'exog_names'):
+        row = {'Nobs': result.nobs, 'R-squared': result.rsquared, 'F p-value': result.f_pvalue}
+        row.update(zip(result.exog_names, result.params))
+        return row
+    if hasattr(result, '_asdict'):
+        return dict(result._asdict())
+    if isinstance(result, (bool, np.bool_)):
+        return {'Normal': bool(result)}
+    if isinstance(result, tuple) and len(result) == 2:
+        statistic, p_value = result
+        return {'Statistic': np.nan if statistic is None else statistic,
+                'p-value': np.nan if p_value is None else p_value}
+    return {'Result': result}
+
+
+def run_stratified(partition, run, max_workers=None):
+    """在线程池中对每一层调用 run(层数据)，返回按层顺序排列的 (层标签, 层行数, 结果或异常)。
+
+    用线程而不是进程：各层数据是同一个数据集上的切片，不需要序列化复制；NumPy / SciPy
+    计算期间会释放 GIL。run 自己负责不打印各层的输出（不能替换全局的 sys.stdout，
+    否则会吞掉同一进程中其他线程的输出）。
+    """
+    items = partition.items()
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(items)))
+
+    def call(data):
+        try:
+            return run(data)
+        except Exception as e:
+            return e
+
+    if max_workers == 1:
+        results = [call(data) for _, data in items]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='stratum') as executor:
+            results = list(executor.map(call, [data for _, data in items]))
+    return [(label, len(data), result) for (label, data), result in zip(items, results)]
+
+
+def stratified_table(strata, outcomes):
+    """把各层结果合并成一张表：标量结果每层一行，DataFrame 结果按层拼接。"""
+    frames, rows = [], []
+    for label, n, result in outcomes:
+        if isinstance(result, tuple) and result and isinstance(result[0], pd.DataFrame):
+            result = result[0]
+        if isinstance(result, pd.DataFrame):
+            frame = result.reset_index()
+            frame.insert(0, strata, label)
+            frames.append(frame)
+        elif isinstance(result, Exception):
+            rows.append({strata: label, 'N': n, 'Error': str(result)})
+        else:
+            rows.append({strata: label, 'N': n, **result_row(result)})
+    if frames:
+        return pd.concat(frames, ignore_index=True)
+    return pd.DataFrame(rows)
+
+
+def cmh_test(codes1, n1, codes2, n2, offsets):
+    """广义 Cochran-Mantel-Haenszel 检验：控制分层变量后，两个分类变量是否仍然相关。
+
+    codes1 / codes2 为按层连续排列的编码（全体数据上统一编码），offsets 为各层的起止位置。
+    每层 R × C 表的前 (R-1)(C-1) 个格子的观测减期望及其协方差在各层间相加，统计量
+    Q = d' V⁻¹ d 服从自由度为 V 的秩的卡方分布；2 × 2 时同时给出 Mantel-Haenszel 合并优势比。
+    """
+    d = np.zeros((n1 - 1) * (n2 - 1))
+    V = np.zeros((d.size, d.size))
+    or_num = or_den = 0.0
+    for start, stop in zip(offsets[:-1], offsets[1:]):
+        table = contingency_counts(codes1[start:stop], n1, codes2[start:stop], n2).astype(np.float64)
+        t = table.sum()
+        if t < 2:
+            continue
+        r, c = table.sum(axis=1), table.sum(axis=0)
+        d += (table - np.outer(r, c) / t)[:-1, :-1].ravel()
+        Vr = (t * np.diag(r) - np.outer(r, r))[:-1, :-1]
+        Vc = (t * np.diag(c) - np.outer(c, c))[:-1, :-1]
+        V += np.kron(Vr, Vc) / (t * t * (t - 1))
+        if n1 == 2 and n2 == 2:
+            or_num += table[0, 0] * table[1, 1] / t
+            or_den += table[0, 1] * table[1, 0] / t
+
+    dof = int(np.linalg.matrix_rank(V)) if d.size else 0
+    if dof == 0:
+        return {'Test': 'Cochran-Mantel-Haenszel', 'Statistic': np.nan, 'p-value': np.nan, 'dof': 0}
+    statistic = float(d @ np.linalg.pinv(V) @ d)
+    result = {'Test': 'Cochran-Mantel-Haenszel', 'Statistic': statistic,
+              'p-value': float(stats.chi2.sf(statistic, dof)), 'dof': dof}
+    if n1 == 2 and n2 == 2:
+        result['Common odds ratio'] = float(or_num / or_den) if or_den > 0 else np.nan
+    return result
+
+
+def combine_p_values(p_values, method='fisher'):
+    """用 Fisher 或 Stouffer 方法合并各层（相互独立）的 p 值。"""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    p_values = p_values[~np.isnan(p_values)]
+    if p_values.size == 0:
+        return {'Test': f'{method.title()} combined', 'Statistic': np.nan, 'p-value': np.nan, 'Strata': 0}
+    statistic, p_value = stats.combine_pvalues(p_values, method=method)
+    return {'Test': f'{method.title()} combined', 'Statistic': float(statistic), 'p-value': float(p_value),
+            'Strata': int(p_values.size)}
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+from matplotlib.collections import LineCollection, PolyCollection
+
+from Module_data_analysis.Grouping import GroupedColumn
+
+# 自动分箱规则给出的箱数上限；超过时（例如大部分取值相同、IQR 为 0）改用 Sturges 规则
+MAX_BINS = 500
+WHISKER_RANGE = 1.5
+# 每组最多画出的离群点个数；超出时在排序后的离群点中等间隔抽取（保留最小和最大值）
+MAX_FLIERS = 200
+# 箱形图横轴最多标注的类别个数
+MAX_TICK_LABELS = 200
+# 非数值列的条形图最多画出的类别个数；其余类别合并为 'Other'
+MAX_BAR_CATEGORIES = 50
+BOX_COLUMNS = ['N', 'Mean', 'Q1', 'Median', 'Q3', 'Whisker Low', 'Whisker High', 'Outliers']
+
+
+def histogram_summary(data, bins='auto'):
+    """用 np.histogram 计算直方图，返回 (各箱计数, 箱边界)；忽略缺失值和无穷值。
+
+    整数数据的箱宽取整数、边界落在两个整数中间，避免各箱包含的整数个数不同而出现锯齿。
+    """
+    values = np.asarray(pd.Series(data).dropna(), dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(1)
+    edges = np.histogram_bin_edges(values, bins=bins)
+    if len(edges) - 1 > MAX_BINS:
+        edges = np.histogram_bin_edges(values, bins='sturges')
+    if isinstance(bins, str) and np.array_equal(values, np.round(values)):
+        width = max(1.0, np.ceil(edges[1] - edges[0]))
+        low, high = values.min(), values.max()
+        edges = np.arange(low - 0.5, high + 0.5 + width, width)
+        edges = edges[:np.searchsorted(edges, high + 0.5) + 1]
+    counts, edges = np.histogram(values, bins=edges)
+    return counts, edges
+
+
+def is_histogram_column(data):
+    """数值列（不含布尔列）画直方图；文本、类别和布尔列改画各取值的频数条形图。"""
+    return pd.api.types.is_numeric_dtype(data) and not pd.api.types.is_bool_dtype(data)
+
+
+def value_count_summary(data, max_categories=MAX_BAR_CATEGORIES):
+    """统计非数值列各取值的出现次数（忽略缺失值），按次数从多到少返回 (取值标签, 计数, 合并的类别数)；
+    类别超过 max_categories 个时，其余类别的次数合并为最后一项 'Other'。"""
+    counts = pd.Series(data).value_counts(dropna=True)
+    counts = counts[counts > 0]  # category 列中未出现的类别
+    labels = [str(label) for label in counts.index[:max_categories]]
+    values = counts.to_numpy(dtype=np.int64)
+    merged = max(0, len(values) - max_categories)
+    if merged:
+        labels.append(f'Other ({merged:,} values)')
+        values = np.append(values[:max_categories], values[max_categories:].sum())
+    return labels, values, merged
+
+
+def box_summary(grouped, whis=WHISKER_RANGE, max_fliers=MAX_FLIERS):
+    """一次向量化计算所有组的箱形图统计量，返回 (结果表, 各组离群点)。
+
+    组内排序一次后，四分位数按下标直接取出（与 np.percentile 的线性插值一致），
+    须线是落在 [Q1 - whis·IQR, Q3 + whis·IQR] 内的最小和最大观测值，与 matplotlib 相同。
+    结果表以类别为索引，空组不出现；离群点列表与结果表的行一一对应。
+    """
+    keep = grouped.counts > 0
+    counts = grouped.counts[keep]
+    labels = [label for label, k in zip(grouped.labels, keep) if k]
+    if counts.size == 0:
+        return pd.DataFrame(columns=BOX_COLUMNS), []
+
+    # codes 已经有序，以 (codes, values) 排序即得到每组内有序的值
+    values = grouped.values[np.lexsort((grouped.values, grouped.codes))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    def quantile(q):
+        pos = q * (counts - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.ceil(pos).astype(np.intp)
+        return values[starts + lo] + (values[starts + hi] - values[starts + lo]) * (pos - lo)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    low_limit = np.repeat(q1 - whis * iqr, counts)
+    high_limit = np.repeat(q3 + whis * iqr, counts)
+    inside = (values >= low_limit) & (values <= high_limit)
+    whisker_low = np.minimum.reduceat(np.where(inside, values, np.inf), starts)
+    whisker_high = np.maximum.reduceat(np.where(inside, values, -np.inf), starts)
+    n_fliers = counts - np.add.reduceat(inside.astype(np.int64), starts)
+
+    fliers = []
+    outside = np.flatnonzero(~inside)
+    group_of = np.searchsorted(starts, outside, side='right') - 1
+    bounds = np.searchsorted(group_of, np.arange(len(counts) + 1))
+    for i in range(len(counts)):
+        points = values[outside[bounds[i]:bounds[i + 1]]]
+        if len(points) > max_fliers:
+            points = points[np.linspace(0, len(points) - 1, max_fliers).round().astype(np.intp)]
+        fliers.append(points)
+
+    table = pd.DataFrame({
+        'N': counts, 'Mean': np.add.reduceat(values, starts) / counts, 'Q1': q1, 'Median': median, 'Q3': q3,
+        'Whisker Low': whisker_low, 'Whisker High': whisker_high, 'Outliers': n_fliers,
+    }, index=pd.Index(labels, name='Group'), columns=BOX_COLUMNS)
+    # 数值型类别按大小排列（与 seaborn 一致），其余类别保持首次出现的顺序
+    if pd.api.types.is_numeric_dtype(table.index):
+        order = np.argsort(table.index.to_numpy(), kind='stable')
+        table, fliers = table.iloc[order], [fliers[i] for i in order]
+    return table, fliers
+
+
+def group_box_summary(values, keys, whis=WHISKER_RANGE, max_fliers=MAX_FLIERS):
+    """按分类变量 keys 分组后计算 values 的箱形图统计量。"""
+    return box_summary(GroupedColumn(values, keys), whis, max_fliers)
+
+
+def draw_histogram(ax, counts, edges, column):
+    """用预先计算的计数和箱边界绘制分布图。"""
+    if len(counts):
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='black')
+    ax.set_title(f'Distribution of {column}')
+    ax.set_xlabel(column)
+    ax.set_ylabel('Frequency')
+    ax.grid(False)
+
+
+def draw_value_counts(ax, labels, counts, merged, column):
+    """用 value_count_summary() 的结果绘制各取值的频数条形图（合并的 'Other' 一项画成灰色）。"""
+    if len(counts):
+        x = np.arange(len(counts))
+        colors = ['C0'] * len(counts)
+        if merged:
+            colors[-1] = '0.6'
+        ax.bar(x, counts, color=colors, edgecolor='black')
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels, rotation=90 if len(labels) > 10 else 0)
+    ax.set_title(f'Distribution of {column}')
+    ax.set_xlabel(column)
+    ax.set_ylabel('Frequency')
+    ax.grid(False)
+
+
+def draw_boxplot(ax, table, fliers, cont_var, cat_var, title):
+    """用 box_summary() 的结果绘制箱形图。
+
+    所有箱体、须线和离群点分别合并成一个图形集合绘制，不再接触原始数据；
+    组数很多时也只有固定个数的图形对象，渲染耗时基本不随组数和行数增长。
+    """
+    n = len(table)
+    if n:
+        x = np.arange(1, n + 1)
+        half = 0.3
+        line_width = 1 if n <= 50 else 0.5
+        q1, q3 = table['Q1'].to_numpy(), table['Q3'].to_numpy()
+        boxes = [[(xi - half, lo), (xi + half, lo), (xi + half, hi), (xi - half, hi)]
+                 for xi, lo, hi in zip(x, q1, q3)]
+        colors = [f'C{i % 10}' for i in range(n)]
+        ax.add_collection(PolyCollection(boxes, facecolors=colors, edgecolors='black', alpha=0.8,
+                                     linewidths=line_width))
+
+        low, high = table['Whisker Low'].to_numpy(), table['Whisker High'].to_numpy()
+        median = table['Median'].to_numpy()
+        segments = np.concatenate([
+            np.stack([np.c_[x, q1], np.c_[x, low]], axis=1),                      # 下须线
+            np.stack([np.c_[x, q3], np.c_[x, high]], axis=1),                     # 上须线
+            np.stack([np.c_[x - half / 2, low], np.c_[x + half / 2, low]], axis=1),   # 下端横线
+            np.stack([np.c_[x - half / 2, high], np.c_[x + half / 2, high]], axis=1),  # 上端横线
+            np.stack([np.c_[x - half, median], np.c_[x + half, median]], axis=1),     # 中位数
+        ])
+        ax.add_collection(LineCollection(segments, colors='black', linewidths=line_width))
+
+        flier_x = np.repeat(x, [len(points) for points in fliers])
+        if flier_x.size:
+            ax.scatter(flier_x, np.concatenate(fliers), marker='d', s=12, facecolors='none', edgecolors='0.3',
+                       alpha=0.6)
+
+        ax.set_xlim(0.5, n + 0.5)
+        ax.set_ylim(*_padded_limits(np.concatenate([[low.min(), high.max()]] + [p for p in fliers if len(p)])))
+        labels = [str(label) for label in table.index]
+        if n > 10:
+            # 类别很多时加宽画布，标签过多时只标注一部分
+            width, height = ax.figure.get_size_inches()
+            ax.figure.set_size_inches(min(max(width, 0.25 * n), 50), height)
+            step = int(np.ceil(n / MAX_TICK_LABELS))
+            x, labels = x[::step], labels[::step]
+            ax.tick_params(axis='x', labelrotation=90)
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels)
+    ax.set_xlabel(cat_var)
+    ax.set_ylabel(cont_var)
+    ax.set_title(title)
+
+
+def _padded_limits(values, margin=0.05):
+    low, high = np.min(values), np.max(values)
+    pad = (high - low) * margin or 0.5
+    return low - pad, high + pad
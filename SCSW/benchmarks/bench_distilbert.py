@@ -0,0 +1,118 @@
+"""比较逐条调用 transformers pipeline 与批量 DistilBertEngine 的吞吐量（texts/sec）。
+
+用法（在 SCSW 目录下）：python benchmarks/bench_distilbert.py --texts 2000
+离线运行：python benchmarks/bench_distilbert.py --tiny --skip-baseline（使用随机权重的小模型，不需要下载）
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Module_SentimentAnalysis.DistilBertEngine import DEFAULT_MODEL, MAX_CACHED_SCORES, DistilBertEngine
+
+WORDS = ['the', 'service', 'was', 'really', 'not', 'good', 'bad', 'slow', 'friendly', 'food',
+         'terrible', 'excellent', 'staff', 'would', 'recommend', 'never', 'again', 'okay']
+
+
+def make_texts(n, seed=0):
+    """生成长度不一的随机评论文本（全部互不相同，避免缓存影响对比）。"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(3, 60, size=n)
+    return pd.Series([f"{i}: " + ' '.join(rng.choice(WORDS, size=k)) for i, k in enumerate(lengths)])
+
+
+def make_tiny_model(directory):
+    """在 directory 中保存一个随机权重的两层小 DistilBERT 及其分词器（词表为 WORDS 和数字），返回该目录。"""
+    from transformers import BertTokenizerFast, DistilBertConfig, DistilBertForSequenceClassification
+    vocab = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]', ':'] + WORDS
+    vocab += [str(d) for d in range(10)] + [f"##{d}" for d in range(10)]
+    vocab_path = os.path.join(directory, 'vocab.txt')
+    with open(vocab_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(vocab) + '\n')
+    BertTokenizerFast(vocab_file=vocab_path).save_pretrained(directory)
+    config = DistilBertConfig(vocab_size=len(vocab), dim=64, n_layers=2, n_heads=2, hidden_dim=128,
+                              num_labels=2, id2label={0: 'NEGATIVE', 1: 'POSITIVE'},
+                              label2id={'NEGATIVE': 0, 'POSITIVE': 1})
+    DistilBertForSequenceClassification(config).save_pretrained(directory)
+    return directory
+
+
+def bench_pipeline(texts, model_name):
+    """原实现：每次调用新建 pipeline，并逐条推理。"""
+    from transformers import pipeline
+    start = time.perf_counter()
+    sentiment_pipeline = pipeline('sentiment-analysis', model=model_name)
+    for text in texts:
+        sentiment_pipeline(text)
+    return time.perf_counter() - start
+
+
+def bench_engine(texts, model_name, quantize, batch_size):
+    engine = DistilBertEngine(model_name, quantize=quantize)
+    start = time.perf_counter()
+    engine.predict(texts, batch_size=batch_size)
+    cold = time.perf_counter() - start
+
+    engine.clear_cache()
+    start = time.perf_counter()
+    engine.predict(texts, batch_size=batch_size)
+    warm = time.perf_counter() - start
+    return cold, warm
+
+
+def bench_cache(texts, model_name, batch_size, cache_size, chunks):
+    """把 chunks 块互不相同的文本依次送入同一个引擎（类似分块流式评分），再把全部文本重新评分一遍；
+    返回 (首轮耗时, 重评耗时, 缓存条目数)。cache_size=None 为不限大小的缓存。"""
+    engine = DistilBertEngine(model_name, cache_size=cache_size)
+    engine.predict(texts.iloc[:1], batch_size=batch_size)  # 加载模型，不计入耗时
+    engine.clear_cache()
+    parts = np.array_split(np.arange(len(texts)), chunks)
+    start = time.perf_counter()
+    for part in parts:
+        engine.predict(texts.iloc[part], batch_size=batch_size)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    for part in parts:
+        engine.predict(texts.iloc[part], batch_size=batch_size)
+    again = time.perf_counter() - start
+    return first, again, len(engine._scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--skip-baseline', action='store_true')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='模型名称或本地目录')
+    parser.add_argument('--tiny', action='store_true', help='使用随机权重的小模型（离线）')
+    parser.add_argument('--cache-size', type=int, default=MAX_CACHED_SCORES)
+    parser.add_argument('--chunks', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        model_name = make_tiny_model(directory) if args.tiny else args.model
+        texts = make_texts(args.texts)
+        print(f"{args.texts:,} texts, batch size {args.batch_size}, model {'tiny (random weights)' if args.tiny else model_name}")
+        if not args.skip_baseline:
+            elapsed = bench_pipeline(texts, model_name)
+            print(f"Per-text pipeline          : {args.texts / elapsed:10.1f} texts/sec")
+        for quantize in (False, True):
+            cold, warm = bench_engine(texts, model_name, quantize, args.batch_size)
+            name = 'int8' if quantize else 'fp32'
+            print(f"Batched engine ({name}, cold) : {args.texts / cold:10.1f} texts/sec")
+            print(f"Batched engine ({name}, warm) : {args.texts / warm:10.1f} texts/sec")
+
+        print(f"Score cache over {args.chunks} chunks, then the same texts again:")
+        for label, cache_size in (('unbounded', None), (f"LRU {args.cache_size:,}", args.cache_size)):
+            first, again, entries = bench_cache(texts, model_name, args.batch_size, cache_size, args.chunks)
+            print(f"  {label:<12}: {args.texts / first:10.1f} texts/sec first pass, "
+                  f"{args.texts / again:10.1f} texts/sec repeat, {entries:,} cached scores")
+
+
+if __name__ == '__main__':
+    main()
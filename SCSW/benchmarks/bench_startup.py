@@ -0,0 +1,108 @@
+"""测量 Main.py 的启动耗时（到第一个输入提示）和常驻内存，并检查是否超出预算。
+
+用法（在 SCSW 目录下）：
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --data heart_attack_prediction_dataset.csv --max-seconds 5
+
+不带 --data 时测量到 "ENTER THE PATH TO YOUR DATASET" 提示，默认预算为 DEFAULT_MAX_SECONDS 秒和
+DEFAULT_MAX_RSS_MB MB；带 --data 时测量到主菜单提示（包含读取数据和计算统计信息，耗时取决于数据集，
+没有默认预算）。任一指标的中位数超出预算时以退出码 1 结束，可用于 CI；--no-budget 只报告不检查。
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCSW_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATH_PROMPT = b"ENTER THE PATH TO YOUR DATASET:"
+MENU_PROMPT = b"Enter your choice"
+# 到第一个提示的默认预算：实测基线约 0.08–0.09 s、16 MB（1 核沙箱），留出约 3 倍 / 2 倍的余量
+DEFAULT_MAX_SECONDS = 0.25
+DEFAULT_MAX_RSS_MB = 32
+
+
+def rss_mb(pid):
+    """读取进程当前的常驻内存（MB）；仅支持 Linux 的 /proc。"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float('nan')
+
+
+def measure_once(data=None, timeout=120):
+    """启动一次 Main.py，返回 (出现提示的耗时秒数, 此时的常驻内存 MB)。"""
+    command = [sys.executable, '-u', os.path.join(SCSW_DIR, 'Main.py')]
+    prompt = PATH_PROMPT
+    if data:
+        command += ['--data', data]
+        prompt = MENU_PROMPT
+
+    env = dict(os.environ, MPLBACKEND='Agg')
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=SCSW_DIR, env=env, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = b''
+    try:
+        while prompt not in output:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError(f"Main.py exited before showing the prompt:\n{output.decode(errors='replace')}")
+            output += chunk
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError("Timed out waiting for the prompt.")
+        elapsed = time.perf_counter() - start
+        memory = rss_mb(process.pid)
+    finally:
+        process.kill()
+        process.wait()
+    return elapsed, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--data', help="CSV passed to Main.py --data; measures time to the main menu instead")
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help=f"budget for the median time to prompt (default {DEFAULT_MAX_SECONDS} without --data)")
+    parser.add_argument('--max-rss-mb', type=float, default=None,
+                        help=f"budget for the median resident memory (default {DEFAULT_MAX_RSS_MB} without --data)")
+    parser.add_argument('--no-budget', action='store_true', help="only report, never fail")
+    args = parser.parse_args()
+    if args.no_budget:
+        args.max_seconds = args.max_rss_mb = None
+    elif not args.data:
+        args.max_seconds = DEFAULT_MAX_SECONDS if args.max_seconds is None else args.max_seconds
+        args.max_rss_mb = DEFAULT_MAX_RSS_MB if args.max_rss_mb is None else args.max_rss_mb
+
+    times, memories = [], []
+    for i in range(args.runs):
+        elapsed, memory = measure_once(args.data)
+        times.append(elapsed)
+        memories.append(memory)
+        print(f"run {i + 1}: {elapsed:.3f} s to prompt, {memory:.1f} MB RSS")
+
+    median_time = statistics.median(times)
+    median_rss = statistics.median(memories)
+    target = 'main menu' if args.data else 'first prompt'
+    print(f"median time to {target}: {median_time:.3f} s, median RSS: {median_rss:.1f} MB")
+
+    failed = False
+    if args.max_seconds is not None and median_time > args.max_seconds:
+        print(f"FAIL: time to {target} {median_time:.3f} s exceeds budget of {args.max_seconds:.3f} s")
+        failed = True
+    if args.max_rss_mb is not None and median_rss > args.max_rss_mb:
+        print(f"FAIL: resident memory {median_rss:.1f} MB exceeds budget of {args.max_rss_mb:.1f} MB")
+        failed = True
+    if not failed and (args.max_seconds is not None or args.max_rss_mb is not None):
+        print("OK: within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""在合成数据上为数据集读取（解析 / 缓存 / 追加）以及 DataInspection、DataAnalysis 和 SentimentAnalysis 的
+每个方法计时并记录内存峰值。
+
+用法（在 SCSW 目录下）：
+    python benchmarks/bench_suite.py --rows 10000 100000 1000000 --countries 20 2000 --output bench.json
+    python benchmarks/bench_suite.py --rows 10000 --compare old_bench.json
+
+每个 (行数, 国家数) 组合生成一份数据，在临时目录中运行（结果缓存和图像缓存每次都清空，
+所以测到的是完整计算和绘图的耗时）。内存峰值是每个方法运行期间进程的常驻内存峰值
+（Linux 下通过 /proc/self/clear_refs 重置 VmHWM，不影响计时）；其他平台退回 tracemalloc，
+此时只统计 Python 和 NumPy 的分配，且计时会偏慢。
+结果写成 JSON，附带提交号和库版本；--compare 会与旧的 JSON 逐项比较耗时。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+SCSW_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCSW_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_data import make_heart_dataset
+from Module_Data_Cache.DatasetCache import load_csv_versioned
+from Module_Data_Cache.ResultCache import get_result_cache
+from Module_Data_Inspection.DataInspection import DataInspection
+from Module_Plot_Rendering.PlotRenderer import get_renderer
+from Module_SentimentAnalysis.SentimentAnalysis import SentimentAnalysis
+from Module_data_analysis.DataAnalysis import DataAnalysis
+
+CONT_VARS = ['Age', 'Cholesterol', 'BMI', 'Income']
+CAT_VARS = ['Sex', 'Diet', 'Smoking', 'Country']
+# 追加读取的基准中，在已缓存的数据集末尾追加的行数占比
+APPEND_FRACTION = 0.01
+
+
+def benchmark_cases(include_distilbert=False):
+    """返回 (模块, 方法名, 调用函数) 列表；调用函数接收包含数据和各模块实例的 ctx。"""
+    cases = [
+        ('DatasetCache', 'load_csv_versioned(parse)',
+         lambda c: load_csv_versioned(c['dataset_paths']['parse'], use_cache=False)),
+        ('DatasetCache', 'load_csv_versioned(cached)', lambda c: load_csv_versioned(c['dataset_paths']['cached'])),
+        ('DatasetCache', 'load_csv_versioned(append)', lambda c: load_csv_versioned(c['dataset_paths']['append'])),
+        ('DataInspection', 'generate_statistics', lambda c: c['inspection'].generate_statistics()),
+        ('DataInspection', 'generate_statistics(approximate)',
+         lambda c: c['inspection'].generate_statistics(approximate=True)),
+        ('DataInspection', 'plot_distribution', lambda c: c['inspection'].plot_distribution('BMI')),
+        ('DataInspection', 'plot_boxplot', lambda c: c['inspection'].plot_boxplot('BMI', 'Diet')),
+        ('DataAnalysis', 'check_normality', lambda c: DataAnalysis.check_normality(c['df']['BMI'], 'BMI')),
+        ('DataAnalysis', 'plot_qq', lambda c: DataAnalysis.plot_qq(c['df']['BMI'], 'BMI')),
+        ('DataAnalysis', 'group_summary', lambda c: c['analysis'].group_summary('BMI', 'Country')),
+        ('DataAnalysis', 'normality_table', lambda c: c['analysis'].normality_table(CONT_VARS)),
+        ('DataAnalysis', 'group_normality', lambda c: c['analysis'].group_normality('BMI', 'Country')),
+        ('DataAnalysis', 'permutation_test',
+         lambda c: c['analysis'].permutation_test('mean_diff', 'Cholesterol', 'Sex', max_resamples=2000)),
+        ('DataAnalysis', 'perform_kruskal_wallis', lambda c: c['analysis'].perform_kruskal_wallis('Age', 'Country')),
+        ('DataAnalysis', 'anova', lambda c: c['analysis'].anova('Age', 'Country')),
+        ('DataAnalysis', 't_test_or_mannwhitney', lambda c: c['analysis'].t_test_or_mannwhitney('Cholesterol', 'Sex')),
+        ('DataAnalysis', 'screen_pairs', lambda c: c['analysis'].screen_pairs(CONT_VARS, CAT_VARS)),
+        ('DataAnalysis', 'chi_square_test', lambda c: c['analysis'].chi_square_test('Country', 'Diet')),
+        ('DataAnalysis', 'chi_square_matrix', lambda c: c['analysis'].chi_square_matrix(CAT_VARS)),
+        ('DataAnalysis', 'regression', lambda c: c['analysis'].regression('BMI', ['Age', 'Cholesterol', 'Sex'])),
+        ('DataAnalysis', 'stratified',
+         lambda c: c['analysis'].stratified('t_test_or_mannwhitney', 'Continent',
+                                            {'num_var': 'Cholesterol', 'cat_var': 'Sex'}, combine='fisher')),
+        ('SentimentAnalysis', 'get_text_columns', lambda c: c['sentiment'].get_text_columns()),
+        ('SentimentAnalysis', 'get_text_columns(approximate)',
+         lambda c: c['sentiment'].get_text_columns(approximate=True)),
+        ('SentimentAnalysis', 'vader_sentiment_analysis',
+         lambda c: c['sentiment'].vader_sentiment_analysis(c['df']['Feedback'])),
+        ('SentimentAnalysis', 'textblob_sentiment_analysis',
+         lambda c: c['sentiment'].textblob_sentiment_analysis(c['df']['Feedback'])),
+        ('SentimentAnalysis', 'stream_sentiment_analysis',
+         lambda c: c['sentiment'].stream_sentiment_analysis(c['csv_path'], 'Feedback', 'vader', resume=False)),
+    ]
+    if include_distilbert:
+        cases.append(('SentimentAnalysis', 'distilbert_sentiment_analysis',
+                      lambda c: c['sentiment'].distilbert_sentiment_analysis(c['df']['Feedback'])))
+    return cases
+
+
+def prepare_datasets(df, work_dir):
+    """写出数据集读取基准用的 CSV（不计入计时），返回 {基准名: 路径}。
+
+    parse 直接解析 CSV；cached 已写好列式缓存；append 先以前 1 - APPEND_FRACTION 的行建立缓存，
+    再在文件末尾追加其余的行，读取时只解析追加的部分。
+    """
+    paths = {name: os.path.join(work_dir, f'dataset_{name}.csv') for name in ('parse', 'cached', 'append')}
+    df.to_csv(paths['parse'], index=False)
+    df.to_csv(paths['cached'], index=False)
+    load_csv_versioned(paths['cached'])
+    split = len(df) - max(1, int(len(df) * APPEND_FRACTION))
+    df.iloc[:split].to_csv(paths['append'], index=False)
+    load_csv_versioned(paths['append'])
+    df.iloc[split:].to_csv(paths['append'], mode='a', header=False, index=False)
+    return paths
+
+
+def reset_caches():
+    """清空结果缓存和图像缓存，保证每次计时都是完整计算。"""
+    get_result_cache().clear()
+    get_renderer().wait()
+    # 图像缓存只在图片文件仍存在时生效，删除已渲染的图片即可强制重新绘制
+    for name in os.listdir('results'):
+        if name.endswith('.png'):
+            os.remove(os.path.join('results', name))
+
+
+def _read_status(field):
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def start_memory_tracking():
+    """开始统计内存峰值，返回 (统计方式, 起始内存 MB)；统计方式为 'rss'（Linux）或 'tracemalloc'。"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')  # 把 VmHWM（常驻内存峰值）重置为当前值
+        return 'rss', _read_status('VmRSS:')
+    except OSError:
+        tracemalloc.start()
+        return 'tracemalloc', 0.0
+
+
+def stop_memory_tracking(mode):
+    """返回自 start_memory_tracking() 以来的内存峰值 (MB)。"""
+    if mode == 'rss':
+        return _read_status('VmHWM:')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def run_case(func, ctx):
+    """运行一次并返回 (秒数, 内存峰值 MB, 峰值相对起始内存的增量 MB, 错误信息)；计时包含等待后台绘图完成。"""
+    reset_caches()
+    mode, baseline = start_memory_tracking()
+    start = time.perf_counter()
+    error = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(ctx)
+            get_renderer().wait()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+    peak = stop_memory_tracking(mode)
+    return elapsed, peak, peak - baseline, error
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCSW_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    return {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'memory_metric': 'peak_rss' if os.path.exists('/proc/self/clear_refs') else 'tracemalloc_peak',
+    }
+
+
+def compare(results, baseline_path):
+    """把本次结果与旧 JSON 中相同 (行数, 国家数, 方法) 的耗时逐项比较。"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    old = {(r['rows'], r['countries'], r['method']): r for r in baseline['results']}
+    print(f"\nComparison with {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    for r in results:
+        previous = old.get((r['rows'], r['countries'], r['method']))
+        if previous is None or r['error'] or previous['error']:
+            continue
+        ratio = r['seconds'] / previous['seconds'] if previous['seconds'] else float('nan')
+        print(f"{r['rows']:>10,} {r['countries']:>6} {r['method']:<32} {previous['seconds']:>9.3f} s -> "
+              f"{r['seconds']:>9.3f} s  ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--countries', type=int, nargs='+', default=[20])
+    parser.add_argument('--texts', type=int, default=2000, help="number of distinct Feedback texts")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--methods', nargs='*', default=None, help="only run these method names")
+    parser.add_argument('--distilbert', action='store_true', help="also time DistilBERT (needs transformers)")
+    parser.add_argument('--output', default=os.path.join(SCSW_DIR, 'results', 'benchmark.json'))
+    parser.add_argument('--compare', help="earlier benchmark JSON to compare against")
+    args = parser.parse_args()
+
+    cases = [case for case in benchmark_cases(args.distilbert) if not args.methods or case[1] in args.methods]
+    results = []
+    start_dir = os.getcwd()
+    for rows in args.rows:
+        for countries in args.countries:
+            df = make_heart_dataset(rows, args.seed, countries, args.texts)
+            with tempfile.TemporaryDirectory() as work_dir:
+                # 各方法把图像和缓存写到 ./results/，在临时目录中运行以免影响项目目录
+                os.chdir(work_dir)
+                try:
+                    os.makedirs('results', exist_ok=True)
+                    csv_path = os.path.join(work_dir, 'feedback.csv')
+                    df[['Feedback']].to_csv(csv_path, index=False)
+                    ctx = {'df': df, 'csv_path': csv_path, 'inspection': DataInspection(df),
+                           'analysis': DataAnalysis(df), 'sentiment': SentimentAnalysis(df)}
+                    if any(module == 'DatasetCache' for module, _, _ in cases):
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            ctx['dataset_paths'] = prepare_datasets(df, work_dir)
+
+                    for module, method, func in cases:
+                        seconds, peak_mb, delta_mb, error = run_case(func, ctx)
+                        results.append({'rows': rows, 'countries': countries, 'module': module, 'method': method,
+                                        'seconds': seconds, 'peak_mb': peak_mb, 'peak_delta_mb': delta_mb,
+                                        'error': error})
+                        status = f"ERROR {error}" if error else f"{seconds:9.3f} s  {peak_mb:9.1f} MB peak  (+{delta_mb:.1f} MB)"
+                        print(f"{rows:>10,} {countries:>6} {module:<18} {method:<32} {status}")
+                finally:
+                    get_renderer().wait()
+                    get_result_cache().close()
+                    os.chdir(start_dir)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'meta': metadata(), 'params': vars(args), 'results': results}, f, indent=1)
+    print(f"Results written to '{args.output}'.")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
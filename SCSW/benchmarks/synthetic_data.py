@@ -0,0 +1,133 @@
+"""生成与 heart_attack_prediction_dataset.csv 结构相同的可复现随机数据，用于基准测试。
+
+用法（在 SCSW 目录下）：
+    python benchmarks/synthetic_data.py --rows 1000000 --countries 5000 --texts 20000 --output synthetic.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+COUNTRIES = {
+    'Argentina': ('South America', 'Southern Hemisphere'), 'Canada': ('North America', 'Northern Hemisphere'),
+    'France': ('Europe', 'Northern Hemisphere'), 'Thailand': ('Asia', 'Northern Hemisphere'),
+    'Germany': ('Europe', 'Northern Hemisphere'), 'Japan': ('Asia', 'Northern Hemisphere'),
+    'Brazil': ('South America', 'Southern Hemisphere'), 'South Africa': ('Africa', 'Southern Hemisphere'),
+    'United States': ('North America', 'Northern Hemisphere'), 'Vietnam': ('Asia', 'Northern Hemisphere'),
+    'China': ('Asia', 'Northern Hemisphere'), 'Italy': ('Europe', 'Southern Hemisphere'),
+    'Spain': ('Europe', 'Southern Hemisphere'), 'India': ('Asia', 'Northern Hemisphere'),
+    'Nigeria': ('Africa', 'Northern Hemisphere'), 'New Zealand': ('Australia', 'Southern Hemisphere'),
+    'South Korea': ('Asia', 'Northern Hemisphere'), 'Australia': ('Australia', 'Southern Hemisphere'),
+    'Colombia': ('South America', 'Northern Hemisphere'), 'United Kingdom': ('Europe', 'Northern Hemisphere'),
+}
+CONTINENTS = ['Africa', 'Asia', 'Australia', 'Europe', 'North America', 'South America']
+HEMISPHERES = ['Northern Hemisphere', 'Southern Hemisphere']
+
+FEEDBACK_OPENERS = ['The staff were', 'My doctor was', 'The clinic felt', 'Overall the visit was',
+                    'The waiting time was', 'The treatment plan seems', 'Follow-up care was', 'The nurse was']
+FEEDBACK_WORDS = ['great', 'terrible', 'okay', 'very helpful', 'not helpful at all', 'excellent', 'slow',
+                  'friendly', 'rude', 'confusing', 'reassuring', 'awful', 'fine', 'wonderful', 'disappointing']
+FEEDBACK_CLOSERS = ['', ' and I would come back.', ' but the parking was a nightmare.', ', thanks!',
+                    '. I am worried about my results.', '. Nothing special.', '!!!', ' :)']
+
+
+def country_table(n_countries):
+    """返回 (国家, 大洲, 半球) 三个数组；超过 20 个国家时追加编号的虚构国家。"""
+    names = list(COUNTRIES)[:n_countries]
+    continents = [COUNTRIES[name][0] for name in names]
+    hemispheres = [COUNTRIES[name][1] for name in names]
+    for i in range(len(names), n_countries):
+        names.append(f"Country {i + 1:05d}")
+        continents.append(CONTINENTS[i % len(CONTINENTS)])
+        hemispheres.append(HEMISPHERES[(i // len(CONTINENTS)) % 2])
+    return np.array(names, dtype=object), np.array(continents, dtype=object), np.array(hemispheres, dtype=object)
+
+
+def feedback_texts(n_texts, rng):
+    """生成 n_texts 条不同的短评价文本（用于情感分析基准）。"""
+    texts = set()
+    while len(texts) < n_texts:
+        opener = FEEDBACK_OPENERS[rng.integers(len(FEEDBACK_OPENERS))]
+        words = ' and '.join(rng.choice(FEEDBACK_WORDS, size=rng.integers(1, 3), replace=False))
+        closer = FEEDBACK_CLOSERS[rng.integers(len(FEEDBACK_CLOSERS))]
+        text = f"{opener} {words}{closer}"
+        # 模板组合有限，超出后加上编号保证文本各不相同
+        texts.add(text if text not in texts else f"{text} (visit {len(texts)})")
+    return np.array(sorted(texts), dtype=object)
+
+
+def make_heart_dataset(rows, seed=0, n_countries=20, n_texts=None):
+    """生成 rows 行、与原数据集列名和取值范围一致的数据。
+
+    n_countries 控制 Country 的基数（可以远大于原数据的 20 个）；n_texts 不为 None 时
+    追加一列 Feedback 文本，取自 n_texts 条不同的评价。部分变量之间带有相关性，
+    使检验和回归的结果不至于全是零效应。
+    """
+    rng = np.random.default_rng(seed)
+    age = rng.integers(18, 91, rows)
+    sex = np.where(rng.random(rows) < 0.7, 'Male', 'Female').astype(object)
+    cholesterol = np.clip(120 + (age - 18) * 0.8 + rng.normal(100, 70, rows), 120, 400).round().astype(np.int64)
+    systolic = rng.integers(90, 181, rows)
+    diastolic = rng.integers(60, 111, rows)
+    smoking = (rng.random(rows) < 0.9).astype(np.int64)
+    bmi = np.clip(rng.normal(28.9, 6.3, rows) + (sex == 'Male') * 0.5, 18, 40)
+    exercise = rng.uniform(0, 20, rows)
+
+    # 血压是 "收缩压/舒张压" 形式的字符串；先生成各组合的字符串再按编码取值，避免逐行格式化
+    combos = np.array([f"{s}/{d}" for s in range(90, 181) for d in range(60, 111)], dtype=object)
+    blood_pressure = combos[(systolic - 90) * 51 + (diastolic - 60)]
+
+    countries, continents, hemispheres = country_table(n_countries)
+    country_codes = rng.integers(0, n_countries, rows)
+
+    logit = -4 + 0.008 * cholesterol + 0.5 * smoking + 0.02 * (bmi - 28) - 0.03 * exercise
+    risk = (rng.random(rows) < 1 / (1 + np.exp(-logit))).astype(np.int64)
+
+    df = pd.DataFrame({
+        'Age': age,
+        'Sex': sex,
+        'Cholesterol': cholesterol,
+        'Blood Pressure': blood_pressure,
+        'Heart Rate': rng.integers(40, 111, rows),
+        'Diabetes': (rng.random(rows) < 0.65).astype(np.int64),
+        'Family History': rng.integers(0, 2, rows),
+        'Smoking': smoking,
+        'Obesity': (bmi > 30).astype(np.int64),
+        'Alcohol Consumption': (rng.random(rows) < 0.6).astype(np.int64),
+        'Exercise Hours Per Week': exercise,
+        'Diet': rng.choice(np.array(['Healthy', 'Average', 'Unhealthy'], dtype=object), rows),
+        'Previous Heart Problems': rng.integers(0, 2, rows),
+        'Medication Use': rng.integers(0, 2, rows),
+        'Stress Level': rng.integers(1, 11, rows),
+        'Sedentary Hours Per Day': rng.uniform(0, 12, rows),
+        'Income': rng.integers(20000, 300001, rows),
+        'BMI': bmi,
+        'Triglycerides': rng.integers(30, 801, rows),
+        'Physical Activity Days Per Week': rng.integers(0, 8, rows),
+        'Sleep Hours Per Day': rng.integers(4, 11, rows),
+        'Country': countries[country_codes],
+        'Continent': continents[country_codes],
+        'Hemisphere': hemispheres[country_codes],
+        'Heart Attack Risk': risk,
+    })
+    if n_texts:
+        df['Feedback'] = feedback_texts(n_texts, rng)[rng.integers(0, n_texts, rows)]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--countries', type=int, default=20)
+    parser.add_argument('--texts', type=int, default=None, help="number of distinct Feedback texts")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='synthetic_heart_attack.csv')
+    args = parser.parse_args()
+
+    df = make_heart_dataset(args.rows, args.seed, args.countries, args.texts)
+    df.to_csv(args.output, index=False)
+    print(f"Wrote {len(df):,} rows to '{args.output}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 各模块以 "from Module_xxx.yyy import ..." 导入，测试时把 SCSW 目录加入搜索路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
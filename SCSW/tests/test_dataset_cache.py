@@ -0,0 +1,30 @@
+import os
+
+import pandas as pd
+import pytest
+
+from Module_Data_Cache import DatasetCache
+
+pytest.importorskip('pyarrow.feather')
+
+
+def test_cache_writes_use_unique_temporary_files(tmp_path, monkeypatch):
+    source = tmp_path / 'data.csv'
+    pd.DataFrame({'a': range(5), 'b': list('vwxyz')}).to_csv(source, index=False)
+    # 另一个会话留下的同名临时文件不会被覆盖或误用
+    stale = tmp_path / 'data.csv.cache.feather.tmp'
+    stale.write_bytes(b'partial')
+    written = []
+    replace = os.replace
+    monkeypatch.setattr(DatasetCache.os, 'replace', lambda src, dst: (written.append(src), replace(src, dst)))
+
+    df, _ = DatasetCache.load_csv_versioned(str(source))
+    with open(source, 'a') as f:
+        f.write('5,u\n')
+    df, _ = DatasetCache.load_csv_versioned(str(source))
+
+    assert df['a'].tolist() == list(range(6))
+    assert len(written) == len(set(written)) >= 4
+    assert all(str(os.getpid()) in os.path.basename(path) for path in written)
+    assert sorted(p.name for p in tmp_path.glob('*.tmp')) == [stale.name]
+    assert stale.read_bytes() == b'partial'
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import patsy
+import pytest
+
+from Module_data_analysis.Regression import OLSAccumulator, build_formula, fit_ols
+
+sm = pytest.importorskip('statsmodels.formula.api')
+from statsmodels.stats.stattools import durbin_watson, jarque_bera, omni_normtest  # noqa: E402
+
+
+def _frame(n=6000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'x': rng.normal(50, 10, n), 'g': rng.choice(['a', 'b', 'c'], n)})
+    df['y'] = 3 * df['x'] + df['g'].map({'a': 0.0, 'b': 1.0, 'c': 2.0}) + rng.normal(0, 1, n)
+    return df
+
+
+@pytest.mark.parametrize('method', ['qr', 'cholesky'])
+@pytest.mark.parametrize('offset', [0.0, 1e6])
+def test_ols_matches_statsmodels(method, offset):
+    df = _frame(n=800, seed=2)
+    df['y'] += offset
+    df.loc[::37, 'x'] = np.nan
+    fit, design_info = fit_ols(df, build_formula('y', ['x', 'g']), method)
+    ref = sm.ols('y ~ x + g', df).fit()
+    assert fit.method == method and fit.nobs == ref.nobs
+    assert fit.params == pytest.approx(ref.params.to_numpy(), rel=1e-8)
+    assert fit.bse == pytest.approx(ref.bse.to_numpy(), rel=1e-6)
+    assert fit.pvalues == pytest.approx(ref.pvalues.to_numpy(), rel=1e-5, abs=1e-300)
+    assert fit.conf_int() == pytest.approx(ref.conf_int().to_numpy(), rel=1e-8)
+    for name in ['rsquared', 'rsquared_adj', 'fvalue', 'llf', 'aic', 'bic']:
+        assert getattr(fit, name) == pytest.approx(getattr(ref, name), rel=1e-6), name
+    resid = ref.resid.to_numpy()
+    assert fit.durbin_watson == pytest.approx(durbin_watson(resid), rel=1e-6)
+    assert fit.jarque_bera[0] == pytest.approx(jarque_bera(resid)[0], rel=1e-6)
+    assert fit.omnibus[0] == pytest.approx(omni_normtest(resid)[0], rel=1e-6)
+
+    grid = pd.DataFrame({'x': [30.0, 50.0, 70.0], 'g': ['a', 'b', 'c'], 'y': 0.0})
+    X_new = patsy.build_design_matrices([design_info], grid)[0]
+    bands = fit.get_prediction(X_new)
+    expected = ref.get_prediction(grid).summary_frame()
+    pd.testing.assert_frame_equal(bands, expected[bands.columns].reset_index(drop=True), rtol=1e-6)
+
+
+@pytest.mark.parametrize('offset', [0.0, 1e9])
+def test_incremental_ols_matches_statsmodels_with_large_offset(offset):
+    df = _frame()
+    shifted = df.assign(y=df['y'] + offset)
+    acc = OLSAccumulator(build_formula('y', ['x', 'g']), ['y', 'x', 'g'])
+    for start in range(0, len(df), 700):
+        acc.update(shifted.iloc[start:start + 700])
+    fit = acc.fit()
+    # 参考结果在未平移的数据上计算：平移 y 只改变截距
+    ref = sm.ols('y ~ x + g', df).fit()
+    expected = ref.params.to_numpy() + np.r_[offset, 0, 0, 0]
+    assert fit.nobs == len(df)
+    assert fit.params == pytest.approx(expected, rel=1e-9, abs=1e-6)
+    assert fit.bse == pytest.approx(ref.bse.to_numpy(), rel=1e-6)
+    assert fit.ssr == pytest.approx(ref.ssr, rel=1e-6)
+    assert fit.rsquared == pytest.approx(ref.rsquared, rel=1e-9)
+    assert fit.fvalue == pytest.approx(ref.fvalue, rel=1e-6)
+
+
+def test_incremental_ols_without_intercept():
+    df = _frame(seed=1)
+    acc = OLSAccumulator('Q("y") ~ 0 + Q("x")', ['y', 'x'])
+    acc.update(df.iloc[:2500])
+    acc.update(df.iloc[2500:])
+    fit = acc.fit()
+    ref = sm.ols('y ~ 0 + x', df).fit()
+    assert fit.params == pytest.approx(ref.params.to_numpy(), rel=1e-9)
+    assert fit.bse == pytest.approx(ref.bse.to_numpy(), rel=1e-6)
+    assert fit.rsquared == pytest.approx(ref.rsquared, rel=1e-9)
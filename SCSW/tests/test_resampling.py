@@ -0,0 +1,84 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+import scipy.stats as stats
+
+from Module_data_analysis.Resampling import _exact_fits, bootstrap_mean_diff, permutation_test
+
+
+def _groups(values, codes):
+    return [values[codes == g] for g in np.unique(codes)]
+
+
+@pytest.mark.parametrize('offset', [0.0, 1e9])
+def test_anova_f_with_large_offset(offset):
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 3, 3000)
+    values = rng.normal(0, 1, codes.size) + codes * 0.1
+    result = permutation_test('anova_f', values + offset, codes, max_resamples=5000, max_workers=1)
+    expected = stats.f_oneway(*_groups(values, codes))
+    assert result.statistic == pytest.approx(expected.statistic, rel=1e-6)
+    assert result.p_value < 0.01  # 参数检验 p ≈ 0.0018
+
+
+def test_exact_mean_diff_follows_absolute_statistic_definition():
+    rng = np.random.default_rng(1)
+    values = np.r_[rng.normal(0, 1, 5), rng.normal(1, 1, 7)] + 1e6
+    codes = np.r_[np.zeros(5, int), np.ones(7, int)]
+    result = permutation_test('mean_diff', values, codes, max_resamples=1000)
+    assert result.method == 'exact' and result.resamples == 792
+
+    observed = values[5:].mean() - values[:5].mean()
+    diffs = []
+    for first in combinations(range(12), 5):
+        mask = np.zeros(12, bool)
+        mask[list(first)] = True
+        diffs.append(values[~mask].mean() - values[mask].mean())
+    expected = np.mean(np.abs(diffs) >= abs(observed) - 1e-9)
+    assert result.statistic == pytest.approx(observed)
+    assert result.p_value == pytest.approx(expected)
+
+
+def test_exact_rank_sum_matches_mannwhitney_for_equal_groups():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=14) + np.r_[np.zeros(7), np.ones(7)]
+    codes = np.r_[np.zeros(7, int), np.ones(7, int)]
+    result = permutation_test('rank_sum', values, codes, max_resamples=10_000)
+    expected = stats.mannwhitneyu(values[:7], values[7:], method='exact')
+    assert result.method == 'exact'
+    assert result.p_value == pytest.approx(expected.pvalue)
+
+
+def test_chi_square_statistic_and_p_value():
+    rng = np.random.default_rng(3)
+    a = rng.integers(0, 3, 2000)
+    b = np.where(rng.random(2000) < 0.1, a % 2, rng.integers(0, 2, 2000))
+    result = permutation_test('chi_square', codes=a, codes2=b, max_resamples=4000, early_stop=False)
+    table = np.zeros((3, 2))
+    np.add.at(table, (a, b), 1)
+    expected = stats.chi2_contingency(table, correction=False)
+    assert result.statistic == pytest.approx(expected.statistic)
+    assert abs(result.p_value - expected.pvalue) < 0.02
+
+
+def test_results_depend_only_on_seed():
+    rng = np.random.default_rng(4)
+    values, codes = rng.normal(size=500), rng.integers(0, 4, 500)
+    first = permutation_test('rank_sum', values, codes, max_resamples=3000, seed=7)
+    again = permutation_test('rank_sum', values, codes, max_resamples=3000, seed=7)
+    assert first == again
+
+
+def test_exact_fits_does_not_build_huge_binomials():
+    assert _exact_fits(12, 5, 792) and not _exact_fits(12, 5, 791)
+    assert not _exact_fits(10_000_000, 5_000_000, 10_000)
+
+
+def test_bootstrap_interval_contains_difference():
+    rng = np.random.default_rng(5)
+    group1, group2 = rng.normal(0, 1, 400) + 1e9, rng.normal(0.5, 1, 300) + 1e9
+    diff, low, high = bootstrap_mean_diff(group1, group2, n_resamples=2000)
+    assert diff == pytest.approx(group2.mean() - group1.mean())
+    assert low < diff < high
+    assert high - low == pytest.approx(2 * 1.96 * np.sqrt(1 / 400 + 1 / 300), rel=0.2)
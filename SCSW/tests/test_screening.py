@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats as stats
+
+from Module_data_analysis.Screening import fdr_bh, screen_column, screen_pairs
+
+
+def _groups(values, codes):
+    return [values[codes == g] for g in np.unique(codes)]
+
+
+@pytest.mark.parametrize('offset', [0.0, 1e5, 1.7e9])
+def test_anova_matches_scipy_with_large_offset(offset):
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 5, 200_000)
+    values = rng.normal(0, 1000, codes.size) + offset + codes * 5
+    row = screen_column('x', values, ('anova',), {'g': (codes, 5)})[0]
+    expected = stats.f_oneway(*_groups(values, codes))
+    assert row[5] == pytest.approx(expected.statistic, rel=1e-8)
+    assert row[6] == pytest.approx(expected.pvalue, rel=1e-6, abs=1e-12)
+
+
+def test_kruskal_matches_scipy_with_ties_and_missing_categories():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 20, 5000).astype(np.float64) + 1e9
+    codes = rng.integers(-1, 4, values.size)  # -1 为缺失
+    row = screen_column('x', values, ('kruskal',), {'g': (codes, 4)})[0]
+    keep = codes >= 0
+    expected = stats.kruskal(*_groups(values[keep], codes[keep]))
+    assert row[3] == keep.sum()
+    assert row[5] == pytest.approx(expected.statistic, rel=1e-9)
+    assert row[6] == pytest.approx(expected.pvalue, rel=1e-6)
+
+
+def test_fdr_bh_matches_scipy_and_keeps_nan():
+    p_values = np.array([0.01, np.nan, 0.04, 0.03, 0.2, 0.001])
+    q_values = fdr_bh(p_values)
+    valid = ~np.isnan(p_values)
+    assert np.isnan(q_values[1])
+    np.testing.assert_allclose(q_values[valid], stats.false_discovery_control(p_values[valid]))
+
+
+def test_screen_pairs_table():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'a': rng.normal(size=300), 'b': rng.normal(size=300),
+                       'g': rng.choice(['x', 'y', 'z'], 300), 'h': rng.choice(['u', 'v'], 300)})
+    result = screen_pairs(df, ['a', 'b'], ['g', 'h'], max_workers=1)
+    assert len(result) == 8
+    row = result[(result['Continuous'] == 'a') & (result['Categorical'] == 'g') & (result['Test'] == 'anova')]
+    expected = stats.f_oneway(*[df.loc[df['g'] == k, 'a'] for k in ['x', 'y', 'z']])
+    assert row['p-value'].iloc[0] == pytest.approx(expected.pvalue)
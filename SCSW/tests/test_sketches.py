@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module_Data_Inspection.Sketches import HeavyHitters, HyperLogLog, QuantileSketch, Reservoir, hash_values
+from Module_Data_Inspection.SketchStatistics import SketchAccumulator
+from Module_Data_Inspection.StatisticsEngine import compute_statistics
+
+
+def test_hyperloglog_within_error_bound_after_merge():
+    values = np.arange(200_000) * 7 + 1e9
+    left, right = HyperLogLog(), HyperLogLog()
+    left.add_hashes(hash_values(values[:120_000]))
+    right.add_hashes(hash_values(values[80_000:]))
+    merged = left.merge(right)
+    # 3 倍相对标准误差，对应约 99.7% 的置信度
+    assert abs(merged.estimate() - len(values)) <= 3 * merged.relative_error() * len(values)
+
+
+def test_heavy_hitters_counts_within_error():
+    rng = np.random.default_rng(0)
+    data = rng.zipf(1.3, 100_000)
+    data = data[data < 50_000]
+    sketch = HeavyHitters(capacity=64)
+    for chunk in np.array_split(data, 10):
+        values, counts = np.unique(chunk, return_counts=True)
+        sketch = sketch.merge(HeavyHitters.from_counts(values, counts, capacity=64))
+    truth = pd.Series(data).value_counts()
+    assert 0 < sketch.error <= len(data) / 65
+    true_counts = truth.reindex(sketch.values).to_numpy()
+    assert np.all(sketch.counts <= true_counts) and np.all(true_counts <= sketch.counts + sketch.error)
+    assert truth.drop(sketch.values).max() <= sketch.error
+    assert sketch.mode() == truth.index[0]
+
+
+def test_quantile_sketch_rank_error():
+    rng = np.random.default_rng(1)
+    data = rng.normal(1e9, 5, 300_000)
+    sketch = QuantileSketch()
+    for chunk in np.array_split(data, 7):
+        part = QuantileSketch()
+        part.update(chunk, rng)
+        sketch = sketch.merge(part, rng)
+    qs = [0.1, 0.25, 0.5, 0.75, 0.9]
+    ranks = np.searchsorted(np.sort(data), sketch.quantiles(qs)) / len(data)
+    assert np.all(np.abs(ranks - qs) <= sketch.rank_error())
+
+
+def test_reservoir_mean_error():
+    rng = np.random.default_rng(2)
+    lengths = rng.integers(1, 200, 100_000).astype(float)
+    reservoir = Reservoir(size=2_000)
+    positions, keys = reservoir.select(len(lengths), rng)
+    reservoir.add(keys, lengths[positions], len(lengths))
+    mean, error = reservoir.mean()
+    assert 0 < error and abs(mean - lengths.mean()) <= 2 * error
+
+    # 样本就是全部数据时是精确的；抽样的非缺失值只有一个时无法估计误差
+    full = Reservoir(size=10)
+    full.add(np.array([0.5, 0.2]), np.array([3.0, 5.0]), 2)
+    assert full.mean() == (4.0, 0.0)
+    single = Reservoir(size=1)
+    single.add(np.array([0.5]), np.array([3.0]), 100)
+    mean, error = single.mean()
+    assert mean == 3.0 and np.isnan(error)
+
+
+def test_sketch_statistics_exact_when_errors_are_zero():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'a': rng.integers(0, 50, 5_000), 'b': rng.normal(1e6, 1, 5_000).round(3),
+                       'c': rng.choice(list('xyz'), 5_000)})
+    accumulator = SketchAccumulator(df)
+    accumulator.update(df, chunk_rows=1_000, max_workers=1)
+    approx = accumulator.statistics(df)
+    exact = compute_statistics(df)
+    for col in ['a', 'c']:
+        assert approx.loc[col, 'Unique error'] == 0 and approx.loc[col, 'Mode count error'] == 0
+        for stat in ['Count', 'Unique', 'Mode']:
+            assert approx.loc[col, stat] == exact.loc[col, stat]
+    assert approx.loc['a', 'Quantile rank error'] == 0
+    assert approx.loc['a', ['Median', 'Q1', 'Q3']].tolist() == exact.loc['a', ['Median', 'Q1', 'Q3']].tolist()
+    # 误差界不为 0 时，结果在误差界以内
+    error = approx.loc['b', 'Unique error']
+    assert error > 0
+    assert abs(approx.loc['b', 'Unique'] - exact.loc['b', 'Unique']) <= error
+    assert approx.loc['b', ['Mean', 'Std']].astype(float).tolist() == pytest.approx(
+        exact.loc['b', ['Mean', 'Std']].astype(float).tolist(), rel=1e-9)
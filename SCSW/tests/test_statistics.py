@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module_Data_Inspection.IncrementalStatistics import CoMoments, LabelCounts, Moments, StatisticsAccumulator
+from Module_Data_Inspection.StatisticsEngine import categorical_statistics, compute_statistics, label_mode
+
+
+@pytest.mark.parametrize('values', [
+    ['b', 'a', 'b', 'a', 'c'],
+    ['x', 'y', 'z'],
+    [3, 1, 2, 2, 1],
+])
+def test_label_mode_matches_pandas(values):
+    codes, uniques = pd.factorize(pd.Series(values))
+    counts = np.bincount(codes, minlength=len(uniques))
+    assert label_mode(uniques, counts) == pd.Series(values).mode()[0]
+
+
+def test_label_mode_with_many_labels():
+    labels = [f'id{i:06d}' for i in range(20_000)]
+    counts = np.ones(len(labels), dtype=np.int64)
+    counts[[5, 7_000]] = 2
+    assert label_mode(labels, counts) == 'id000005'
+    assert np.isnan(label_mode([], []))
+
+
+def test_label_counts_mode_and_unorderable_labels():
+    df = pd.DataFrame({'s': ['b', 'a', 'b', 'a', None]})
+    counts = LabelCounts.from_series(df['s'])
+    assert counts.mode() == categorical_statistics(df, ['s']).loc['s', 'Mode'] == 'a'
+    # 不可比较的标签并列时取最先出现的
+    assert label_mode(['a', 1], [2, 2]) == 'a'
+
+
+def _mixed_frame(offset=0.0, n=4_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'ratio': rng.gamma(2.0, 3.0, n) + offset,
+        'ordinal': rng.integers(1, 6, n),
+        'nominal': rng.choice(['north', 'south', 'east'], n),
+        'constant': np.full(n, 7.0),
+    })
+    df.loc[rng.choice(n, 300, replace=False), 'ratio'] = np.nan
+    df.loc[rng.choice(n, 50, replace=False), 'nominal'] = None
+    return df
+
+
+@pytest.mark.parametrize('offset', [0.0, 1e9])
+def test_compute_statistics_matches_pandas(offset):
+    df = _mixed_frame(offset)
+    result = compute_statistics(df)
+    numeric = df.select_dtypes('number')
+    expected = pd.DataFrame({
+        'Count': numeric.count(), 'Unique': numeric.nunique(), 'Mean': numeric.mean(),
+        'Median': numeric.median(), 'Mode': numeric.mode().iloc[0], 'Std': numeric.std(),
+        'Min': numeric.min(), 'Q1': numeric.quantile(0.25), 'Q3': numeric.quantile(0.75), 'Max': numeric.max(),
+        'Kurtosis': numeric.kurt(), 'Skewness': numeric.skew(),
+    })
+    for stat in ['Count', 'Unique', 'Mode', 'Min', 'Max', 'Median', 'Q1', 'Q3']:
+        assert result.loc[numeric.columns, stat].tolist() == expected[stat].tolist(), stat
+    for stat in ['Mean', 'Std', 'Kurtosis', 'Skewness']:
+        # 平移不改变中心矩：只允许与平移量相称的舍入误差
+        assert result.loc[numeric.columns, stat].astype(float).to_numpy() == pytest.approx(
+            expected[stat].to_numpy(), rel=1e-6, abs=1e-9), stat
+    assert result.loc['nominal', ['Count', 'Unique', 'Mode']].tolist() == [
+        df['nominal'].count(), df['nominal'].nunique(), df['nominal'].mode()[0]]
+    assert result['Type'].tolist() == ['Ratio', 'Ordinal', 'Nominal', 'Ordinal']
+
+
+def test_moments_merge_matches_single_pass_with_large_offset():
+    rng = np.random.default_rng(4)
+    block = rng.normal(0, 1, (2, 9_000)) + np.array([[1e9], [0.0]])
+    block[1, ::7] = np.nan
+    merged = Moments.empty(2)
+    for part in np.array_split(block, [10, 3_000, 3_001, 8_000], axis=1):
+        merged = merged.merge(Moments.from_block(part))
+    whole = Moments.from_block(block)
+    for name in ['n', 'mean', 'low', 'high']:
+        assert getattr(merged, name) == pytest.approx(getattr(whole, name), rel=1e-12)
+    for name in ['m2', 'm3', 'm4']:
+        assert getattr(merged, name) == pytest.approx(getattr(whole, name), rel=1e-6, abs=1e-3)
+    series = pd.Series(block[0])
+    assert np.sqrt(merged.m2[0] / (merged.n[0] - 1)) == pytest.approx((series - 1e9).std(), rel=1e-9)
+
+
+def test_comoments_merge_matches_single_pass_with_large_offset():
+    rng = np.random.default_rng(5)
+    rows = rng.normal(0, 1, (5_000, 3)) + np.array([1e9, 0.0, -3e6])
+    merged = CoMoments.empty(3)
+    for part in np.array_split(rows, [1, 2_000, 4_999]):
+        merged = merged.merge(CoMoments.from_rows(part))
+    assert merged.n == len(rows)
+    assert merged.mean == pytest.approx(rows.mean(axis=0), rel=1e-12)
+    expected = np.cov((rows - np.array([1e9, 0.0, -3e6])).T, ddof=0) * len(rows)
+    assert merged.cross == pytest.approx(expected, rel=1e-6, abs=1e-6)
+
+
+def test_statistics_accumulator_matches_full_recompute():
+    df = _mixed_frame(offset=1e9, seed=6)
+    accumulator = StatisticsAccumulator(df)
+    for start in range(0, len(df), 1_500):
+        accumulator.update(df.iloc[start:start + 1_500])
+    result, expected = accumulator.statistics(df), compute_statistics(df)
+    exact = ['Type', 'Count', 'Unique', 'Median', 'Mode', 'Min', 'Q1', 'Q3', 'Max']
+    pd.testing.assert_frame_equal(result[exact], expected[exact], check_dtype=False)
+    for stat in ['Mean', 'Std', 'Kurtosis', 'Skewness']:
+        assert result[stat].astype(float).to_numpy() == pytest.approx(
+            expected[stat].astype(float).to_numpy(), rel=1e-6, nan_ok=True), stat
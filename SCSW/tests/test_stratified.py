@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import scipy.stats as stats
+
+from Module_data_analysis.Stratified import cmh_test, combine_p_values
+
+tables = pytest.importorskip('statsmodels.stats.contingency_tables')
+
+
+def test_cmh_2x2_matches_statsmodels():
+    rng = np.random.default_rng(0)
+    sizes = [120, 300, 45, 1]  # 只有一行的层不参与检验
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    codes1 = rng.integers(0, 2, offsets[-1])
+    # 各层结局的基础比例不同，且第一组的结局更常见，使合并优势比偏离 1
+    base = np.repeat([0.2, 0.4, 0.5, 0.5], sizes)
+    codes2 = (rng.random(offsets[-1]) < base + 0.15 * (codes1 == 0)).astype(int)
+    result = cmh_test(codes1, 2, codes2, 2, offsets)
+
+    strata = [np.histogram2d(codes1[a:b], codes2[a:b], bins=2, range=[[0, 2], [0, 2]])[0]
+              for a, b in zip(offsets[:-1], offsets[1:]) if b - a >= 2]
+    ref = tables.StratifiedTable(strata)
+    null = ref.test_null_odds(correction=False)
+    assert result['dof'] == 1
+    assert result['Statistic'] == pytest.approx(null.statistic, rel=1e-10)
+    assert result['p-value'] == pytest.approx(null.pvalue, rel=1e-8)
+    assert result['Common odds ratio'] == pytest.approx(ref.oddsratio_pooled, rel=1e-10)
+
+
+def test_cmh_single_stratum_is_scaled_pearson_chi_square():
+    rng = np.random.default_rng(1)
+    codes1, codes2 = rng.integers(0, 3, 400), rng.integers(0, 4, 400)
+    result = cmh_test(codes1, 3, codes2, 4, np.array([0, 400]))
+    table = np.histogram2d(codes1, codes2, bins=[3, 4], range=[[0, 3], [0, 4]])[0]
+    chi2, _, dof, _ = stats.chi2_contingency(table, correction=False)
+    # 单层时广义 CMH 统计量等于 (n - 1) / n 倍的 Pearson 卡方
+    assert result['dof'] == dof == 6
+    assert result['Statistic'] == pytest.approx(chi2 * 399 / 400, rel=1e-10)
+
+
+def test_combine_p_values_matches_scipy():
+    p_values = [0.01, 0.2, np.nan, 0.7]
+    for method in ['fisher', 'stouffer']:
+        result = combine_p_values(p_values, method)
+        expected = stats.combine_pvalues([0.01, 0.2, 0.7], method=method)
+        assert result['Strata'] == 3
+        assert result['p-value'] == pytest.approx(expected.pvalue, rel=1e-12)
@@ -0,0 +1,33 @@
+import threading
+
+from Module_Tracing.Tracing import Tracer
+
+
+def _rows(report):
+    """report() 表格中每行的 (span 名称, 调用次数)。"""
+    return [tuple(line.split()[:2]) for line in report.splitlines()[2:]]
+
+
+def test_report_covers_only_the_given_run_of_an_action():
+    tracer = Tracer()
+    tracer.enable(memory=False)
+    first = tracer.begin_action('Statistics')
+    with tracer.span('compute'):
+        pass
+    second = tracer.begin_action('Statistics')
+    with tracer.span('compute'):
+        pass
+
+    # 后台线程按提交任务时的操作编号归类，即使在下一次操作开始后才运行
+    def render():
+        with tracer.span('render', first):
+            pass
+    worker = threading.Thread(target=render)
+    worker.start()
+    worker.join()
+    tracer.end_action()
+
+    assert first != second
+    assert _rows(tracer.report(first)) == [('Statistics', '1'), ('compute', '1'), ('render', '1')]
+    assert _rows(tracer.report(second)) == [('Statistics', '1'), ('compute', '1')]
+    assert {event['action'] for event in tracer.events} == {'Statistics'}